@@ -0,0 +1,148 @@
+"""Adaptive page size, concurrency and request rate for history downloads.
+
+This module:
+    - observes the status and latency of every E-utility response sent through the session
+    - grows the efetch page size, the number of pages in flight and the request rate while
+      responses are quick and successful
+    - halves all three on HTTP 429, 5xx, connection errors or slow responses, and then grows them
+      again more cautiously (additive increase, multiplicative decrease)
+    - stays within the bounds set by the user: the retmax setting up to maxretmax records per
+      page, one worker up to the workers setting, and never above NCBI's request budget
+
+Before the first back-off the page size doubles after each healthy streak, like TCP slow start.
+After that it grows by a quarter, so it settles just under the size the server sustains.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import attr
+from loguru import logger
+
+from pyentrez import fetch_scheduler as fs
+
+# NCBI returns at most this many records per efetch request.
+MAX_PAGE = 10000
+# Healthy responses in a row before the controller grows.
+STREAK = 3
+# Responses slower than this are treated like throttling.
+SLOW_SECONDS = 10.0
+# Back-offs within this many seconds of the previous one are ignored, so a burst of 429s from
+# concurrent pages halves the settings once.
+COOLDOWN = 1.0
+MIN_RATE = 0.5
+BACK_OFF_STATUS = frozenset((0, 429, 500, 502, 503, 504))
+
+
+@attr.s
+class AdaptiveController(object):
+    """AIMD controller of page size, concurrency and request rate.
+
+    Attributes:
+        scheduler (FetchScheduler): Scheduler whose token bucket rate is adjusted.
+        min_page (int): Smallest and initial page size.
+        max_page (int): Largest page size.
+        max_workers (int): Largest number of pages in flight.
+        max_rate (float): Largest request rate, in requests per second.
+        slow (float): Seconds after which a response counts as slow.
+    """
+
+    scheduler: Any = attr.ib()
+    min_page: int = attr.ib(default=20)
+    max_page: int = attr.ib(default=MAX_PAGE)
+    max_workers: int = attr.ib(default=fs.DEFAULT_WORKERS)
+    max_rate: float = attr.ib(default=fs.ANONYMOUS_RATE)
+    slow: float = attr.ib(default=SLOW_SECONDS)
+    page_size: int = attr.ib(init=False)
+    concurrency: int = attr.ib(init=False, default=1)
+    rate: float = attr.ib(init=False)
+    streak: int = attr.ib(init=False, default=0)
+    slow_start: bool = attr.ib(init=False, default=True)
+    last_back_off: float = attr.ib(init=False, default=float('-inf'))
+    counters: Dict[str, int] = attr.ib(init=False)
+    lock: Any = attr.ib(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self):
+        self.page_size = self.min_page
+        self.rate = self.max_rate
+        self.counters = dict.fromkeys(('responses', 'back_offs', 'increases'), 0)
+
+    def observe(self, utility: str, status: int, seconds: float) -> None:
+        """Adapt to one response.
+
+        Args:
+            utility (str): E-utility that answered.
+            status (int): HTTP status, 0 if the request failed without a response.
+            seconds (float): Latency of the response.
+        """
+        with self.lock:
+            self.counters['responses'] += 1
+            if status in BACK_OFF_STATUS or seconds > self.slow:
+                self._back_off(f'{utility} {status or "failed"} in {seconds:.1f}s')
+            elif status < 400:
+                self.streak += 1
+                if self.streak >= STREAK:
+                    self._increase()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current settings of the controller and how often it changed them."""
+        with self.lock:
+            return dict(
+                self.counters, page_size=self.page_size, concurrency=self.concurrency,
+                rate=self.rate,
+            )
+
+    def _back_off(self, reason: str) -> None:
+        self.streak = 0
+        now = time.monotonic()
+        if now - self.last_back_off < COOLDOWN:
+            return
+        self.last_back_off = now
+        self.slow_start = False
+        self.page_size = max(self.min_page, self.page_size // 2)
+        self.concurrency = max(1, self.concurrency // 2)
+        self._set_rate(max(MIN_RATE, self.rate / 2))
+        self.counters['back_offs'] += 1
+        logger.debug(f'Backing off after {reason}: {self._describe()}')
+
+    def _increase(self) -> None:
+        self.streak = 0
+        growth = self.page_size if self.slow_start else max(1, self.page_size // 4)
+        page_size = min(self.max_page, self.page_size + growth)
+        concurrency = min(self.max_workers, self.concurrency + 1)
+        rate = min(self.max_rate, self.rate + MIN_RATE)
+        if (page_size, concurrency, rate) == (self.page_size, self.concurrency, self.rate):
+            return
+        self.page_size, self.concurrency = page_size, concurrency
+        self._set_rate(rate)
+        self.counters['increases'] += 1
+        logger.debug(f'Growing: {self._describe()}')
+
+    def _set_rate(self, rate: float) -> None:
+        self.rate = rate
+        self.scheduler.bucket.rate = rate
+
+    def _describe(self) -> str:
+        return (f'{self.page_size} records/page, {self.concurrency} in flight, '
+                f'{self.rate:.1f} requests/s')
+
+
+def from_settings(scheduler: Any) -> Optional[AdaptiveController]:
+    """Build a controller from the adaptive, retmax, maxretmax and workers settings.
+
+    Returns:
+        AdaptiveController bounded by the user's settings, or None if adaptive is not turned on.
+    """
+    if os.environ.get('PYENT_ADAPTIVE', 'None').lower() not in ('y', 'yes', 'true'):
+        return None
+    retmax = os.environ.get('PYENT_RETMAX', 'None')
+    max_page = os.environ.get('PYENT_MAXRETMAX', 'None')
+    min_page = int(retmax) if retmax.isdigit() and int(retmax) > 0 else 20
+    return AdaptiveController(
+        scheduler=scheduler,
+        min_page=min_page,
+        max_page=max(min_page, min(MAX_PAGE, int(max_page) if max_page.isdigit() else MAX_PAGE)),
+        max_workers=scheduler.workers,
+        max_rate=scheduler.rate,
+    )
@@ -0,0 +1,186 @@
+"""Offline import of PubMed baseline and update files.
+
+This module:
+    - finds the .xml.gz baseline and update files in a local mirror directory
+    - parses them in a process pool, one file per worker, with the streaming PubMed XML parser
+    - writes the articles of each file to the storage backend with bulk writes, in file order,
+      so update files supersede the baseline
+    - applies the DeleteCitation entries of update files
+    - records every imported file in a manifest, so an interrupted import resumes where it
+      stopped instead of starting over
+
+Articles are upserted on PMID, so re-importing a file that was interrupted halfway is safe.
+
+The import is not streamed end to end: each worker parses a whole file into a list of articles,
+about 30,000 for a baseline file, and sends it back in one piece. Memory peaks at the parsed
+size of one file per worker plus the file being written.
+"""
+import collections
+import gzip
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import attr
+from loguru import logger
+
+from pyentrez.parsers import pubmed_xml
+from pyentrez.utils import pathloc as pl
+
+PATTERN = '*.xml.gz'
+
+
+@attr.s(auto_attribs=True)
+class ImportReport:
+    """Outcome of one import run.
+
+    Attributes:
+        files: files imported by this run.
+        skipped: files already imported by an earlier run.
+        records: articles written.
+        deleted: articles removed by DeleteCitation entries.
+        seconds: wall time of the run.
+        error: message of the error that stopped the import, if any.
+    """
+    files: int = 0
+    skipped: int = 0
+    records: int = 0
+    deleted: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def records_per_sec(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f'{self.files} files imported, {self.skipped} skipped: {self.records} articles, '
+                f'{self.deleted} deleted in {self.seconds:.1f}s '
+                f'({self.files_per_sec:.2f} files/sec, {self.records_per_sec:.0f} records/sec)')
+
+
+@attr.s
+class Manifest(object):
+    """Files already imported, kept in a JSON file next to the user's database.
+
+    A file counts as imported while its size and modification time match the manifest, so a
+    file that is replaced in the mirror is imported again.
+
+    Attributes:
+        path (Path): Location of the manifest.
+    """
+
+    path: Path = attr.ib(factory=lambda: pl.get_user_workspace() / 'import_manifest.json')
+    files: Dict[str, Dict[str, Any]] = attr.ib(init=False, factory=dict)
+
+    def __attrs_post_init__(self):
+        if self.path.exists():
+            with open(self.path) as file_in:
+                self.files = json.load(file_in)
+
+    def done(self, path: Path) -> bool:
+        entry = self.files.get(path.name)
+        return entry is not None and entry['stamp'] == stamp(path)
+
+    def record(self, path: Path, records: int, deleted: int) -> None:
+        """Mark a file as imported and save the manifest."""
+        self.files[path.name] = {'stamp': stamp(path), 'records': records, 'deleted': deleted}
+        partial = self.path.with_suffix('.part')
+        with open(partial, 'w') as file_out:
+            json.dump(self.files, file_out, indent=1, sort_keys=True)
+        os.replace(partial, self.path)
+
+
+def stamp(path: Path) -> List[float]:
+    """Size and modification time identifying one version of a file."""
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime]
+
+
+def find_files(directory) -> List[Path]:
+    """Baseline and update files in directory, in the order PubMed publishes them."""
+    return sorted(Path(directory).glob(PATTERN))
+
+
+def parse_file(path: Path) -> Tuple[Path, List[Dict[str, Any]], List[str]]:
+    """Parses one baseline or update file, this runs in a worker process.
+
+    The whole file is parsed into a list, which is pickled back to the parent in one piece.
+
+    Returns:
+        The path, its articles, and the PMIDs of its DeleteCitation entries.
+    """
+    deleted: List[str] = []
+    with gzip.open(path, 'rb') as file_in:
+        articles = list(pubmed_xml.iter_articles(file_in, deleted))
+    return path, articles, deleted
+
+
+def parse_files(paths: List[Path], workers: int) -> Iterator[Tuple[Path, List[Any], List[str]]]:
+    """Parses files on a process pool and yields them in order.
+
+    At most workers files are parsed ahead of the one being consumed, which bounds memory to
+    the articles of workers + 1 parsed files however large the mirror is.
+    """
+    queued = iter(paths)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque(
+            pool.submit(parse_file, path) for path in itertools.islice(queued, workers)
+        )
+        try:
+            while pending:
+                parsed = pending.popleft().result()
+                path = next(queued, None)
+                if path is not None:
+                    pending.append(pool.submit(parse_file, path))
+                yield parsed
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def import_files(directory, db: Any, workers: Optional[int] = None,
+                 manifest: Optional[Manifest] = None) -> ImportReport:
+    """Imports a directory of baseline and update files into a storage backend.
+
+    Args:
+        directory: Directory holding the .xml.gz files.
+        db (Storage): Initialized storage backend the articles are written to.
+        workers (int): Parser processes, defaults to the number of CPUs.
+        manifest (Manifest): Record of imported files, defaults to one in the user's workspace.
+
+    Returns:
+        ImportReport of the run.
+    """
+    manifest = manifest or Manifest()
+    workers = workers or os.cpu_count() or 1
+    report = ImportReport()
+    start = time.perf_counter()
+    paths = find_files(directory)
+    pending = [path for path in paths if not manifest.done(path)]
+    report.skipped = len(paths) - len(pending)
+    logger.info(f'Importing {len(pending)} of {len(paths)} files from {directory} '
+                f'with {workers} workers.')
+    for path, articles, deleted in parse_files(pending, workers):
+        write = db.add_many(articles)
+        if write.error:
+            report.error = f'{path.name}: {write.error}'
+            logger.error(f'Import stopped at {report.error}')
+            break
+        if deleted:
+            report.deleted += db.delete_many(deleted)
+        report.records += write.docs
+        report.files += 1
+        manifest.record(path, write.docs, len(deleted))
+        logger.debug(f'Imported {path.name}: {write}')
+    report.seconds = time.perf_counter() - start
+    logger.info(f'Import: {report}')
+    return report
@@ -0,0 +1,152 @@
+"""Record and replay Entrez traffic with a compressed cassette file.
+
+This module:
+    - records the decoded E-utility responses an EntrezSession receives, with their latency, to
+      a gzip-compressed JSON lines cassette
+    - replays a cassette in place of the network, so the full fetch, parse and store path runs
+      deterministically on a machine without access to NCBI
+    - simulates latency, either the recorded latency of each response or a fixed delay
+    - simulates throttling by answering a share of replayed requests with HTTP 429, which the
+      session retries like a real throttled request
+
+Responses are keyed on the E-utility and its parameters, leaving out email, api_key and tool,
+so a cassette recorded by one user replays for another. Error responses are never recorded.
+"""
+import gzip
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import attr
+from loguru import logger
+
+from pyentrez import exceptions
+
+RECORD = 'record'
+REPLAY = 'replay'
+_IGNORED_PARAMS = frozenset(('email', 'api_key', 'tool'))
+
+Response = Tuple[int, str, Any, bytes]
+
+
+def request_key(method: str, path: str, body: str) -> str:
+    """Cassette key of a request, independent of GET/POST and parameter order."""
+    url = urlsplit(path)
+    utility = url.path.rsplit('/', 1)[-1].replace('.fcgi', '')
+    params = parse_qsl(body if method == 'POST' else url.query, keep_blank_values=True)
+    kept = sorted((name, value) for name, value in params if name not in _IGNORED_PARAMS)
+    return json.dumps([utility, kept])
+
+
+def message(content_type: str) -> http.client.HTTPMessage:
+    """Response headers of a replayed response."""
+    headers = http.client.HTTPMessage()
+    headers['Content-Type'] = content_type
+    return headers
+
+
+@attr.s
+class Cassette(object):
+    """Recorded E-utility responses, consulted by an EntrezSession before the network.
+
+    Attributes:
+        path (Path): Location of the cassette file.
+        mode (str): record to add responses to the cassette, replay to answer from it only.
+        latency (float): Seconds each replayed response is delayed, None for its recorded latency.
+        throttle (float): Share of replayed requests answered with HTTP 429.
+        seed (int): Seed of the throttling draws, so a replay is repeatable.
+    """
+
+    path: Path = attr.ib(converter=Path)
+    mode: str = attr.ib(default=REPLAY, validator=attr.validators.in_((RECORD, REPLAY)))
+    latency: Optional[float] = attr.ib(default=None)
+    throttle: float = attr.ib(default=0.0)
+    seed: int = attr.ib(default=0)
+    entries: Dict[str, Dict[str, Any]] = attr.ib(init=False, factory=dict)
+    counters: Dict[str, int] = attr.ib(init=False)
+    random: Any = attr.ib(init=False)
+    lock: Any = attr.ib(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self):
+        self.counters = dict.fromkeys(('recorded', 'replayed', 'throttled'), 0)
+        self.random = random.Random(self.seed)
+        if self.path.exists():
+            with gzip.open(self.path, 'rt', encoding='utf-8') as file_in:
+                for line in file_in:
+                    entry = json.loads(line)
+                    self.entries[entry['key']] = entry
+        elif self.mode == REPLAY:
+            raise FileNotFoundError(f'No cassette at {self.path}')
+
+    def play(self, method: str, path: str, body: str, send: Callable[..., Response]) -> Response:
+        """Answer a request from the cassette, or from send while recording.
+
+        Args:
+            method (str): HTTP method of the request.
+            path (str): Request path with its query string.
+            body (str): Form-encoded body of a POST request.
+            send (Callable): Sends the request over the network and returns
+                (status, reason, headers, decoded body).
+
+        Returns:
+            (status, reason, headers, decoded body) of the response.
+
+        Raises:
+            CassetteMiss: If a replayed cassette has no response for the request.
+        """
+        key = request_key(method, path, body)
+        if self.mode == RECORD:
+            return self._record(key, method, path, body, send)
+        entry = self.entries.get(key)
+        if entry is None:
+            raise exceptions.CassetteMiss(f'No recorded response for {key}')
+        time.sleep(entry['elapsed'] if self.latency is None else self.latency)
+        with self.lock:
+            throttled = self.throttle and self.random.random() < self.throttle
+            self.counters['throttled' if throttled else 'replayed'] += 1
+        if throttled:
+            return 429, 'Too Many Requests', message('text/plain'), b'API rate limit exceeded'
+        return 200, 'OK', message(entry['content_type']), entry['body'].encode('latin-1')
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of recorded, replayed and throttled responses, and of stored entries."""
+        with self.lock:
+            return dict(self.counters, entries=len(self.entries))
+
+    def _record(self, key, method, path, body, send) -> Response:
+        start = time.perf_counter()
+        status, reason, headers, data = send(method, path, body)
+        if status >= 400:
+            return status, reason, headers, data
+        entry = {
+            'key': key,
+            'elapsed': time.perf_counter() - start,
+            'content_type': headers.get('Content-Type', 'text/xml'),
+            'body': data.decode('latin-1'),
+        }
+        with self.lock:
+            self.entries[key] = entry
+            self.counters['recorded'] += 1
+            with gzip.open(self.path, 'at', encoding='utf-8') as file_out:
+                file_out.write(json.dumps(entry) + '\n')
+        return status, reason, headers, data
+
+
+def from_settings() -> Optional[Cassette]:
+    """Build the cassette named by the cassette and cassettemode settings.
+
+    Returns:
+        Cassette, or None if the cassette setting is not set.
+    """
+    path = os.environ.get('PYENT_CASSETTE', 'None')
+    if path == 'None':
+        return None
+    mode = os.environ.get('PYENT_CASSETTEMODE', REPLAY)
+    logger.info(f'Entrez traffic {"recorded to" if mode == RECORD else "replayed from"} {path}')
+    return Cassette(path=Path(path).expanduser(), mode=mode)
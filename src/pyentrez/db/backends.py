@@ -0,0 +1,54 @@
+"""Selects the storage backend configured in the user's settings."""
+import os
+from typing import Any, Optional
+
+from loguru import logger
+
+from pyentrez.db import mongo_entrez as MDB
+from pyentrez.db import search_index as SI
+from pyentrez.db import sqlite_entrez as SDB
+from pyentrez.db.storage import Storage
+
+
+def batch_size() -> int:
+    """Returns the user's database write batch size, or 1000 if unset."""
+    size = os.environ.get('PYENT_BATCHSIZE', 'None')
+    return int(size) if size.isdigit() and int(size) > 0 else 1000
+
+
+def from_settings(manager: Any = None) -> Optional[Storage]:
+    """Build the backend selected by the mongo/cloud and sqlite settings.
+
+    MongoDB takes precedence if both are turned on.
+
+    Args:
+        manager (Any): Top-level EntrezManager or CommandEntrez that owns the backend.
+
+    Returns:
+        An uninitialized Storage backend with its own local search index, or None if no database
+        is configured.
+    """
+    db = None
+    if os.environ.get('PYENT_MONGO') == 'True':
+        if os.environ.get('PYENT_CLOUD') == 'True':
+            logger.info(f'Cloud-based Mongo client. URI: {os.environ.get("PYENT_URI")}')
+            db = MDB.DBLoader(manager=manager,
+                              cloud=True,
+                              uri=os.environ.get('PYENT_URI'),
+                              batch_size=batch_size(),
+            )
+        else:
+            logger.info(f'Local Mongo client. Host: {os.environ.get("PYENT_HOST")}'
+                        f'  PORT: {os.environ.get("PYENT_PORT")}')
+            db = MDB.DBLoader(manager=manager,
+                              cloud=False,
+                              host=os.environ.get('PYENT_HOST'),
+                              port=int(os.environ.get('PYENT_PORT')),
+                              batch_size=batch_size(),
+            )
+    elif os.environ.get('PYENT_SQLITE') == 'True':
+        logger.info('SQLite database in user workspace.')
+        db = SDB.SQLiteLoader(manager=manager, batch_size=batch_size())
+    if db is not None:
+        db.search_index = SI.SearchIndex(key=db.index_key())
+    return db
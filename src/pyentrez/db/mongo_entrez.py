@@ -1,11 +1,15 @@
 import json
+import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlsplit
 from loguru import logger
 
 import attr
 from pymongo import MongoClient as MC
-from pymongo.errors import ConnectionFailure
+from pymongo import ASCENDING, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure, PyMongoError
+from pyentrez.db.storage import Storage, WriteReport, chunked
 from pyentrez.utils import pathloc as pl
 
 
@@ -14,16 +18,61 @@ with stringlist.open() as stringfile:
     t_dict = json.load(stringfile)
 
 
+# Fields the upserts and review screen filter and sort on: PMID, title, publication date, journal.
+INDEXES = [
+    ('PMID', {'unique': True}),
+    ('TI', {}),
+    ('DP', {}),
+    ('JT', {}),
+]
+
+
 def condense_a(cursor):
     return tuple([cursor['PMID'], cursor['TI']])
 
 
 def condense_b(cursor):
-    return tuple([cursor['PMID'], cursor['AB'], cursor['TI']])
+    return tuple([cursor['PMID'], cursor.get('AB'), cursor['TI']])
+
+
+@attr.s(auto_attribs=True)
+class PartialWrite:
+    """Documents an unordered bulk write still wrote when some of its writes failed.
+
+    Attributes:
+        upserted_count: documents inserted.
+        matched_count: documents that matched a stored one.
+        modified_count: matched documents that changed.
+        upserted_ids: _id of each inserted document keyed on its index in the request list.
+        failed: indexes of the requests that failed.
+        error: message of the first failed write.
+    """
+    upserted_count: int
+    matched_count: int
+    modified_count: int
+    upserted_ids: Dict[int, Any]
+    failed: Set[int]
+    error: str
+
+
+def partial_write(exc: BulkWriteError, requests: List[Any]) -> PartialWrite:
+    """Read what an unordered bulk write wrote from the details of its BulkWriteError."""
+    details = exc.details or {}
+    errors = details.get('writeErrors', [])
+    message = errors[0].get('errmsg', str(exc)) if errors else str(exc)
+    return PartialWrite(
+        upserted_count=details.get('nUpserted', 0),
+        matched_count=details.get('nMatched', 0),
+        modified_count=details.get('nModified', 0),
+        upserted_ids={doc['index']: doc['_id'] for doc in details.get('upserted', [])},
+        failed={error['index'] for error in errors},
+        error=f'{len(errors)} of {len(requests)} writes failed: {message}',
+    )
 
 
 @attr.s(auto_attribs=True, kw_only=True)
-class DBLoader:
+class DBLoader(Storage):
+    label = 'Mongo Client'
     manager: Optional[Any] = None
     host: Optional[str] = None
     port: Optional[str] = None
@@ -31,9 +80,11 @@ class DBLoader:
     cloud: bool = False
     d1: str = 'test'
     c1: str = 'articles'
+    batch_size: int = 1000
     client: Any = attr.ib(init=False)
     db: Any = attr.ib(init=False)
     coll: Any = attr.ib(init=False)
+    index_report: Dict[str, Any] = attr.ib(init=False, factory=dict)
 
     def initialize(self):
         logger.debug("Initializing database.")
@@ -47,35 +98,167 @@ class DBLoader:
             return 1
         self.db = get_db(self.client, self.d1)
         self.coll = get_coll(self.db, self.c1)
+        self.ensure_indexes()
         logger.debug("Database initialized.")
+        self.backfill_index()
         return 0
 
+    def index_key(self):
+        if self.cloud:
+            # Only the hosts of the URI, so its credentials and options never reach logs or paths.
+            server = urlsplit(self.uri).netloc.rpartition('@')[2]
+        else:
+            server = f'{self.host}:{self.port}'
+        return f'mongodb:{server}/{self.d1}/{self.c1}'
+
+    def ensure_indexes(self):
+        """Create the indexes in INDEXES if they are missing.
+
+        create_index is a no-op for an index that already exists, so this is cheap on every start.
+        A unique PMID index cannot be built over a collection that already holds duplicates; that
+        failure is logged and the remaining indexes are still created.
+
+        Returns:
+            Dict with the names of the indexes on the collection and the seconds spent creating
+            each one.
+        """
+        created = {}
+        for field, options in INDEXES:
+            start = time.perf_counter()
+            try:
+                name = self.coll.create_index([(field, ASCENDING)], **options)
+            except OperationFailure as exc:
+                logger.error(f'Could not create index on {field}: {exc}')
+                continue
+            created[name] = time.perf_counter() - start
+        self.index_report = {
+            'indexes': sorted(self.coll.index_information()),
+            'seconds': created,
+        }
+        logger.info(f'Collection indexes: {self.index_report}')
+        return self.index_report
+
+    def count(self):
+        return self.coll.estimated_document_count()
 
     def get_titles(self):
         titles = self.coll.find({}, {"PMID": 1, "TI": 1, "_id": 0})
         title_set = set(map(condense_a, titles))
         return title_set
 
+    def get_title_page(self, after, limit):
+        query = {} if after is None else {'PMID': {'$gt': after}}
+        titles = self.coll.find(query, {'PMID': 1, 'TI': 1, '_id': 0}).sort('PMID', 1).limit(limit)
+        return list(map(condense_a, titles))
+
     def get_article(self, pmid):
-        article = self.coll.find({"PMID": pmid}, {"PMID": 1, "TI": 1, "AB": 1, "_id": 0})
-        art_set = list(map(condense_b, article))
-        return art_set[0]
+        article = self.coll.find_one({"PMID": pmid}, {"PMID": 1, "TI": 1, "AB": 1, "_id": 0})
+        return condense_b(article) if article is not None else None
 
-    def add_many(self, articles):
-        result = []
-        try:
-            self.client.admin.command('ismaster')
-        except ConnectionFailure:
-            return 1
-        for paper in articles:
-            PMID = paper['PMID']
-            tmp = self.coll.replace_one(
-                {"PMID": PMID},
-                paper,
-                upsert=True,
+    def get_articles(self, pmids):
+        articles = []
+        for chunk in chunked(pmids, self.batch_size):
+            found = self.coll.find(
+                {"PMID": {"$in": chunk}},
+                {"PMID": 1, "TI": 1, "AB": 1, "summary": 1, "_id": 0},
             )
-            result.append(tmp.upserted_id)
-        return 0
+            articles.extend(condense_b(doc) + (bool(doc.get('summary')),) for doc in found)
+        return articles
+
+    def known_pmids(self, pmids):
+        known = set()
+        for chunk in chunked(pmids, self.batch_size):
+            found = self.coll.find({"PMID": {"$in": chunk}}, {"PMID": 1, "_id": 0})
+            known.update(doc['PMID'] for doc in found)
+        return known
+
+    def add_many(self, articles):
+        """Upsert articles keyed on PMID with unordered bulk writes of batch_size each.
+
+        The bulk result only counts modified documents, so every article that replaced a stored
+        one is reported as changed. If some writes of a batch fail, the articles the batch still
+        wrote are counted, indexed and announced before the write stops.
+
+        Returns:
+            WriteReport with the counts of each batch and the PMIDs that were inserted or
+            replaced, or with error set if a write failed.
+        """
+        report = WriteReport()
+        start = time.perf_counter()
+        for chunk in chunked(articles, self.batch_size):
+            requests = [ReplaceOne({"PMID": paper['PMID']}, paper, upsert=True)
+                        for paper in chunk]
+            failed: Set[int] = set()
+            error = None
+            try:
+                result = self.coll.bulk_write(requests, ordered=False)
+            except BulkWriteError as exc:
+                result = partial_write(exc, requests)
+                failed, error = result.failed, result.error
+            except PyMongoError as exc:
+                logger.error(f'Bulk write failed: {exc}')
+                report.error = str(exc)
+                break
+            report.docs += len(requests)
+            report.add_batch(result.upserted_count, result.matched_count,
+                             result.modified_count)
+            written = [paper for index, paper in enumerate(chunk) if index not in failed]
+            self.index_articles(written)
+            self.announce(report, [chunk[index] for index in result.upserted_ids],
+                          [paper for index, paper in enumerate(chunk)
+                           if index not in result.upserted_ids and index not in failed])
+            if error is not None:
+                logger.error(f'Bulk write failed: {error}')
+                report.error = error
+                break
+        report.seconds = time.perf_counter() - start
+        logger.debug(f'add_many: {report}')
+        return report
+
+    def add_summaries(self, summaries):
+        """Insert summaries with unordered $setOnInsert upserts, so stored articles are kept.
+
+        Returns:
+            WriteReport where inserted counts new summaries and matched counts PMIDs that were
+            already stored.
+        """
+        report = WriteReport()
+        start = time.perf_counter()
+        for chunk in chunked(summaries, self.batch_size):
+            requests = [UpdateOne({"PMID": doc['PMID']}, {"$setOnInsert": doc}, upsert=True)
+                        for doc in chunk]
+            error = None
+            try:
+                result = self.coll.bulk_write(requests, ordered=False)
+            except BulkWriteError as exc:
+                result = partial_write(exc, requests)
+                error = result.error
+            except PyMongoError as exc:
+                logger.error(f'Bulk write failed: {exc}')
+                report.error = str(exc)
+                break
+            report.docs += len(requests)
+            report.add_batch(result.upserted_count, result.matched_count, 0)
+            new = [chunk[index] for index in result.upserted_ids]
+            self.index_articles(new)
+            self.announce(report, new, [])
+            if error is not None:
+                logger.error(f'Bulk write failed: {error}')
+                report.error = error
+                break
+        report.seconds = time.perf_counter() - start
+        logger.debug(f'add_summaries: {report}')
+        return report
+
+    def is_summary(self, pmid):
+        return self.coll.find_one({"PMID": pmid, "summary": True}, {"_id": 1}) is not None
+
+    def delete_many(self, pmids):
+        deleted = 0
+        for chunk in chunked(pmids, self.batch_size):
+            deleted += self.coll.delete_many({"PMID": {"$in": chunk}}).deleted_count
+            self.unindex_articles(chunk)
+        return deleted
 
 
 def connect_client(*args):
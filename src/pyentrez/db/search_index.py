@@ -0,0 +1,138 @@
+"""Local full-text index over stored titles and abstracts.
+
+The index is an SQLite FTS5 table in the user's workspace, keyed on PMID. Each store has its own
+index file, named after a digest of the store's index_key, so switching databases never returns
+PMIDs of another store. Backends update it in add_many and fill it from the stored articles
+when they find it empty, so every stored article can be found with a ranked search without
+going back to NCBI. Hits are ranked with BM25, the best match first.
+"""
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple
+
+import attr
+from loguru import logger
+
+from pyentrez.utils import pathloc as pl
+
+SCHEMA = '''CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts
+    USING fts5(TI, AB, tokenize='porter unicode61')'''
+
+
+def default_path(key: Optional[str] = None) -> Path:
+    """Location of the search index of the store identified by key in the user's workspace."""
+    if key is None:
+        return pl.get_user_workspace() / 'search_index.sqlite'
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    return pl.get_user_workspace() / f'search_index-{digest}.sqlite'
+
+
+def match_expression(query: str, prefix: bool = False) -> str:
+    """Quote every word of a free-text query, so FTS5 matches articles containing all of them.
+
+    With prefix, each word also matches the words it starts.
+    """
+    star = '*' if prefix else ''
+    words = ['"{0}"{1}'.format(word.replace('"', '""'), star) for word in query.split()]
+    return ' '.join(words)
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class SearchIndex:
+    path: Optional[Path] = None
+    key: Optional[str] = None
+    conn: Any = attr.ib(init=False, default=None)
+    lock: Any = attr.ib(init=False, factory=threading.RLock)
+
+    def open(self):
+        """Open the index, creating it on first use."""
+        if self.conn is None:
+            if self.path is None:
+                self.path = default_path(self.key)
+            self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            with self.conn:
+                self.conn.execute(SCHEMA)
+        return self.conn
+
+    def add(self, articles: Iterable[Any]) -> int:
+        """Index or re-index articles, replacing any earlier entry for the same PMID.
+
+        Returns:
+            Number of articles indexed.
+        """
+        rows = [(int(paper['PMID']), paper.get('TI', ''), paper.get('AB', ''))
+                for paper in articles if str(paper.get('PMID', '')).isdigit()]
+        with self.lock, self.open():
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO articles_fts (rowid, TI, AB) VALUES (?, ?, ?)', rows,
+            )
+        return len(rows)
+
+    def count(self) -> int:
+        """Number of indexed articles."""
+        with self.lock:
+            return self.open().execute('SELECT COUNT(*) FROM articles_fts').fetchone()[0]
+
+    def clear(self) -> None:
+        """Drop every indexed article."""
+        with self.lock, self.open():
+            self.conn.execute('DELETE FROM articles_fts')
+
+    def remove(self, pmids: Iterable[str]) -> None:
+        """Drop articles from the index."""
+        rows = [(int(pmid),) for pmid in pmids if str(pmid).isdigit()]
+        with self.lock, self.open():
+            self.conn.executemany('DELETE FROM articles_fts WHERE rowid = ?', rows)
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[str, str, float]]:
+        """Ranked search over titles and abstracts.
+
+        Args:
+            query (str): Words that must all appear in the title or abstract.
+            limit (int): Maximum number of hits.
+
+        Returns:
+            List of (PMID, Title, score) tuples, best match first. Lower scores rank higher.
+        """
+        expression = match_expression(query)
+        if not expression:
+            return []
+        try:
+            with self.lock:
+                rows = self.open().execute(
+                    'SELECT rowid, TI, bm25(articles_fts) AS score FROM articles_fts '
+                    'WHERE articles_fts MATCH ? ORDER BY score LIMIT ?',
+                    (expression, limit),
+                ).fetchall()
+        except sqlite3.Error as exc:
+            logger.error(f'Search for {query!r} failed: {exc}')
+            return []
+        return [(str(pmid), title, score) for pmid, title, score in rows]
+
+    def filter_titles(self, query: str, limit: int = 200) -> List[Tuple[str, str]]:
+        """Titles with a word starting with each word of query, in PMID order.
+
+        Args:
+            query (str): Word prefixes that must all appear in the title.
+            limit (int): Maximum number of titles.
+
+        Returns:
+            List of (PMID, Title) tuples.
+        """
+        expression = match_expression(query, prefix=True)
+        if not expression:
+            return []
+        try:
+            with self.lock:
+                rows = self.open().execute(
+                    'SELECT rowid, TI FROM articles_fts WHERE articles_fts MATCH ? '
+                    'ORDER BY rowid LIMIT ?',
+                    (f'TI : ({expression})', limit),
+                ).fetchall()
+        except sqlite3.Error as exc:
+            logger.error(f'Title filter {query!r} failed: {exc}')
+            return []
+        return [(str(pmid), title) for pmid, title in rows]
@@ -0,0 +1,218 @@
+"""Embedded SQLite storage backend.
+
+Stores articles in a single file in the user's workspace, so pyEntrez can keep and review
+articles without running a database service. The database runs in WAL mode so the review screen
+can read while a fetch is writing, and writes are batched into one transaction per chunk.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import attr
+from loguru import logger
+
+from pyentrez.db.storage import Storage, WriteReport, chunked
+from pyentrez.utils import pathloc as pl
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS articles (
+        PMID TEXT PRIMARY KEY,
+        TI TEXT,
+        AB TEXT,
+        DP TEXT,
+        JT TEXT,
+        doc TEXT NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS articles_ti ON articles (TI)',
+    'CREATE INDEX IF NOT EXISTS articles_dp ON articles (DP)',
+    'CREATE INDEX IF NOT EXISTS articles_jt ON articles (JT)',
+]
+
+INSERT = 'INSERT INTO articles (PMID, TI, AB, DP, JT, doc) VALUES (?, ?, ?, ?, ?, ?)'
+
+UPSERT = '''INSERT INTO articles (PMID, TI, AB, DP, JT, doc) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (PMID) DO UPDATE SET
+        TI = excluded.TI, AB = excluded.AB, DP = excluded.DP, JT = excluded.JT,
+        doc = excluded.doc'''
+
+
+def default_path() -> Path:
+    """Location of the SQLite database in the user's workspace."""
+    return pl.get_user_workspace() / 'pyentrez.sqlite'
+
+
+def as_row(paper):
+    """Flatten an article dict into the columns of the articles table."""
+    doc = json.dumps(paper, sort_keys=True, default=str)
+    return (paper['PMID'], paper.get('TI'), paper.get('AB'), paper.get('DP'), paper.get('JT'), doc)
+
+
+@attr.s(auto_attribs=True, kw_only=True)
+class SQLiteLoader(Storage):
+    label = 'SQLite database'
+    manager: Optional[Any] = None
+    path: Optional[Path] = None
+    batch_size: int = 1000
+    conn: Any = attr.ib(init=False, default=None)
+    lock: Any = attr.ib(init=False, factory=threading.RLock)
+
+    def initialize(self):
+        logger.debug("Initializing database.")
+        if self.path is None:
+            self.path = default_path()
+        try:
+            self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            with self.conn:
+                for statement in SCHEMA:
+                    self.conn.execute(statement)
+        except sqlite3.Error as exc:
+            logger.error(f'Could not open {self.path}: {exc}')
+            return 1
+        logger.debug(f"Database initialized at {self.path}.")
+        self.backfill_index()
+        return 0
+
+    def index_key(self):
+        if self.path is None:
+            return 'sqlite:default'
+        return f'sqlite:{Path(self.path).resolve()}'
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+    def get_titles(self):
+        with self.lock:
+            rows = self.conn.execute('SELECT PMID, TI FROM articles').fetchall()
+        return set(rows)
+
+    def get_title_page(self, after, limit):
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT PMID, TI FROM articles WHERE PMID > ? ORDER BY PMID LIMIT ?',
+                (after or '', limit),
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def get_article(self, pmid):
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT PMID, AB, TI FROM articles WHERE PMID = ?', (pmid,),
+            ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def get_articles(self, pmids):
+        articles = []
+        with self.lock:
+            for chunk in chunked(pmids, 500):
+                articles.extend(
+                    (pmid, abstract, title, bool(summary))
+                    for pmid, abstract, title, summary in self.conn.execute(
+                        "SELECT PMID, AB, TI, json_extract(doc, '$.summary') FROM articles "
+                        f'WHERE PMID IN ({",".join("?" * len(chunk))})',
+                        chunk,
+                    )
+                )
+        return articles
+
+    def known_pmids(self, pmids):
+        known = set()
+        with self.lock:
+            for chunk in chunked(pmids, 500):
+                rows = self.conn.execute(
+                    f'SELECT PMID FROM articles WHERE PMID IN ({",".join("?" * len(chunk))})',
+                    chunk,
+                )
+                known.update(row[0] for row in rows)
+        return known
+
+    def add_many(self, articles):
+        """Upsert articles keyed on PMID, one transaction per batch_size articles.
+
+        Returns:
+            WriteReport with the counts of each batch and the PMIDs that were inserted or whose
+            stored document changed, or with error set if a write failed.
+        """
+        report = WriteReport()
+        start = time.perf_counter()
+        for chunk in chunked(articles, self.batch_size):
+            docs = {paper['PMID']: paper for paper in chunk}
+            rows = {row[0]: row for row in map(as_row, docs.values())}
+            try:
+                with self.lock, self.conn:
+                    existing = dict(self.conn.execute(
+                        'SELECT PMID, doc FROM articles WHERE PMID IN '
+                        f'({",".join("?" * len(rows))})',
+                        list(rows),
+                    ))
+                    self.conn.executemany(UPSERT, rows.values())
+            except sqlite3.Error as exc:
+                logger.error(f'Batch write failed: {exc}')
+                report.error = str(exc)
+                break
+            changed = [docs[pmid] for pmid, row in rows.items()
+                       if pmid in existing and existing[pmid] != row[-1]]
+            report.docs += len(chunk)
+            report.add_batch(len(rows) - len(existing), len(existing), len(changed))
+            self.index_articles(chunk)
+            self.announce(report, [doc for pmid, doc in docs.items() if pmid not in existing],
+                          changed)
+        report.seconds = time.perf_counter() - start
+        logger.debug(f'add_many: {report}')
+        return report
+
+    def add_summaries(self, summaries):
+        """Insert summaries of PMIDs that are not stored yet, one transaction per batch.
+
+        Returns:
+            WriteReport where inserted counts new summaries and matched counts PMIDs that were
+            already stored.
+        """
+        report = WriteReport()
+        start = time.perf_counter()
+        for chunk in chunked(summaries, self.batch_size):
+            rows = {row[0]: row for row in map(as_row, chunk)}
+            try:
+                with self.lock, self.conn:
+                    existing = {pmid for pmid, in self.conn.execute(
+                        f'SELECT PMID FROM articles WHERE PMID IN ({",".join("?" * len(rows))})',
+                        list(rows),
+                    )}
+                    self.conn.executemany(
+                        INSERT,
+                        [row for pmid, row in rows.items() if pmid not in existing],
+                    )
+            except sqlite3.Error as exc:
+                logger.error(f'Batch write failed: {exc}')
+                report.error = str(exc)
+                break
+            report.docs += len(chunk)
+            report.add_batch(len(rows) - len(existing), len(existing), 0)
+            new = [doc for doc in chunk if doc['PMID'] not in existing]
+            self.index_articles(new)
+            self.announce(report, new, [])
+        report.seconds = time.perf_counter() - start
+        logger.debug(f'add_summaries: {report}')
+        return report
+
+    def delete_many(self, pmids):
+        deleted = 0
+        for chunk in chunked(pmids, 500):
+            with self.lock, self.conn:
+                deleted += self.conn.execute(
+                    f'DELETE FROM articles WHERE PMID IN ({",".join("?" * len(chunk))})', chunk,
+                ).rowcount
+            self.unindex_articles(chunk)
+        return deleted
+
+    def is_summary(self, pmid):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT json_extract(doc, '$.summary') FROM articles WHERE PMID = ?", (pmid,),
+            ).fetchone()
+        return bool(row and row[0])
@@ -0,0 +1,246 @@
+"""Storage interface shared by every pyentrez database backend.
+
+A backend stores the article dicts returned by the Scraper and serves them back to the review
+screen. Storage is an abstract base class, so a backend that leaves out part of this surface
+fails when it is constructed. Backends implement:
+
+    - initialize() connects and prepares the store, returning 0 on success or 1 on failure
+    - count() returns the number of stored articles, estimated if an exact count is costly
+    - get_titles() returns a set of (PMID, Title) tuples
+    - get_title_page(after, limit) returns the next limit (PMID, Title) tuples in PMID order
+    - index_key() names the store, so each store gets its own search index
+    - get_article(pmid) returns a (PMID, Abstract, Title) tuple, None if pmid is not stored
+    - get_articles(pmids) returns (PMID, Abstract, Title, summary) tuples of several articles
+    - add_many(articles) upserts articles keyed on PMID and returns a WriteReport
+    - known_pmids(pmids) returns the subset of pmids already stored
+    - add_summaries(summaries) inserts compact eSummary docs without replacing stored articles
+    - is_summary(pmid) tells whether the stored article is only a summary
+    - delete_many(pmids) removes articles and returns how many were deleted
+
+Backends that have a search_index keep it up to date by passing each written chunk to
+index_articles, which makes stored articles searchable with search(). Articles stored before
+the index existed are added by backfill_index when a backend is initialized, or by reindex.
+
+Every written chunk is also passed to announce with the articles it inserted and changed. The
+PMIDs are kept on the WriteReport, and listeners registered with subscribe are called with the
+(PMID, Title) tuples, so a view of the store can merge a write without reading the store again.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Iterable, List, Optional, Set, Tuple
+
+import attr
+from loguru import logger
+
+
+@attr.s(auto_attribs=True)
+class WriteReport:
+    """Outcome of one add_many call.
+
+    Attributes:
+        docs: number of articles submitted.
+        inserted: articles that were not in the store yet.
+        matched: articles that replaced an existing document.
+        modified: matched articles whose content actually changed.
+        batches: (inserted, matched, modified) for each write chunk.
+        seconds: wall time spent writing.
+        error: message of the error that stopped the write, if any.
+        new_pmids: PMIDs of the inserted articles.
+        changed_pmids: PMIDs of the matched articles that were rewritten.
+    """
+    docs: int = 0
+    inserted: int = 0
+    matched: int = 0
+    modified: int = 0
+    batches: List[Tuple[int, int, int]] = attr.Factory(list)
+    seconds: float = 0.0
+    error: Optional[str] = None
+    new_pmids: List[str] = attr.Factory(list)
+    changed_pmids: List[str] = attr.Factory(list)
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.docs / self.seconds if self.seconds else 0.0
+
+    def add_batch(self, inserted, matched, modified):
+        self.inserted += inserted
+        self.matched += matched
+        self.modified += modified
+        self.batches.append((inserted, matched, modified))
+
+    def __str__(self):
+        return (f'{self.docs} articles: {self.inserted} new, {self.matched} matched, '
+                f'{self.modified} modified in {len(self.batches)} batches '
+                f'({self.docs_per_sec:.0f} docs/sec)')
+
+
+class Storage(ABC):
+    """Base class of database backends, subclasses implement every abstract method."""
+
+    label = 'Database'
+    search_index = None
+    listeners: Optional[List[Callable[[List[Any], List[Any]], None]]] = None
+
+    @abstractmethod
+    def initialize(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored articles, without reading them."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def index_key(self) -> str:
+        """Identifies the store, such as its file or its server and collection.
+
+        The search index of the store is kept in a file named after this key.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_titles(self) -> Set[Tuple[str, str]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_title_page(self, after: Optional[str], limit: int) -> List[Tuple[str, str]]:
+        """Keyset page of (PMID, Title) tuples ordered by PMID, starting after the given PMID.
+
+        Pages are read from the PMID index, so every page costs the same however many articles
+        are stored. Pass the last PMID of a page as after to read the next one.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_article(self, pmid: str) -> Optional[Tuple[str, str, str]]:
+        """(PMID, Abstract, Title) tuple of a stored article, None if pmid is not stored."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_articles(self, pmids: Iterable[str]) -> List[Tuple[str, str, str, bool]]:
+        """(PMID, Abstract, Title, summary) tuples of the stored pmids, read in one query.
+
+        summary is True if only the eSummary of the article is stored. PMIDs that are not
+        stored are left out.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_many(self, articles: Iterable[Any]) -> WriteReport:
+        raise NotImplementedError
+
+    @abstractmethod
+    def known_pmids(self, pmids: Iterable[str]) -> Set[str]:
+        """Returns the subset of pmids that are already stored."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_summaries(self, summaries: Iterable[Any]) -> WriteReport:
+        """Insert summaries of PMIDs that are not stored yet, leaving full records untouched."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_summary(self, pmid: str) -> bool:
+        """Returns True if only the eSummary of pmid is stored, not its full record."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_many(self, pmids: Iterable[str]) -> int:
+        """Delete the articles with the given PMIDs, returning how many were stored."""
+        raise NotImplementedError
+
+    def index_articles(self, articles: List[Any]) -> None:
+        """Add freshly written articles to the full-text index, if there is one."""
+        if self.search_index is not None:
+            self.search_index.add(articles)
+
+    def backfill_index(self) -> int:
+        """Index every stored article if the search index is empty but the store is not.
+
+        Returns:
+            Number of articles indexed.
+        """
+        if self.search_index is None or self.search_index.count() or not self.count():
+            return 0
+        return self.reindex()
+
+    def reindex(self, batch_size: int = 1000) -> int:
+        """Rebuild the search index from the stored articles, one keyset page at a time.
+
+        Returns:
+            Number of articles indexed.
+        """
+        if self.search_index is None:
+            return 0
+        logger.info(f'Indexing the articles of the {self.label} for local search.')
+        self.search_index.clear()
+        indexed = 0
+        page = self.get_title_page(None, batch_size)
+        while page:
+            indexed += self.search_index.add(
+                {'PMID': pmid, 'TI': title, 'AB': abstract}
+                for pmid, abstract, title, _ in self.get_articles([pmid for pmid, _ in page])
+            )
+            page = self.get_title_page(page[-1][0], batch_size)
+        logger.info(f'Indexed {indexed} articles.')
+        return indexed
+
+    def unindex_articles(self, pmids: List[str]) -> None:
+        """Drop deleted articles from the full-text index, if there is one."""
+        if self.search_index is not None:
+            self.search_index.remove(pmids)
+
+    def subscribe(self, listener: Callable[[List[Any], List[Any]], None]) -> None:
+        """Call listener(new, changed) with (PMID, Title) tuples after every written chunk."""
+        if self.listeners is None:
+            self.listeners = []
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[List[Any], List[Any]], None]) -> None:
+        if self.listeners and listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def announce(self, report: WriteReport, new: List[Any], changed: List[Any]) -> None:
+        """Record the articles a chunk inserted and changed on report and tell the listeners.
+
+        Listeners run on the writing thread, with the titles of the chunk that was just written.
+        """
+        report.new_pmids.extend(doc['PMID'] for doc in new)
+        report.changed_pmids.extend(doc['PMID'] for doc in changed)
+        if not self.listeners or not (new or changed):
+            return
+        new_titles = [(doc['PMID'], doc.get('TI')) for doc in new]
+        changed_titles = [(doc['PMID'], doc.get('TI')) for doc in changed]
+        for listener in list(self.listeners):
+            listener(new_titles, changed_titles)
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[str, str, float]]:
+        """Ranked local full-text search over titles and abstracts.
+
+        Returns:
+            List of (PMID, Title, score) tuples, empty if there is no search index.
+        """
+        if self.search_index is None:
+            return []
+        return self.search_index.search(query, limit)
+
+    def filter_titles(self, query: str, limit: int = 200) -> List[Tuple[str, str]]:
+        """(PMID, Title) tuples of titles with a word starting with each word of query.
+
+        Returns:
+            Up to limit titles in PMID order, empty if there is no search index.
+        """
+        if self.search_index is None:
+            return []
+        return self.search_index.filter_titles(query, limit)
+
+
+def chunked(items, size):
+    """Yield lists of up to size items from any iterable."""
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,183 @@
+"""Cached catalog of Entrez databases and their search fields from einfo.
+
+This module:
+    - keeps the einfo database list and the field and link lists of each database in
+      einfo_catalog.json in the user's workspace
+    - loads the file lazily and only re-reads it when it changes on disk
+    - refreshes an entry from einfo once it is older than the einfottl setting, if the catalog
+      has an einfo function to call
+    - falls back to stale entries, then to the database list bundled with pyentrez, when NCBI
+      cannot be reached
+    - validates and completes the db, field and datetype settings without any network request
+
+Settings screens use an offline catalog, so validation is instant. The Scraper's catalog sends
+its einfo requests through the scheduler and refreshes stale entries when a query runs.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import attr
+from Bio import Entrez as ez
+from loguru import logger
+
+from pyentrez import exceptions
+from pyentrez.utils import pathloc as pl
+
+DEFAULT_TTL = 7 * 86400
+DB_LIST = '_databases'
+
+
+def bundled_databases() -> List[str]:
+    """Database list shipped with pyentrez, used until einfo has been reached once."""
+    with open(pl.get_data_path() / 'entrez.json') as file_in:
+        return json.load(file_in)['DbList']
+
+
+def database_entry(info: Any) -> Dict[str, Any]:
+    """Compact the DbInfo record einfo returns for one database."""
+    if isinstance(info, list):
+        # Newer einfo DTD's wrap the DbInfo of the single requested database in a list.
+        info = info[0]
+    return {
+        'description': str(info.get('Description', '')),
+        'fields': {
+            str(field['Name']): {
+                'name': str(field.get('FullName', '')),
+                'date': field.get('IsDate') == 'Y',
+            }
+            for field in info.get('FieldList', [])
+        },
+        'links': sorted(str(link['Name']) for link in info.get('LinkList', [])),
+    }
+
+
+@attr.s
+class EinfoCatalog(object):
+    """einfo responses cached in a JSON file.
+
+    Attributes:
+        path (Path): Location of the catalog file, None to keep the catalog in memory.
+        ttl (float): Seconds before an entry is refreshed from einfo.
+        einfo (Callable): Function sending an einfo request and returning its handle, None to
+            never leave the cached and bundled data.
+    """
+
+    path: Optional[Path] = attr.ib()
+    ttl: float = attr.ib(default=DEFAULT_TTL)
+    einfo: Optional[Callable[..., Any]] = attr.ib(default=None)
+    entries: Dict[str, Any] = attr.ib(init=False, factory=dict)
+    loaded: Optional[float] = attr.ib(init=False, default=None)
+    lock: Any = attr.ib(init=False, factory=threading.RLock)
+
+    def databases(self) -> List[str]:
+        """Names of the Entrez databases."""
+        entry = self._entry(DB_LIST, {})
+        return entry['names'] if entry else bundled_databases()
+
+    def database(self, db: str) -> Optional[Dict[str, Any]]:
+        """Description, fields and links of db, or None if it has never been fetched."""
+        return self._entry(db, {'db': db})
+
+    def fields(self, db: str) -> Dict[str, Dict[str, Any]]:
+        """Search fields of db keyed on their short name, with full name and date flag."""
+        entry = self.database(db)
+        return entry['fields'] if entry else {}
+
+    def links(self, db: str) -> List[str]:
+        """Names of the ELink links from db."""
+        entry = self.database(db)
+        return entry['links'] if entry else []
+
+    def choices(self, setting: str, db: Optional[str] = None) -> List[str]:
+        """Valid values of the db, field or datetype setting, empty if they are unknown.
+
+        field takes either the short or the full name of a field, datetype the lower-case short
+        name of a date field.
+        """
+        setting = setting.lower()
+        if setting == 'db':
+            return self.databases()
+        fields = self.fields(db or os.environ.get('PYENT_DB', 'pubmed'))
+        if setting == 'field':
+            return sorted({name for field, info in fields.items()
+                           for name in (field, info['name']) if name})
+        if setting == 'datetype':
+            return sorted(field.lower() for field, info in fields.items() if info['date'])
+        return []
+
+    def complete(self, setting: str, prefix: str, db: Optional[str] = None) -> List[str]:
+        """Valid values of setting starting with prefix, ignoring case."""
+        prefix = prefix.lower()
+        return [value for value in self.choices(setting, db) if value.lower().startswith(prefix)]
+
+    def refresh(self, db: Optional[str] = None) -> None:
+        """Fetch the database list, and the entry of db if given, unless they are fresh."""
+        self.databases()
+        if db is not None:
+            self.database(db)
+
+    def _entry(self, key: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self._load().get(key)
+            if self.einfo is None or (entry and time.time() - entry['updated'] <= self.ttl):
+                return entry
+            try:
+                handle = self.einfo(**params)
+                record = ez.read(handle)
+                handle.close()
+            except (OSError, RuntimeError, ValueError, KeyError, exceptions.CassetteMiss) as exc:
+                logger.warning(f'einfo {key} could not be refreshed: {exc}')
+                return entry
+            if key == DB_LIST:
+                entry = {'names': [str(name) for name in record['DbList']]}
+            else:
+                entry = database_entry(record['DbInfo'])
+            entry['updated'] = time.time()
+            self.entries[key] = entry
+            self._save()
+            return entry
+
+    def _load(self) -> Dict[str, Any]:
+        if self.path is None:
+            return self.entries
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return self.entries
+        if mtime != self.loaded:
+            try:
+                with open(self.path) as file_in:
+                    self.entries = json.load(file_in)
+            except ValueError as exc:
+                logger.warning(f'Ignoring unreadable {self.path}: {exc}')
+            self.loaded = mtime
+        return self.entries
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        part = self.path.with_name(f'{self.path.name}.part')
+        with open(part, 'w') as file_out:
+            json.dump(self.entries, file_out)
+        os.replace(part, self.path)
+        self.loaded = self.path.stat().st_mtime
+
+
+def from_settings(einfo: Optional[Callable[..., Any]] = None) -> EinfoCatalog:
+    """Build the catalog in the user's workspace from the einfottl setting.
+
+    Args:
+        einfo (Callable): Function sending einfo requests, None for an offline catalog.
+
+    Returns:
+        EinfoCatalog, kept in the user's workspace or, without one, in memory only.
+    """
+    ttl = os.environ.get('PYENT_EINFOTTL', 'None')
+    path = None
+    if os.environ.get('PYENT_HOME') is not None:
+        path = pl.get_user_workspace() / 'einfo_catalog.json'
+    return EinfoCatalog(path=path, ttl=int(ttl) if ttl.isdigit() else DEFAULT_TTL, einfo=einfo)
@@ -7,17 +7,39 @@ This module:
     - handles logic for constructing Entrez queries
     - handles unpacking Entrez fetch results
 """
+import datetime
+import io
 import os
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import attr
 # noinspection PyPep8Naming
 # noinspection PyPep8Naming
 from Bio import Entrez as ez
-from Bio import Medline as ml
 from loguru import logger
+from pyentrez import adaptive as ad
+from pyentrez import einfo_catalog as ec
+from pyentrez import fetch_scheduler as fs
+from pyentrez import http_session as hs
+from pyentrez import response_cache as rc
+from pyentrez.parsers import medline, pubmed_xml
 from pyentrez.utils import envars as ev
 
 
+# esearch cannot page past this many UID's for a single query.
+ESEARCH_CEILING = 9999
+# Earliest date used when a query larger than the ceiling has no mindate of its own.
+EARLIEST_DATE = datetime.date(1800, 1, 1)
+DATE_FORMAT = '%Y/%m/%d'
+# UID lists longer than this are uploaded with ePost instead of being sent in the efetch URL.
+POST_THRESHOLD = 200
+# Largest number of UID's sent in one ePost request.
+POST_CHUNK = 10000
+# Document summaries are small, so eSummary pages hold more records than efetch pages.
+SUMMARY_PAGE = 500
+
+
 @attr.s
 class Scraper(object):
     """Biopython's Entrez Wrapper - facilitates user interface with Entrez.
@@ -30,11 +52,53 @@ class Scraper(object):
 
     Attribues:
         manager (Any): top-level EntrezManager or CmdEntrez making requests
+        scheduler (FetchScheduler): rate-limited worker pool all Entrez requests go through
+        cache (ResponseCache): on-disk cache of esearch responses and UID-list efetches, None
+            to disable
+        session (EntrezSession): pooled keep-alive HTTP session, None to send requests through
+            Biopython's Entrez functions
+        catalog (EinfoCatalog): cached einfo database and field lists, refreshed through the
+            scheduler
+        controller (AdaptiveController): adapts history page size, concurrency and rate to the
+            responses of the session, None to use the retmax and workers settings as they are
     """
 
     manager = attr.ib()
+    scheduler = attr.ib()
+    cache = attr.ib()
+    session = attr.ib()
+    catalog = attr.ib()
+    controller = attr.ib()
+
+    @scheduler.default
+    def _scheduler_initialization(self):
+        return fs.from_settings()
+
+    @cache.default
+    def _cache_initialization(self):
+        return rc.from_settings()
+
+    @session.default
+    def _session_initialization(self):
+        return hs.from_settings()
 
-    def esearch(self, term):
+    @catalog.default
+    def _catalog_initialization(self):
+        return ec.from_settings(einfo=self.einfo)
+
+    @controller.default
+    def _controller_initialization(self):
+        # The controller learns from the responses of the session, so it needs one.
+        return ad.from_settings(self.scheduler) if self.session is not None else None
+
+    def __attrs_post_init__(self):
+        if self.session is not None:
+            # Retries inside the session spend the same request budget as first attempts.
+            self.session.throttle = self.scheduler.bucket.acquire
+        if self.controller is not None:
+            self.session.observer = self.controller.observe
+
+    def esearch(self, term, usehistory=False, cache=True, **overrides):
         """Combines search query and user-defined settings into Entrez-appropriate query.
 
         esearch assembles query from search term and the params returned based on user's settings.
@@ -43,19 +107,124 @@ class Scraper(object):
 
         Args:
             term (str): The term to query in the Entrez database.
+            usehistory (bool): Post the search to the Entrez history server, so the results
+                can later be paged through with WebEnv and QueryKey.
+            cache (bool): Serve the search from the response cache. Without it the search is
+                always sent, and its response replaces the cached one.
+            **overrides: esearch params that replace the user's settings, None drops a param.
 
         Returns:
              Unpacked dict that contains list of article UID's that match query.
         """
         params = construct_search_params()
-        handle = ez.esearch(
-            db=os.environ['PYENT_DB'],
-            term=term,
-            **params,
-        )
-        uid = ez.read(handle)
-        handle.close()
-        return uid
+        for name, value in overrides.items():
+            if value is None:
+                params.pop(name, None)
+            else:
+                params[name] = value
+        if usehistory:
+            # History searches live on the server for a limited time, so they are never cached.
+            params['usehistory'] = 'y'
+            handle = self._request('esearch', db=os.environ['PYENT_DB'], term=term, **params)
+            uid = ez.read(handle)
+            handle.close()
+            return uid
+        key = rc.search_key(os.environ['PYENT_DB'], term, params)
+        raw = self.cache.get(key) if self.cache is not None and cache else None
+        if raw is None:
+            handle = self._request(
+                'esearch',
+                db=os.environ['PYENT_DB'],
+                term=term,
+                **params,
+            )
+            raw = as_bytes(handle.read())
+            handle.close()
+            if self.cache is not None:
+                self.cache.put(key, raw)
+        return ez.read(io.BytesIO(raw))
+
+    def esearch_ids(self, term: str, cache: bool = True, **overrides) -> List[str]:
+        """Returns every UID matching term, not just the first retmax.
+
+        If the query matches more UID's than esearch can page through, it is split into date
+        windows with esearch_split.
+
+        Args:
+            term (str): The term to query in the Entrez database.
+            cache (bool): Serve the searches from the response cache, see esearch.
+            **overrides: esearch params that replace the user's settings, see esearch.
+
+        Returns:
+            List of UID's.
+        """
+        result = self.esearch(term, retmax=ESEARCH_CEILING, retstart=0, cache=cache, **overrides)
+        if int(result['Count']) > ESEARCH_CEILING:
+            return self.esearch_split(term, cache=cache, **overrides)
+        return list(result['IdList'])
+
+    def esearch_split(self, term: str, cache: bool = True, **overrides) -> List[str]:
+        """Retrieves a query larger than ESEARCH_CEILING by splitting it into date windows.
+
+        The query's mindate/maxdate range is searched one window at a time on the datetype
+        setting. Without a mindate the range starts reldate days ago if reldate is set, otherwise
+        at EARLIEST_DATE, and without a maxdate it ends today. Windows that still match more than
+        ESEARCH_CEILING UID's are bisected and searched again. The windows of each round are
+        searched in parallel on the scheduler, within the request budget.
+
+        Args:
+            term (str): The term to query in the Entrez database.
+            cache (bool): Serve the searches from the response cache, see esearch.
+            **overrides: esearch params that replace the user's settings, see esearch.
+
+        Returns:
+            Deduplicated list of UID's from every window.
+        """
+        params = dict(construct_search_params(), **overrides)
+        datetype = params.get('datetype') or 'edat'
+        today = datetime.date.today()
+        start = parse_date(params.get('mindate'))
+        reldate = str(params.get('reldate'))
+        if start is None and reldate.isdigit():
+            start = today - datetime.timedelta(days=int(reldate))
+        windows = [(
+            start or EARLIEST_DATE,
+            parse_date(params.get('maxdate'), end=True) or today,
+        )]
+        ids: Dict[str, None] = {}
+
+        def search_window(window):
+            result = self.esearch(
+                term,
+                cache=cache,
+                **dict(
+                    overrides,
+                    retmax=ESEARCH_CEILING,
+                    retstart=0,
+                    datetype=datetype,
+                    mindate=window[0].strftime(DATE_FORMAT),
+                    maxdate=window[1].strftime(DATE_FORMAT),
+                    reldate=None,
+                ),
+            )
+            return window, int(result['Count']), result['IdList']
+
+        rounds = 0
+        while windows:
+            rounds += 1
+            dense = []
+            for window, count, window_ids in self.scheduler.map(search_window, windows):
+                halves = bisect_window(window)
+                if count > ESEARCH_CEILING and halves is not None:
+                    dense.extend(halves)
+                    continue
+                if count > len(window_ids):
+                    logger.warning(f'{window[0]} matched {count} UIDs in a single day, '
+                                   f'only {len(window_ids)} were retrieved.')
+                ids.update(dict.fromkeys(window_ids))
+            windows = dense
+        logger.debug(f'Split {term!r} into date windows over {rounds} rounds: {len(ids)} UIDs.')
+        return list(ids)
 
     def efetch(self, uid):
         """Comines UID list with user-defined fetch settings to return selected articles.
@@ -72,17 +241,291 @@ class Scraper(object):
         Returns:
             List of article dict's to be passed into a user database
         """
+        return parse_page(self.efetch_ids_raw(uid['IdList']))
+
+    def efetch_ids_raw(self, ids: List[str]) -> str:
+        """Fetches the raw MEDLINE text of the given UID's, serving cached articles from disk.
+
+        Articles are cached one by one, so only UID's missing from the cache are requested.
+        Responses in formats other than MEDLINE text bypass the cache.
+
+        Args:
+            ids (List[str]): UID's to fetch.
+
+        Returns:
+            Raw response text for all UID's, in the order given.
+        """
         params = construct_fetch_params()
-        uid = ','.join(uid['IdList'])
-        handle = ez.efetch(
-            db=os.environ['PYENT_DB'],
-            id=uid,
-            **params,
-        )
-        results = ml.parse(handle)
-        results = list(results)
+        params['retmax'] = len(ids)
+        if (self.cache is None or params.get('rettype') != 'medline'
+                or params.get('retmode') == 'xml'):
+            return self.efetch_raw(id=','.join(ids), **params)
+        db = os.environ['PYENT_DB']
+        keys = {pmid: rc.fetch_key(db, pmid, params.get('rettype'), params.get('retmode'))
+                for pmid in ids}
+        records = {}
+        for pmid, key in keys.items():
+            raw = self.cache.get(key)
+            if raw is not None:
+                records[pmid] = raw.decode('utf-8')
+        missing = [pmid for pmid in ids if pmid not in records]
+        if missing:
+            fetched = split_medline(self.efetch_raw(id=','.join(missing), **params))
+            self.cache.put_many({keys[pmid]: record.encode('utf-8')
+                                 for pmid, record in fetched.items() if pmid in keys})
+            records.update(fetched)
+        logger.debug(f'efetch: {len(ids) - len(missing)} cached, {len(missing)} fetched.')
+        return '\n'.join(records[pmid] for pmid in ids if pmid in records)
+
+    def efetch_raw(self, **params) -> str:
+        """Sends one efetch request and returns the undecoded text of the response.
+
+        Args:
+            **params: Entrez efetch parameters, the database is read from the user's settings.
+
+        Returns:
+            Raw response text, parse it with parse_page.
+        """
+        handle = self._request('efetch', db=os.environ['PYENT_DB'], **params)
+        page = handle.read()
+        handle.close()
+        return page
+
+    def fetch_history_pages(self, search: Dict[str, Any]) -> Iterator[str]:
+        """Walks an esearch result stored on the history server one page at a time.
+
+        Instead of joining every UID into one request, the WebEnv and QueryKey returned by a
+        history esearch are used to request retmax records at a time, advancing retstart until
+        Count records have been returned. Pages are requested concurrently on the scheduler's
+        worker pool within the NCBI request budget, and only a few pages are held in memory.
+        With an adaptive controller, page size and pages in flight follow the controller.
+        History pages are never served from or written to the response cache.
+
+        Args:
+            search (Dict): Result of esearch(term, usehistory=True).
+
+        Yields:
+            Raw response text for each page of retmax records.
+        """
+        params = construct_fetch_params()
+        params['webenv'] = search['WebEnv']
+        params['query_key'] = search['QueryKey']
+        retmax = page_size(params)
+        count = int(search['Count'])
+        if self.controller is not None:
+            yield from self.fetch_adaptive_pages(params, count)
+            return
+        logger.debug(f'Paging {count} records from history in pages of {retmax}.')
+
+        def fetch_page(retstart):
+            return self.efetch_raw(**dict(params, retstart=retstart, retmax=retmax))
+
+        yield from self.scheduler.map(fetch_page, range(0, count, retmax))
+
+    def fetch_adaptive_pages(self, params: Dict[str, Any], count: int) -> Iterator[str]:
+        """Pages through count history records with the controller's page size and concurrency.
+
+        Each page is requested with the page size the controller holds when it is submitted, and
+        no more pages are in flight than the controller's concurrency. Pages are yielded in order.
+        """
+        logger.debug(f'Paging {count} records from history adaptively: {self.controller.stats()}')
+        window: deque = deque()
+        retstart = 0
+        try:
+            while retstart < count or window:
+                while retstart < count and len(window) < self.controller.concurrency:
+                    retmax = self.controller.page_size
+                    window.append(self.scheduler.submit(
+                        self.efetch_raw, **dict(params, retstart=retstart, retmax=retmax),
+                    ))
+                    retstart += retmax
+                yield window.popleft().result()
+        finally:
+            for future in window:
+                future.cancel()
+        logger.debug(f'Adaptive paging done: {self.controller.stats()}')
+
+    def epost(self, ids: List[str]) -> Iterator[Dict[str, Any]]:
+        """Uploads UID's to the Entrez history server, POST_CHUNK at a time.
+
+        Every chunk is posted into the same WebEnv and gets its own QueryKey. Chunks are posted
+        lazily, so the next one is only uploaded once the caller is done with the previous one.
+
+        Args:
+            ids (List[str]): UID's to upload.
+
+        Yields:
+            Dict with the Count, WebEnv and QueryKey of each chunk, the same shape as the result
+            of esearch(term, usehistory=True).
+        """
+        params = construct_post_params()
+        for start in range(0, len(ids), POST_CHUNK):
+            chunk = ids[start:start + POST_CHUNK]
+            handle = self._request(
+                'epost', db=os.environ['PYENT_DB'], id=','.join(chunk), **params,
+            )
+            posted = ez.read(handle)
+            handle.close()
+            params['webenv'] = posted['WebEnv']
+            logger.debug(f'Posted {len(chunk)} UIDs as query_key {posted["QueryKey"]}.')
+            yield {'Count': str(len(chunk)), 'WebEnv': posted['WebEnv'],
+                   'QueryKey': posted['QueryKey']}
+
+    def fetch_posted_pages(self, ids: List[str]) -> Iterator[str]:
+        """Uploads UID's with epost and pages through them on the history server.
+
+        Args:
+            ids (List[str]): UID's to fetch.
+
+        Yields:
+            Raw response text for each page of retmax records.
+        """
+        for search in self.epost(ids):
+            yield from self.fetch_history_pages(search)
+
+    def fetch_id_pages(self, ids: List[str]) -> Iterator[str]:
+        """Fetches a list of UID's retmax at a time on the scheduler's worker pool.
+
+        Lists longer than POST_THRESHOLD are uploaded with epost and fetched from the history
+        server, which keeps UID's out of the request URL. Shorter lists are fetched by UID so
+        cached articles are served from disk.
+
+        Args:
+            ids (List[str]): UID's to fetch.
+
+        Yields:
+            Raw response text for each page of retmax UID's.
+        """
+        if len(ids) > POST_THRESHOLD:
+            yield from self.fetch_posted_pages(ids)
+            return
+        retmax = page_size(construct_fetch_params())
+        pages = [ids[start:start + retmax] for start in range(0, len(ids), retmax)]
+        yield from self.scheduler.map(self.efetch_ids_raw, pages)
+
+    def esummary_raw(self, **params) -> bytes:
+        """Sends one esummary request and returns the XML body of the response.
+
+        Args:
+            **params: Entrez esummary parameters added to the user's summary settings.
+
+        Returns:
+            Raw XML, parse it with parse_summary.
+        """
+        params = dict(construct_summary_params(), **params)
+        params.pop('rettype', None)
+        params['retmode'] = 'xml'
+        handle = self._request('esummary', db=os.environ['PYENT_DB'], **params)
+        page = as_bytes(handle.read())
         handle.close()
-        return results
+        return page
+
+    def fetch_summary_pages(self, term: str) -> Iterator[bytes]:
+        """Runs a query and yields eSummary document summaries instead of full records.
+
+        Follows the same paths as fetch_pages: with usehistory on, the search is paged through
+        the history server SUMMARY_PAGE summaries at a time, otherwise the first retmax UID's of
+        the search are summarized in a single request.
+
+        Args:
+            term (str): The term to query in the Entrez database.
+
+        Yields:
+            Raw eSummary XML, parse it with parse_summary.
+        """
+        if not use_history():
+            uid = self.esearch(term)
+            if uid['IdList']:
+                yield self.esummary_raw(id=','.join(uid['IdList']))
+            return
+        for search in self.history_searches(term):
+
+            def fetch_page(retstart, search=search):
+                return self.esummary_raw(
+                    webenv=search['WebEnv'],
+                    query_key=search['QueryKey'],
+                    retstart=retstart,
+                    retmax=SUMMARY_PAGE,
+                )
+
+            yield from self.scheduler.map(fetch_page, range(0, int(search['Count']), SUMMARY_PAGE))
+
+    def history_searches(self, term: str) -> Iterator[Dict[str, Any]]:
+        """Posts a query to the history server, split into date windows if it is too large.
+
+        Yields:
+            One history search for the whole query, or one posted UID chunk per epost request
+            if the query matches more than ESEARCH_CEILING UID's.
+        """
+        search = self.esearch(term, usehistory=True)
+        if int(search['Count']) > ESEARCH_CEILING:
+            yield from self.epost(self.esearch_split(term))
+        else:
+            yield search
+
+    def efetch_history(self, search: Dict[str, Any]) -> Iterator[List[Any]]:
+        """Parsed version of fetch_history_pages.
+
+        Args:
+            search (Dict): Result of esearch(term, usehistory=True).
+
+        Yields:
+            List of article dicts for each page of retmax records.
+        """
+        for page in self.fetch_history_pages(search):
+            yield parse_page(page)
+
+    def fetch_pages(self, term: str) -> Iterator[str]:
+        """Runs a query and yields the raw text of its articles page by page.
+
+        If the usehistory setting is on, the search is posted to the history server and
+        streamed with fetch_history_pages. Queries too large to page through the history server
+        are split into date windows and their UID's posted back with epost. Otherwise the
+        classic esearch/efetch pair is run and the result is yielded as a single page.
+
+        Args:
+            term (str): The term to query in the Entrez database.
+
+        Yields:
+            Raw response text, parse it with parse_page.
+        """
+        if use_history():
+            for search in self.history_searches(term):
+                yield from self.fetch_history_pages(search)
+        else:
+            uid = self.esearch(term)
+            yield self.efetch_ids_raw(uid['IdList'])
+
+    def fetch_batches(self, term: str) -> Iterator[List[Any]]:
+        """Runs a query and yields its articles batch by batch.
+
+        Args:
+            term (str): The term to query in the Entrez database.
+
+        Yields:
+            List of article dicts, ready to be passed to a user database.
+        """
+        for page in self.fetch_pages(term):
+            yield parse_page(page)
+
+    def einfo(self, **params):
+        """Returns the einfo handle listing the databases, or describing the db param."""
+        params.setdefault('email', os.environ.get('PYENT_EMAIL'))
+        return self._request('einfo', **params)
+
+    def refresh_catalog(self) -> None:
+        """Refresh stale einfo entries of the database list and the user's db setting."""
+        self.catalog.refresh(os.environ.get('PYENT_DB', 'pubmed'))
+
+    def _request(self, utility: str, **params):
+        """Single exit point for Entrez traffic, returns the handle of the named E-utility.
+
+        Requests are throttled by the scheduler's token bucket, whichever thread sends them, and
+        reuse the keep-alive connections of the session.
+        """
+        if self.session is None:
+            return self.scheduler.call(getattr(ez, utility), label=utility, **params)
+        return self.scheduler.call(self.session.request, utility, label=utility, **params)
 
 
 def construct_search_params():
@@ -108,24 +551,159 @@ def construct_fetch_params():
     """
     params = {}
     for setting in ev.settings_eFetch:
-        if os.environ.get(setting[1]):
+        if os.environ.get(setting[1]) not in (None, 'None'):
+            params.update({setting[0].lower(): os.environ.get(setting[1])})
+    return params
+
+
+def construct_post_params():
+    """Iterates through user-defined Entrez Post settings to assemble the post parameters."""
+    params = {}
+    for setting in ev.settings_ePost:
+        if os.environ.get(setting[1]) not in (None, 'None'):
             params.update({setting[0].lower(): os.environ.get(setting[1])})
     return params
 
 
+def construct_summary_params():
+    """Iterates through user-defined Entrez Summary settings to assemble the summary parameters."""
+    params = {}
+    for setting in ev.settings_eSummary:
+        if os.environ.get(setting[1]) not in (None, 'None'):
+            params.update({setting[0].lower(): os.environ.get(setting[1])})
+    return params
+
+
+def read_ids(path) -> List[str]:
+    """Reads UID's from a file, separated by whitespace or commas, dropping duplicates."""
+    with open(path) as file_in:
+        tokens = file_in.read().replace(',', ' ').split()
+    return list(dict.fromkeys(token for token in tokens if token.isdigit()))
+
+
+def parse_page(page) -> List[Any]:
+    """Parses the raw text of one efetch response into a list of article dicts."""
+    return list(iter_page(page))
+
+
+def iter_page(page) -> Iterator[Any]:
+    """Yields the article dicts of one efetch response one at a time.
+
+    Responses fetched with retmode=xml are parsed incrementally with pubmed_xml, everything
+    else is parsed as MEDLINE text with pyentrez's own MEDLINE parser.
+    """
+    if is_xml(page):
+        yield from pubmed_xml.iter_articles(page)
+        return
+    yield from medline.iter_records(page)
+
+
+def is_xml(page) -> bool:
+    """Returns True if a raw response is XML rather than MEDLINE text."""
+    head = page[:64].lstrip()
+    return head.startswith(b'<' if isinstance(head, bytes) else '<')
+
+
+def parse_summary(page) -> List[Dict[str, Any]]:
+    """Parses one esummary response into compact article dicts.
+
+    Summaries use the MEDLINE keys of the fields they share with full records, so they can be
+    listed like any other article, and are flagged with summary=True until the full record is
+    fetched.
+    """
+    summaries = []
+    for docsum in ez.read(io.BytesIO(as_bytes(page))):
+        summaries.append({
+            'PMID': str(docsum['Id']),
+            'TI': str(docsum.get('Title', '')),
+            'JT': str(docsum.get('FullJournalName', '')),
+            'TA': str(docsum.get('Source', '')),
+            'DP': str(docsum.get('PubDate', '')),
+            'AU': [str(author) for author in docsum.get('AuthorList', [])],
+            'summary': True,
+        })
+    return summaries
+
+
+def split_medline(page) -> Dict[str, str]:
+    """Splits raw MEDLINE text into the text of each record, keyed on PMID."""
+    if isinstance(page, bytes):
+        page = page.decode('utf-8')
+    records = {}
+    for record in page.replace('\r\n', '\n').split('\n\n'):
+        for line in record.splitlines():
+            if line.startswith('PMID-'):
+                records[line[6:].strip()] = record.strip('\n') + '\n'
+                break
+    return records
+
+
+def as_bytes(data) -> bytes:
+    """Returns the body of a response as bytes, whether the handle was text or binary."""
+    return data.encode('utf-8') if isinstance(data, str) else data
+
+
+def parse_date(date: Optional[str], end: bool = False) -> Optional[datetime.date]:
+    """Parses an Entrez YYYY, YYYY/MM or YYYY/MM/DD date.
+
+    Args:
+        date (str): Date in one of the Entrez formats, or None.
+        end (bool): Resolve partial dates to the last day of the period instead of the first.
+
+    Returns:
+        The date, or None if date is unset.
+    """
+    if date in (None, '', 'None'):
+        return None
+    parts = [int(part) for part in str(date).split('/')]
+    year = parts[0]
+    month = parts[1] if len(parts) > 1 else (12 if end else 1)
+    if len(parts) > 2:
+        return datetime.date(year, month, parts[2])
+    if not end:
+        return datetime.date(year, month, 1)
+    following = datetime.date(year + month // 12, month % 12 + 1, 1)
+    return following - datetime.timedelta(days=1)
+
+
+def bisect_window(
+    window: Tuple[datetime.date, datetime.date],
+) -> Optional[List[Tuple[datetime.date, datetime.date]]]:
+    """Splits a date window into two halves, or returns None for a single day."""
+    start, end = window
+    if start >= end:
+        return None
+    middle = start + (end - start) // 2
+    return [(start, middle), (middle + datetime.timedelta(days=1), end)]
+
+
+def summary_mode() -> bool:
+    """Returns True if the fetchmode setting asks for eSummary listings instead of full records."""
+    return os.environ.get('PYENT_FETCHMODE', 'None').lower() == 'summary'
+
+
+def use_history() -> bool:
+    """Returns True if the user has turned on the Entrez history server."""
+    return os.environ.get('PYENT_USEHISTORY', 'None').lower() in ('y', 'yes', 'true')
+
+
+def page_size(params: Dict[str, Any], default: int = 20) -> int:
+    """Returns the retmax page size held in params, or default if it is unset or invalid."""
+    retmax = str(params.get('retmax', ''))
+    return int(retmax) if retmax.isdigit() and int(retmax) > 0 else default
+
+
 def define_db(db_name: str):
-    """Returns info and parameters expected by the requested Entrez DB."""
+    """Returns the description, fields and links of the requested Entrez DB.
+
+    The entry comes from the einfo catalog in the user's workspace and is only requested from
+    einfo when it is missing or older than the einfottl setting.
+    """
     ez.email = os.environ['PYENT_EMAIL']
-    handle = ez.read(db=db_name)
-    record = ez.read(handle)
-    handle.close()
-    return record
+    return ec.from_settings(einfo=ez.einfo).database(db_name)
 
 
 def update_db_list():
-    """Returns available Entrez DB's."""
+    """Returns available Entrez DB's, from the einfo catalog unless it is stale."""
     ez.email = os.environ['PYENT_EMAIL']
-    handle = ez.einfo()
-    record = ez.read(handle)
-    handle.close()
-    return record
+    return ec.from_settings(einfo=ez.einfo).databases()
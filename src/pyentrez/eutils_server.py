@@ -0,0 +1,413 @@
+"""Local stand-in for the NCBI E-utilities, for load testing without NCBI.
+
+This module:
+    - serves esearch, efetch, epost, esummary and einfo for the pubmed database over a corpus of
+      synthetic MEDLINE records or of records imported from PubMed baseline/update files
+    - keeps a history server: usehistory searches and ePost uploads get a WebEnv and QueryKey
+      that efetch and esummary page through with retstart/retmax
+    - filters esearch on the words of the term and on mindate/maxdate, so queries larger than
+      the esearch ceiling are split into date windows the way they are against NCBI
+    - answers with HTTP 429 when more requests per second arrive than the configured rate, and
+      can add a fixed processing latency to every request
+    - speaks HTTP/1.1 keep-alive and gzip, like eutils.ncbi.nlm.nih.gov
+
+Point pyentrez at it with the eutils setting, or run pyentrez.load_test against it. Start it
+with:
+    python -m pyentrez.eutils_server [--records N | --corpus DIR] [--port PORT] [--rate RPS]
+"""
+import argparse
+import collections
+import datetime
+import gzip
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+import attr
+from loguru import logger
+
+from pyentrez import bulk_import as BULK
+from pyentrez.parsers import benchmark, medline
+
+DEFAULT_RECORDS = 20000
+FIRST_DATE = datetime.date(2000, 1, 1)
+MONTHS = {month: number for number, month in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1,
+)}
+XML_HEAD = '<?xml version="1.0" encoding="UTF-8" ?>\n'
+DOCTYPES = {
+    'esearch': '<!DOCTYPE eSearchResult PUBLIC "-//NLM//DTD esearch 20060628//EN" '
+               '"https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20060628/esearch.dtd">\n',
+    'epost': '<!DOCTYPE ePostResult PUBLIC "-//NLM//DTD epost 20090526//EN" '
+             '"https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20090526/epost.dtd">\n',
+    'esummary': '<!DOCTYPE eSummaryResult PUBLIC "-//NLM//DTD esummary v1 20041029//EN" '
+                '"https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20041029/esummary-v1.dtd">\n',
+    'einfo': '<!DOCTYPE eInfoResult PUBLIC "-//NLM//DTD einfo 20190110//EN" '
+             '"https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20190110/einfo.dtd">\n',
+}
+FIELDS = (
+    ('ALL', 'All Fields', 'N'), ('UID', 'UID', 'N'), ('TITL', 'Title', 'N'),
+    ('TIAB', 'Title/Abstract', 'N'), ('EDAT', 'Entry Date', 'Y'),
+    ('PDAT', 'Publication Date', 'Y'), ('MDAT', 'Modification Date', 'Y'),
+)
+_WORD = re.compile(r'[a-z0-9]+')
+_STOP_WORDS = frozenset(('and', 'or', 'not', 'all', 'sb'))
+_TEXT_KEYS = ('TI', 'AB', 'MH', 'OT')
+
+
+def record_date(record: Dict[str, Any]) -> datetime.date:
+    """Date of a record from its DP value, the first day of the month or year if incomplete."""
+    parts = str(record.get('DP', '')).split()
+    year = int(parts[0][:4]) if parts and parts[0][:4].isdigit() else FIRST_DATE.year
+    month = MONTHS.get(parts[1][:3], 1) if len(parts) > 1 else 1
+    day = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 1
+    return datetime.date(year, month, min(day, 28))
+
+
+def medline_text(record: Dict[str, Any]) -> str:
+    """MEDLINE text of a record dict, leaving out the structured keys of the XML parser."""
+    lines = benchmark.medline_lines('PMID', record['PMID'])
+    for tag, value in record.items():
+        if tag == 'PMID' or len(tag) > 4 or not tag.isupper():
+            continue
+        for item in (value if isinstance(value, list) else [value]):
+            if isinstance(item, str):
+                lines += benchmark.medline_lines(tag, item)
+    return '\n'.join(lines) + '\n'
+
+
+def synthetic_corpus(records: int = DEFAULT_RECORDS) -> List[Dict[str, Any]]:
+    """Records built from the articles of test_data.json, a week apart from FIRST_DATE."""
+    corpus = list(medline.iter_records(benchmark.make_corpus(records)))
+    for number, record in enumerate(corpus):
+        day = FIRST_DATE + datetime.timedelta(days=(number * 7) % 7300)
+        record['DP'] = day.strftime('%Y %b %d')
+    return corpus
+
+
+def imported_corpus(directory: Path) -> List[Dict[str, Any]]:
+    """Records of the PubMed baseline/update files in directory."""
+    corpus: List[Dict[str, Any]] = []
+    for path in BULK.find_files(directory):
+        corpus.extend(BULK.parse_file(path)[1])
+    return corpus
+
+
+@attr.s
+class Corpus(object):
+    """Records served by the stand-in, with a word index for esearch.
+
+    Attributes:
+        records (List[Dict]): Article dicts with MEDLINE keys.
+    """
+
+    records: List[Dict[str, Any]] = attr.ib()
+    by_pmid: Dict[str, Dict[str, Any]] = attr.ib(init=False, factory=dict)
+    dates: Dict[str, datetime.date] = attr.ib(init=False, factory=dict)
+    words: Dict[str, set] = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        self.words = collections.defaultdict(set)
+        for record in self.records:
+            pmid = record['PMID']
+            self.by_pmid[pmid] = record
+            self.dates[pmid] = record_date(record)
+            for tag in _TEXT_KEYS:
+                values = record.get(tag, [])
+                for value in (values if isinstance(values, list) else [values]):
+                    for word in _WORD.findall(str(value).lower()):
+                        self.words[word].add(pmid)
+
+    def search(self, term: str, mindate: Optional[str] = None,
+               maxdate: Optional[str] = None) -> List[str]:
+        """PMIDs whose text holds every word of term within the date range, newest first.
+
+        Field tags such as [tiab] and the boolean operators of the term are ignored, and a
+        term without words matches every record.
+        """
+        term = re.sub(r'\[[^\]]*\]', ' ', term.lower())
+        words = [word for word in _WORD.findall(term) if word not in _STOP_WORDS]
+        if words:
+            found = set.intersection(*(self.words.get(word, set()) for word in words))
+        else:
+            found = set(self.by_pmid)
+        first = parse_day(mindate) or datetime.date.min
+        last = parse_day(maxdate) or datetime.date.max
+        hits = [pmid for pmid in found if first <= self.dates[pmid] <= last]
+        return sorted(hits, key=lambda pmid: (self.dates[pmid], pmid), reverse=True)
+
+
+def parse_day(value: Optional[str]) -> Optional[datetime.date]:
+    """Parses a YYYY, YYYY/MM or YYYY/MM/DD esearch date."""
+    if not value:
+        return None
+    parts = [int(part) for part in value.split('/')]
+    return datetime.date(*(parts + [1] * (3 - len(parts))))
+
+
+class EutilsError(Exception):
+    """Error answered with an HTTP status by the stand-in."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@attr.s
+class EutilsServer(object):
+    """Threaded HTTP server answering E-utility requests from a Corpus.
+
+    Attributes:
+        corpus (Corpus): Records served.
+        host (str): Interface to listen on.
+        port (int): Port to listen on, 0 for any free port.
+        rate (float): Requests per second answered before HTTP 429, 0 for no limit.
+        latency (float): Seconds added to every response.
+    """
+
+    corpus: Corpus = attr.ib()
+    host: str = attr.ib(default='127.0.0.1')
+    port: int = attr.ib(default=0)
+    rate: float = attr.ib(default=0.0)
+    latency: float = attr.ib(default=0.0)
+    history: Dict[str, Dict[str, List[str]]] = attr.ib(init=False, factory=dict)
+    requests: Any = attr.ib(init=False, factory=collections.Counter)
+    recent: Any = attr.ib(init=False, factory=collections.deque)
+    counter: Any = attr.ib(init=False, factory=itertools.count)
+    lock: Any = attr.ib(init=False, factory=threading.Lock)
+    httpd: Any = attr.ib(init=False, default=None)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.httpd.server_address[1]}/entrez/eutils/'
+
+    def start(self) -> str:
+        """Serve on a background thread, returning the base URL of the E-utilities."""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), handler(self))
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        logger.info(f'E-utilities stand-in serving {len(self.corpus.records)} records at '
+                    f'{self.base_url}')
+        return self.base_url
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def answer(self, utility: str, params: Dict[str, str]) -> Tuple[str, str]:
+        """Content type and body of the response to one request.
+
+        Raises:
+            EutilsError: For throttled, unknown or invalid requests.
+        """
+        if self.throttled():
+            with self.lock:
+                self.requests['throttled'] += 1
+            raise EutilsError(429, json.dumps({'error': 'API rate limit exceeded'}))
+        with self.lock:
+            self.requests[utility] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        method = getattr(self, f'_{utility}', None)
+        if method is None:
+            raise EutilsError(404, f'Unknown E-utility {utility}')
+        if utility != 'einfo' and params.get('db', 'pubmed') != 'pubmed':
+            raise EutilsError(400, f'Database {params["db"]} is not served by the stand-in')
+        return method(params)
+
+    def throttled(self) -> bool:
+        """Records a request and returns True if it exceeds rate in the last second."""
+        if not self.rate:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and now - self.recent[0] >= 1:
+                self.recent.popleft()
+            if len(self.recent) >= self.rate:
+                return True
+            self.recent.append(now)
+        return False
+
+    def _esearch(self, params):
+        ids = self.corpus.search(params.get('term', ''), params.get('mindate'),
+                                 params.get('maxdate'))
+        retstart, retmax = paging(params)
+        history = ''
+        if params.get('usehistory') == 'y':
+            webenv, query_key = self.store(params.get('webenv'), ids)
+            history = f'<QueryKey>{query_key}</QueryKey><WebEnv>{webenv}</WebEnv>'
+        id_list = ''.join(f'<Id>{pmid}</Id>' for pmid in ids[retstart:retstart + retmax])
+        return 'text/xml', (
+            f'{XML_HEAD}{DOCTYPES["esearch"]}<eSearchResult><Count>{len(ids)}</Count>'
+            f'<RetMax>{len(ids[retstart:retstart + retmax])}</RetMax>'
+            f'<RetStart>{retstart}</RetStart>{history}<IdList>{id_list}</IdList>'
+            '<TranslationSet/><QueryTranslation/></eSearchResult>'
+        )
+
+    def _epost(self, params):
+        ids = [pmid for pmid in params.get('id', '').split(',') if pmid]
+        if not ids:
+            raise EutilsError(400, 'Empty id list')
+        webenv, query_key = self.store(params.get('webenv'), ids)
+        return 'text/xml', (
+            f'{XML_HEAD}{DOCTYPES["epost"]}<ePostResult><QueryKey>{query_key}</QueryKey>'
+            f'<WebEnv>{webenv}</WebEnv></ePostResult>'
+        )
+
+    def _efetch(self, params):
+        if params.get('retmode') == 'xml' or params.get('rettype', 'medline') != 'medline':
+            raise EutilsError(400, 'The stand-in only serves rettype=medline, retmode=text')
+        records = self.requested(params)
+        return 'text/plain', '\n'.join(medline_text(record) for record in records)
+
+    def _esummary(self, params):
+        docsums = []
+        for record in self.requested(params):
+            authors = ''.join(
+                f'<Item Name="Author" Type="String">{escape(author)}</Item>'
+                for author in record.get('AU', [])
+            )
+            docsums.append(
+                f'<DocSum><Id>{record["PMID"]}</Id>'
+                f'<Item Name="PubDate" Type="Date">{escape(record.get("DP", ""))}</Item>'
+                f'<Item Name="Source" Type="String">{escape(record.get("TA", ""))}</Item>'
+                f'<Item Name="AuthorList" Type="List">{authors}</Item>'
+                f'<Item Name="Title" Type="String">{escape(record.get("TI", ""))}</Item>'
+                '<Item Name="FullJournalName" Type="String">'
+                f'{escape(record.get("JT", ""))}</Item></DocSum>'
+            )
+        return 'text/xml', (
+            f'{XML_HEAD}{DOCTYPES["esummary"]}<eSummaryResult>{"".join(docsums)}'
+            '</eSummaryResult>'
+        )
+
+    def _einfo(self, params):
+        if 'db' not in params:
+            return 'text/xml', (
+                f'{XML_HEAD}{DOCTYPES["einfo"]}<eInfoResult><DbList><DbName>pubmed</DbName>'
+                '</DbList></eInfoResult>'
+            )
+        if params['db'] != 'pubmed':
+            raise EutilsError(400, f'Database {params["db"]} is not served by the stand-in')
+        fields = ''.join(
+            f'<Field><Name>{name}</Name><FullName>{full}</FullName><Description>{full}'
+            f'</Description><TermCount>0</TermCount><IsDate>{date}</IsDate>'
+            '<IsNumerical>N</IsNumerical><SingleToken>N</SingleToken><Hierarchy>N</Hierarchy>'
+            '<IsHidden>N</IsHidden></Field>'
+            for name, full, date in FIELDS
+        )
+        return 'text/xml', (
+            f'{XML_HEAD}{DOCTYPES["einfo"]}<eInfoResult><DbInfo><DbName>pubmed</DbName>'
+            '<MenuName>PubMed</MenuName><Description>PubMed stand-in</Description>'
+            f'<DbBuild>standin</DbBuild><Count>{len(self.corpus.records)}</Count>'
+            '<LastUpdate>2000/01/01 00:00</LastUpdate>'
+            f'<FieldList>{fields}</FieldList><LinkList/></DbInfo></eInfoResult>'
+        )
+
+    def store(self, webenv: Optional[str], ids: List[str]) -> Tuple[str, int]:
+        """Adds ids to the history server, in webenv if it exists, returning its keys."""
+        with self.lock:
+            if webenv not in self.history:
+                webenv = f'MCID_STANDIN_{next(self.counter)}'
+                self.history[webenv] = {}
+            query_key = len(self.history[webenv]) + 1
+            self.history[webenv][str(query_key)] = ids
+        return webenv, query_key
+
+    def requested(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Records named by the id param, or by WebEnv/query_key and retstart/retmax."""
+        if params.get('id'):
+            ids = params['id'].split(',')
+        else:
+            search = self.history.get(params.get('webenv', ''), {})
+            if params.get('query_key') not in search:
+                raise EutilsError(400, 'Unknown WebEnv or query_key')
+            retstart, retmax = paging(params)
+            ids = search[params['query_key']][retstart:retstart + retmax]
+        return [self.corpus.by_pmid[pmid] for pmid in ids if pmid in self.corpus.by_pmid]
+
+    def stats(self) -> Dict[str, int]:
+        """Requests answered per E-utility and requests throttled."""
+        with self.lock:
+            return dict(self.requests)
+
+
+def paging(params: Dict[str, str]) -> Tuple[int, int]:
+    """retstart and retmax of a request, with NCBI's defaults of 0 and 20."""
+    return int(params.get('retstart', 0)), int(params.get('retmax', 20))
+
+
+def handler(server: EutilsServer) -> Any:
+    """Request handler class answering from server."""
+
+    class EutilsHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            self.respond(urlsplit(self.path).query)
+
+        def do_POST(self):
+            self.respond(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode())
+
+        def respond(self, query):
+            utility = urlsplit(self.path).path.rsplit('/', 1)[-1].replace('.fcgi', '')
+            params = {name.lower(): values[-1] for name, values in parse_qs(query).items()}
+            try:
+                content_type, text = server.answer(utility, params)
+                status = 200
+            except EutilsError as exc:
+                status, content_type, text = exc.status, 'text/plain', str(exc)
+            except (KeyError, ValueError) as exc:
+                status, content_type, text = 400, 'text/plain', f'Invalid request: {exc}'
+            body = text.encode('utf-8')
+            self.send_response(status)
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                body = gzip.compress(body, compresslevel=1)
+                self.send_header('Content-Encoding', 'gzip')
+            if status == 429:
+                self.send_header('Retry-After', '1')
+            self.send_header('Content-Type', f'{content_type}; charset=UTF-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return EutilsHandler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=DEFAULT_RECORDS,
+                        help='Number of synthetic records served.')
+    parser.add_argument('--corpus', metavar='DIR',
+                        help='Serve the records of the PubMed .xml.gz files in DIR instead.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='Requests per second before HTTP 429, 0 for no limit.')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds added to every response.')
+    args = parser.parse_args(argv)
+    records = imported_corpus(Path(args.corpus)) if args.corpus else synthetic_corpus(args.records)
+    server = EutilsServer(Corpus(records), host=args.host, port=args.port, rate=args.rate,
+                          latency=args.latency)
+    print(f'Serving {len(records)} records at {server.start()}, Ctrl-C to stop.')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -17,3 +17,8 @@ class ExecutionError(PyEntrezException):
 class CleanExit(PyEntrezException):
     """Exception raised when app should exit normally."""
     pass
+
+
+class CassetteMiss(PyEntrezException):
+    """Exception raised when a replayed cassette has no response for a request."""
+    pass
@@ -0,0 +1,207 @@
+"""Rate-limited scheduler for concurrent Entrez requests.
+
+This module:
+    - provides a thread-safe token bucket that enforces NCBI's request budget
+    - runs page requests on a worker pool while every request draws from the bucket
+    - tracks per-request latency and queue depth so fetches can be monitored and tuned
+
+NCBI allows 3 requests per second without an API key and 10 requests per second with one.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Tuple
+
+import attr
+from loguru import logger
+
+ANONYMOUS_RATE = 3.0
+API_KEY_RATE = 10.0
+DEFAULT_WORKERS = 3
+
+
+@attr.s
+class TokenBucket(object):
+    """Thread-safe token bucket, acquire blocks until a request may be sent.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Largest burst allowed, defaults to a single request.
+    """
+
+    rate: float = attr.ib()
+    capacity: float = attr.ib(default=1.0)
+    tokens: float = attr.ib(init=False)
+    last: float = attr.ib(init=False, factory=time.monotonic)
+    lock: Any = attr.ib(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self):
+        self.tokens = self.capacity
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available.
+
+        Returns:
+            Seconds spent waiting for the token.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+@attr.s
+class FetchScheduler(object):
+    """Runs Entrez requests on a worker pool without exceeding the request budget.
+
+    Every request, whether it is sent from the pool or from the calling thread, goes through call,
+    which draws a token from the bucket and records the request latency.
+
+    Attributes:
+        rate (float): Requests per second allowed by NCBI.
+        workers (int): Size of the worker pool.
+        history (int): Number of recent latencies kept for stats.
+    """
+
+    rate: float = attr.ib(default=ANONYMOUS_RATE)
+    workers: int = attr.ib(default=DEFAULT_WORKERS)
+    history: int = attr.ib(default=1000)
+    bucket: TokenBucket = attr.ib(init=False)
+    executor: Any = attr.ib(init=False, default=None)
+    latencies: Deque[Tuple[str, float]] = attr.ib(init=False)
+    queued: int = attr.ib(init=False, default=0)
+    requests: int = attr.ib(init=False, default=0)
+    lock: Any = attr.ib(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self):
+        self.bucket = TokenBucket(self.rate)
+        self.latencies = deque(maxlen=self.history)
+
+    def call(self, fn: Callable[..., Any], *args, label: str = '', **kwargs) -> Any:
+        """Send one request from the current thread once the bucket allows it.
+
+        Args:
+            fn (Callable): Function performing the request.
+            *args: Positional arguments for fn.
+            label (str): Name the latency is recorded under, usually the E-utility.
+            **kwargs: Keyword arguments for fn.
+
+        Returns:
+            Whatever fn returns.
+        """
+        self.bucket.acquire()
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.latencies.append((label or getattr(fn, '__name__', 'request'), elapsed))
+                self.requests += 1
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue fn on the worker pool.
+
+        fn is expected to send its requests through call, so it is throttled with everything else.
+
+        Returns:
+            Future holding the result of fn.
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='pyentrez-fetch',
+            )
+        with self.lock:
+            self.queued += 1
+        return self.executor.submit(self._run, fn, *args, **kwargs)
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[Any]:
+        """Apply fn to items on the worker pool, yielding results in order.
+
+        At most two tasks per worker are in flight, so results that the consumer has not reached
+        yet do not pile up in memory.
+
+        Args:
+            fn (Callable): Function applied to each item.
+            items (Iterable): Items to process.
+
+        Yields:
+            fn(item) for each item, in the order of items.
+        """
+        window: Deque[Future] = deque()
+        items = iter(items)
+        try:
+            for item in items:
+                window.append(self.submit(fn, item))
+                if len(window) >= self.workers * 2:
+                    yield window.popleft().result()
+            while window:
+                yield window.popleft().result()
+        finally:
+            for future in window:
+                future.cancel()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted tasks that have not started running yet."""
+        return self.queued
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary of recent request latencies and the current queue depth."""
+        with self.lock:
+            recent = sorted(latency for _, latency in self.latencies)
+            requests = self.requests
+        stats: Dict[str, Any] = {
+            'requests': requests,
+            'queue_depth': self.queue_depth,
+            'rate': self.rate,
+            'workers': self.workers,
+        }
+        if recent:
+            stats.update({
+                'mean_latency': sum(recent) / len(recent),
+                'p95_latency': recent[int(0.95 * (len(recent) - 1))],
+                'max_latency': recent[-1],
+            })
+        return stats
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, waiting for running tasks."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        logger.debug(f'Fetch scheduler stats: {self.stats()}')
+
+    def _run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self.lock:
+            self.queued -= 1
+        return fn(*args, **kwargs)
+
+
+def has_api_key() -> bool:
+    """Returns True if the user has set an NCBI API key."""
+    return os.environ.get('PYENT_APIKEY', 'None') not in ('', 'None')
+
+
+def request_rate() -> float:
+    """Requests per second NCBI allows for the current settings."""
+    return API_KEY_RATE if has_api_key() else ANONYMOUS_RATE
+
+
+def from_settings() -> FetchScheduler:
+    """Build a FetchScheduler using the user's API key and worker settings."""
+    workers = os.environ.get('PYENT_WORKERS', 'None')
+    return FetchScheduler(
+        rate=request_rate(),
+        workers=int(workers) if workers.isdigit() and int(workers) > 0 else DEFAULT_WORKERS,
+    )
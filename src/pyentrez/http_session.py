@@ -0,0 +1,220 @@
+"""Pooled keep-alive HTTP session for the Entrez E-utilities.
+
+This module:
+    - keeps one persistent connection to the E-utilities host per worker thread, so paged
+      downloads pay the TCP and TLS handshake once per thread instead of once per request
+    - asks for gzip transfer encoding and decompresses responses
+    - builds requests the way Biopython does: GET for short queries, POST for ePost, long
+      parameter strings and more than 200 UID's
+    - retries transient failures, including HTTP 429 and 5xx responses, with a short backoff,
+      drawing another token from the request budget before each retry
+    - counts requests, connections opened and reused, and bytes on the wire versus decoded
+    - records responses to, or replays them from, a cassette (see pyentrez.cassette)
+
+Responses are returned as file-like handles that Bio.Entrez.read and the pyentrez parsers accept,
+text/plain bodies as text handles and everything else as binary, like Biopython's handles.
+"""
+import gzip
+import http.client
+import io
+import os
+import threading
+import time
+import urllib.error
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import attr
+from loguru import logger
+
+from pyentrez import cassette as cs
+
+BASE_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
+TOOL = 'pyentrez'
+# NCBI asks for POST above these sizes.
+MAX_GET_LENGTH = 1000
+MAX_GET_IDS = 200
+RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+
+
+@attr.s
+class EntrezSession(object):
+    """Keep-alive HTTP client shared by every E-utility request of a Scraper.
+
+    Attributes:
+        base_url (str): URL the E-utility scripts live under.
+        timeout (float): Socket timeout in seconds.
+        retries (int): Attempts per request before a transient error is raised.
+        backoff (float): Seconds to wait before the first retry, doubled for every further retry.
+        cassette (Cassette): Cassette that records or replays responses, None to only use the
+            network.
+        observer (Callable): Called with the utility, status (0 for a failed request) and
+            latency of every response, such as AdaptiveController.observe.
+        throttle (Callable): Called before every retry, blocking until it may be sent, such as
+            TokenBucket.acquire. The first attempt is throttled by whoever sends the request.
+    """
+
+    base_url: str = attr.ib(default=BASE_URL)
+    timeout: float = attr.ib(default=60.0)
+    retries: int = attr.ib(default=3)
+    backoff: float = attr.ib(default=1.0)
+    cassette: Any = attr.ib(default=None)
+    observer: Optional[Callable[[str, int, float], None]] = attr.ib(default=None)
+    throttle: Optional[Callable[[], Any]] = attr.ib(default=None)
+    local: Any = attr.ib(init=False, factory=threading.local)
+    connections: List[Any] = attr.ib(init=False, factory=list)
+    counters: Dict[str, int] = attr.ib(init=False)
+    lock: Any = attr.ib(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self):
+        self.counters = dict.fromkeys(
+            ('requests', 'retries', 'opened', 'reused', 'wire_bytes', 'body_bytes'), 0,
+        )
+
+    def request(self, utility: str, **params) -> Any:
+        """Send one E-utility request.
+
+        Args:
+            utility (str): Name of the E-utility, such as esearch or efetch.
+            **params: Its parameters. None values are dropped and lists of UID's are joined.
+
+        Returns:
+            Handle holding the decoded response body.
+
+        Raises:
+            urllib.error.HTTPError: On an error status, after retries for transient ones.
+            OSError: If the host cannot be reached after retries.
+        """
+        method, path, body = self.build(utility, params)
+        for attempt in range(self.retries):
+            start = time.perf_counter()
+            try:
+                status, reason, headers, data = self._exchange(method, path, body)
+            except (http.client.HTTPException, OSError) as exc:
+                self._observe(utility, 0, start)
+                if attempt == self.retries - 1:
+                    raise
+                logger.debug(f'{utility} failed with {exc!r}, retrying.')
+            else:
+                self._observe(utility, status, start)
+                if status < 400:
+                    return as_handle(headers, data)
+                if status not in RETRY_STATUS or attempt == self.retries - 1:
+                    raise urllib.error.HTTPError(
+                        self.base_url + utility, status, reason, headers, io.BytesIO(data),
+                    )
+                logger.debug(f'{utility} returned {status}, retrying.')
+            self._count('retries')
+            time.sleep(self.backoff * 2 ** attempt)
+            if self.throttle is not None:
+                self.throttle()
+
+    def build(self, utility: str, params: Dict[str, Any]) -> Tuple[str, str, str]:
+        """Method, path and body of a request, following Biopython's GET/POST choice."""
+        query: Dict[str, Any] = {'tool': TOOL}
+        for name, value in params.items():
+            if value is None:
+                continue
+            if name == 'id' and isinstance(value, (list, tuple)):
+                value = ','.join(str(uid) for uid in value)
+            query[name] = value
+        encoded = urlencode(query, doseq=True)
+        path = urlsplit(self.base_url).path.rstrip('/') + f'/{utility}.fcgi'
+        ids = str(query.get('id', '')).count(',') + 1
+        if utility == 'epost' or len(encoded) > MAX_GET_LENGTH or ids >= MAX_GET_IDS:
+            return 'POST', path, encoded
+        return 'GET', f'{path}?{encoded}', ''
+
+    def stats(self) -> Dict[str, Any]:
+        """Request and connection counters, with the share of requests on a reused connection."""
+        with self.lock:
+            stats: Dict[str, Any] = dict(self.counters)
+        sent = stats['opened'] + stats['reused']
+        stats['reuse_ratio'] = stats['reused'] / sent if sent else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for connection in connections:
+            connection.close()
+        self.local = threading.local()
+        logger.debug(f'HTTP session stats: {self.stats()}')
+
+    def _observe(self, utility: str, status: int, start: float) -> None:
+        if self.observer is not None:
+            self.observer(utility, status, time.perf_counter() - start)
+
+    def _exchange(self, method: str, path: str, body: str) -> Tuple[int, str, Any, bytes]:
+        if self.cassette is None:
+            return self._send(method, path, body)
+        return self.cassette.play(method, path, body, self._send)
+
+    def _send(self, method: str, path: str, body: str) -> Tuple[int, str, Any, bytes]:
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self._connect()
+        else:
+            self._count('reused')
+        headers = {'Accept-Encoding': 'gzip', 'Connection': 'keep-alive', 'User-Agent': TOOL}
+        if method == 'POST':
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        try:
+            connection.request(method, path, body=body.encode('utf-8') or None, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            self._drop(connection)
+            raise
+        if response.will_close:
+            self._drop(connection)
+        self._count('requests')
+        self._count('wire_bytes', len(data))
+        if response.getheader('Content-Encoding', '').lower() == 'gzip':
+            data = gzip.decompress(data)
+        self._count('body_bytes', len(data))
+        return response.status, response.reason, response.headers, data
+
+    def _connect(self) -> Any:
+        url = urlsplit(self.base_url)
+        if url.scheme == 'https':
+            connection = http.client.HTTPSConnection(url.netloc, timeout=self.timeout)
+        else:
+            connection = http.client.HTTPConnection(url.netloc, timeout=self.timeout)
+        self.local.connection = connection
+        with self.lock:
+            self.connections.append(connection)
+        self._count('opened')
+        return connection
+
+    def _drop(self, connection: Any) -> None:
+        connection.close()
+        self.local.connection = None
+        with self.lock:
+            if connection in self.connections:
+                self.connections.remove(connection)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] += amount
+
+
+def as_handle(headers: Any, data: bytes) -> Any:
+    """Wrap a response body in a handle, text/plain as text like Biopython does."""
+    if headers.get_content_subtype() == 'plain':
+        return io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+    return io.BytesIO(data)
+
+
+def from_settings() -> EntrezSession:
+    """Build the session every Scraper shares its E-utility requests through.
+
+    The session sends its requests to the eutils setting, if it is set, instead of NCBI, and
+    records to or replays from the cassette setting, if it is set.
+    """
+    base_url = os.environ.get('PYENT_EUTILS', 'None')
+    return EntrezSession(
+        base_url=BASE_URL if base_url == 'None' else base_url,
+        cassette=cs.from_settings(),
+    )
@@ -0,0 +1,120 @@
+"""Ingest throughput of pyentrez at several worker counts, against a local E-utilities stand-in.
+
+Each run sends one query through the full download, parse and store pipeline of the history
+mode: esearch (split into date windows and ePosted past the esearch ceiling), paged efetch on a
+pool of workers, MEDLINE parsing and batched writes to a fresh SQLite database. The Scraper's
+rate limit is lifted, so the stand-in's own rate, if any, is the only throttle.
+
+Run with:
+    python -m pyentrez.load_test [--url URL] [--records N] [--workers 1 4 16] [--adaptive]
+
+Without --url an in-process stand-in is started; it shares the interpreter with the client, so
+start python -m pyentrez.eutils_server separately for numbers that matter.
+"""
+import argparse
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pyentrez import adaptive as ad
+from pyentrez import einfo_catalog as ec
+from pyentrez import entrez_scraper as SCRAPE
+from pyentrez import eutils_server as ES
+from pyentrez import fetch_scheduler as fs
+from pyentrez import http_session as hs
+from pyentrez import pipeline as PIPE
+from pyentrez.db import sqlite_entrez as SDB
+
+SETTINGS = {
+    'PYENT_DB': 'pubmed',
+    'PYENT_USEHISTORY': 'y',
+    'PYENT_RETTYPE': 'medline',
+    'PYENT_RETMODE': 'text',
+    'PYENT_DATETYPE': 'edat',
+}
+UNLIMITED = 1000000.0
+
+
+def configure(retmax: int) -> None:
+    """Sets the Entrez settings of a load test run, turning every other setting off."""
+    for _, envar in SCRAPE.ev.settings_eSearch + SCRAPE.ev.settings_eFetch:
+        os.environ[envar] = 'None'
+    os.environ.update(SETTINGS, PYENT_RETMAX=str(retmax))
+
+
+def run(url: str, workers: int, term: str, directory: Path,
+        adaptive: bool = False) -> Dict[str, Any]:
+    """Ingests term with the given number of workers, returning throughput and session stats.
+
+    With adaptive set, the page size starts at the retmax setting and the pages in flight at
+    one, and both follow an AdaptiveController bounded by maxretmax and workers.
+    """
+    session = hs.EntrezSession(base_url=url)
+    scheduler = fs.FetchScheduler(rate=UNLIMITED, workers=workers)
+    controller = None
+    if adaptive:
+        controller = ad.AdaptiveController(
+            scheduler=scheduler, min_page=int(os.environ['PYENT_RETMAX']),
+            max_workers=workers, max_rate=UNLIMITED,
+        )
+    scraper = SCRAPE.Scraper(
+        None, scheduler, None, session, ec.EinfoCatalog(path=None), controller,
+    )
+    db = SDB.SQLiteLoader(path=directory / f'load_{workers}.sqlite')
+    db.initialize()
+    report = PIPE.IngestPipeline(
+        download=scraper.fetch_pages(term),
+        parse=SCRAPE.parse_page,
+        store=db.add_many,
+    ).run()
+    scraper.scheduler.shutdown()
+    session.close()
+    stats = session.stats()
+    return {
+        'workers': workers,
+        'records': report.records,
+        'seconds': report.wall,
+        'records_per_sec': report.records / report.wall if report.wall else 0.0,
+        'requests': stats['requests'],
+        'retries': stats['retries'],
+        'reuse_ratio': stats['reuse_ratio'],
+        'bottleneck': report.bottleneck,
+        'page_size': controller.page_size if controller else int(os.environ['PYENT_RETMAX']),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running stand-in.')
+    parser.add_argument('--records', type=int, default=ES.DEFAULT_RECORDS,
+                        help='Synthetic records of the in-process stand-in.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--retmax', type=int, default=500, help='efetch page size.')
+    parser.add_argument('--term', default='', help='Query, all records by default.')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Let an adaptive controller tune page size and concurrency, '
+                             'starting from --retmax.')
+    args = parser.parse_args(argv)
+    server = None
+    url = args.url
+    if url is None:
+        server = ES.EutilsServer(ES.Corpus(ES.synthetic_corpus(args.records)))
+        url = server.start()
+    configure(args.retmax)
+    print(f'{"workers":>8} {"records":>8} {"seconds":>8} {"rec/s":>9} {"requests":>9} '
+          f'{"retries":>8} {"reuse":>6} {"page":>6}  bottleneck')
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in args.workers:
+            result = run(url, workers, args.term, Path(directory), args.adaptive)
+            print(f'{result["workers"]:>8} {result["records"]:>8} {result["seconds"]:>8.2f} '
+                  f'{result["records_per_sec"]:>9.0f} {result["requests"]:>9} '
+                  f'{result["retries"]:>8} {result["reuse_ratio"]:>6.0%} '
+                  f'{result["page_size"]:>6}  {result["bottleneck"]}')
+    if server is not None:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""Abstracts of the review screen's reader panel.
+
+Opening an article used to read it from the database on the UI thread and wrap its abstract on
+every Enter press. AbstractCache keeps the most recently opened articles with their abstracts
+already wrapped to the reader panel, and a background thread reads the articles around the
+cursor in one query ahead of the user, so moving to a neighbouring article and opening it is
+served from memory, even when the database is a remote cluster.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import attr
+from loguru import logger
+
+# Opened and prefetched articles kept in memory.
+CACHE_SIZE = 256
+# Articles prefetched above and below the cursor.
+NEIGHBOURS = 5
+
+
+@attr.s(auto_attribs=True)
+class Abstract:
+    """A cached article and its abstract wrapped at width."""
+    paper: Tuple[str, str, str]
+    summary: bool
+    text: str
+    width: int
+
+
+@attr.s
+class AbstractCache(object):
+    """LRU cache of articles opened in the reader panel, filled ahead of the cursor.
+
+    Attributes:
+        fetch_many (Callable): Reads (PMID, Abstract, Title, summary) tuples of several PMIDs in
+            one query, such as Storage.get_articles.
+        formatter (StringUtils): Wraps abstracts to the width of the reader panel.
+        size (int): Articles kept before the least recently used are evicted.
+        hits (int): Lookups served from memory.
+        misses (int): Lookups that read the database on the calling thread.
+    """
+
+    fetch_many: Callable[[List[str]], List[Any]] = attr.ib()
+    formatter: Any = attr.ib()
+    size: int = attr.ib(default=CACHE_SIZE)
+    entries: 'OrderedDict[str, Abstract]' = attr.ib(init=False, factory=OrderedDict)
+    hits: int = attr.ib(init=False, default=0)
+    misses: int = attr.ib(init=False, default=0)
+    generation: int = attr.ib(init=False, default=0)
+    executor: Optional[ThreadPoolExecutor] = attr.ib(init=False, default=None)
+    lock: Any = attr.ib(init=False, factory=threading.RLock)
+
+    def get(self, pmid: str) -> Optional[Abstract]:
+        """Cached article, read from the database if it is missing, None if it is not stored.
+
+        An abstract wrapped at another width, such as before the terminal was resized, is
+        wrapped again.
+        """
+        with self.lock:
+            entry = self.entries.get(pmid)
+            if entry is not None:
+                self.entries.move_to_end(pmid)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is None:
+            self.load([pmid])
+            with self.lock:
+                entry = self.entries.get(pmid)
+        if entry is not None and entry.width != self.formatter.wrapp.width:
+            entry.text = self.formatter.format_text(entry.paper[1] or '')
+            entry.width = self.formatter.wrapp.width
+        return entry
+
+    def load(self, pmids: List[str]) -> None:
+        """Read pmids in one query and cache them with their abstracts wrapped."""
+        for pmid, abstract, title, summary in self.fetch_many(pmids):
+            entry = Abstract(
+                paper=(pmid, abstract, title),
+                summary=summary,
+                text=self.formatter.format_text(abstract or ''),
+                width=self.formatter.wrapp.width,
+            )
+            with self.lock:
+                self.entries[pmid] = entry
+                self.entries.move_to_end(pmid)
+                while len(self.entries) > self.size:
+                    self.entries.popitem(last=False)
+
+    def prefetch(self, pmids: Iterable[str]) -> Optional[Future]:
+        """Load the pmids that are not cached yet on the background thread.
+
+        A prefetch that has not started when the next one is requested is dropped, so only the
+        articles around the latest cursor position are read.
+
+        Returns:
+            Future of the background read, None if every PMID is cached.
+        """
+        with self.lock:
+            missing = [pmid for pmid in dict.fromkeys(pmids) if pmid not in self.entries]
+            if not missing:
+                return None
+            self.generation += 1
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1,
+                                                   thread_name_prefix='pyentrez-prefetch')
+            return self.executor.submit(self._prefetch, self.generation, missing)
+
+    def discard(self, pmids: Iterable[str]) -> None:
+        """Drop cached articles that were rewritten in the database."""
+        with self.lock:
+            for pmid in pmids:
+                self.entries.pop(pmid, None)
+
+    def close(self) -> None:
+        """Stop the background thread."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def _prefetch(self, generation: int, pmids: List[str]) -> None:
+        if generation != self.generation:
+            return
+        try:
+            self.load(pmids)
+        except Exception as exc:  # A failed prefetch only means the article is read on open.
+            logger.warning(f'Prefetch of {len(pmids)} articles failed: {exc}')
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,202 @@
+"""Rows of the review screen's article list.
+
+The scroll menu of the review screen shows each title wrapped over several rows, with blank rows
+between titles. ArticleList keeps the PMID of every row next to the rows themselves, so the
+article under the cursor is found by its row index instead of by matching the wrapped text
+against every stored title.
+
+Stored articles are listed lazily: the list starts with one keyset page of titles from the
+database and reads the next page when the cursor comes within a page of its end, so only the
+titles the user has scrolled to are read and wrapped.
+
+Articles written while the list is open are merged into it with merge, from the (PMID, Title)
+tuples the storage backend announces, so the list follows a fetch without reading the database.
+"""
+import heapq
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import attr
+
+# Blank rows between two titles, matching StringUtils.format_article_list.
+SEPARATOR = ['', '']
+# Titles read from the database per page.
+PAGE_SIZE = 200
+
+
+@attr.s
+class ArticleList(object):
+    """Wrapped titles of the review list and the PMID each row belongs to.
+
+    Attributes:
+        wrap (Callable): Wraps one title to the width of the list, such as TextWrapper.fill.
+        titles (Dict[str, str]): Titles keyed on PMID, in list order.
+        lines (List[str]): Rows of the list.
+        rows (List[str]): PMID of each row, None for the blank rows between titles.
+        fetch_page (Callable): Reads a page of titles, such as Storage.get_title_page, None if
+            every article is listed.
+        page_size (int): Titles read per page.
+        paged (bool): True if the list is read with paginate and kept in PMID order.
+        wrapped (Dict[str, List[str]]): Wrapped rows of each title, reused when the list is laid
+            out again.
+    """
+
+    wrap: Callable[[str], str] = attr.ib()
+    titles: Dict[str, str] = attr.ib(init=False, factory=dict)
+    lines: List[str] = attr.ib(init=False, factory=list)
+    rows: List[Optional[str]] = attr.ib(init=False, factory=list)
+    fetch_page: Optional[Callable[[Optional[str], int], List[Any]]] = attr.ib(
+        init=False, default=None,
+    )
+    page_size: int = attr.ib(default=PAGE_SIZE)
+    last: Optional[str] = attr.ib(init=False, default=None)
+    paged: bool = attr.ib(init=False, default=False)
+    wrapped: Dict[str, List[str]] = attr.ib(init=False, factory=dict)
+    lock: Any = attr.ib(init=False, factory=threading.RLock)
+
+    def build(self, articles: Iterable[Tuple[str, str]]) -> List[str]:
+        """Replace the list with articles, returning its rows."""
+        self.titles = {}
+        self.wrapped = {}
+        self.lines = []
+        self.rows = []
+        self.fetch_page = None
+        self.paged = False
+        self.extend(articles)
+        return self.lines
+
+    def paginate(self, fetch_page: Callable[[Optional[str], int], List[Any]]) -> List[str]:
+        """Replace the list with the first page read with fetch_page, returning its rows."""
+        self.build([])
+        self.fetch_page = fetch_page
+        self.paged = True
+        self.last = None
+        self.more()
+        return self.lines
+
+    def more(self) -> List[str]:
+        """Read the next page of titles, returning the added rows."""
+        with self.lock:
+            if self.fetch_page is None:
+                return []
+            page = self.fetch_page(self.last, self.page_size)
+            if len(page) < self.page_size:
+                self.fetch_page = None
+            if page:
+                self.last = page[-1][0]
+            return self.extend(page)
+
+    def near_end(self, row: Optional[int]) -> bool:
+        """True if more titles can be read and row is within a page of the last row."""
+        if self.fetch_page is None or row is None:
+            return False
+        return row >= len(self.lines) - self.page_size
+
+    def extend(self, articles: Iterable[Tuple[str, str]]) -> List[str]:
+        """Append (PMID, Title) articles that are not listed yet, returning the added rows."""
+        added: List[str] = []
+        for pmid, title in articles:
+            if pmid in self.titles:
+                continue
+            lines = self._wrap(title)
+            if self.titles:
+                added.extend(SEPARATOR)
+                self.rows.extend([None] * len(SEPARATOR))
+            self.titles[pmid] = title
+            self.wrapped[pmid] = lines
+            added.extend(lines)
+            self.rows.extend([pmid] * len(lines))
+        self.lines.extend(added)
+        return added
+
+    def merge(self, new: Iterable[Tuple[str, str]],
+              changed: Iterable[Tuple[str, str]]) -> Optional[List[str]]:
+        """Merge the (PMID, Title) tuples of newly written and changed articles.
+
+        Listed articles whose title changed are wrapped again. A paginated list places new
+        articles in PMID order: those within the pages already read are inserted, those past
+        the last page are left for more() to read, or appended once every page has been read.
+        Lists built from search results only take title changes. Only the written titles are
+        wrapped, the rest of the list is laid out from the rows wrapped before.
+
+        Returns:
+            The rows appended to the end of the list, or None if rows before the end changed
+            and lines and rows were laid out again.
+        """
+        with self.lock:
+            relayout = False
+            for pmid, title in changed:
+                if pmid in self.titles and self.titles[pmid] != title:
+                    self.titles[pmid] = title
+                    self.wrapped[pmid] = self._wrap(title)
+                    relayout = True
+            inside: Dict[str, str] = {}
+            tail: Dict[str, str] = {}
+            for pmid, title in (new if self.paged else ()):
+                if pmid in self.titles:
+                    continue
+                if self.last is not None and pmid <= self.last:
+                    inside[pmid] = title
+                elif self.fetch_page is None:
+                    tail[pmid] = title
+            if inside:
+                for pmid, title in inside.items():
+                    self.wrapped[pmid] = self._wrap(title)
+                titles = {**self.titles, **inside}
+                self.titles = {pmid: titles[pmid]
+                               for pmid in heapq.merge(self.titles, sorted(inside))}
+                relayout = True
+            if relayout:
+                self._layout()
+            added = self.extend(sorted(tail.items()))
+            if tail:
+                self.last = max(max(tail), self.last or '')
+            return None if relayout else added
+
+    def around(self, row: Optional[int], count: int) -> List[str]:
+        """PMIDs of the article on row and of up to count articles above and below it."""
+        if row is None or not 0 <= row < len(self.rows):
+            return []
+        found: List[str] = []
+        # The article on row is taken by both walks, a blank row adds nothing to either.
+        limit = count + (self.rows[row] is not None)
+        for step in (-1, 1):
+            index, taken = row, set()
+            while 0 <= index < len(self.rows) and len(taken) < limit:
+                pmid = self.rows[index]
+                if pmid is not None:
+                    taken.add(pmid)
+                    if pmid not in found:
+                        found.append(pmid)
+                index += step
+        return found
+
+    def row_of(self, pmid: Optional[str]) -> Optional[int]:
+        """First row of the article with the given PMID, None if it is not listed."""
+        if pmid not in self.titles:
+            return None
+        return self.rows.index(pmid)
+
+    def pmid_at(self, row: Optional[int]) -> Optional[str]:
+        """PMID of the article shown on row, None for blank rows or rows outside the list."""
+        if row is None or not 0 <= row < len(self.rows):
+            return None
+        return self.rows[row]
+
+    def _wrap(self, title: Optional[str]) -> List[str]:
+        return self.wrap(title or '').splitlines() or ['']
+
+    def _layout(self) -> None:
+        lines: List[str] = []
+        rows: List[Optional[str]] = []
+        for pmid in self.titles:
+            if lines:
+                lines.extend(SEPARATOR)
+                rows.extend([None] * len(SEPARATOR))
+            lines.extend(self.wrapped[pmid])
+            rows.extend([pmid] * len(self.wrapped[pmid]))
+        self.lines = lines
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.titles)
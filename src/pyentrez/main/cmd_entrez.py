@@ -1,4 +1,5 @@
 """Module for the interactive cmd prompt"""
+import functools
 from typing import Any, Dict
 
 import attr
@@ -6,8 +7,12 @@ import attr
 from loguru import logger
 
 # This is where we will import all sub-component modules
+from pyentrez import bulk_import as BULK
+from pyentrez import exceptions
 from pyentrez import entrez_scraper as SCRAPE
-from pyentrez.db import mongo_entrez as MDB
+from pyentrez import pipeline as PIPE
+from pyentrez import saved_queries as SAVED
+from pyentrez.db import backends
 from pyentrez.utils import string_utils as su
 
 logger.opt(colors=True)
@@ -29,23 +34,117 @@ class CommandEntrez(object):
 
     def __attrs_post_init__(self):
         self.scrape = SCRAPE.Scraper(self)
-        self.mdb = MDB.DBLoader(self)
+        self.mdb = backends.from_settings(self)
+        if self.mdb is not None and self.mdb.initialize() == 1:
+            logger.error(f'{self.mdb.label} failed to connect.')
+            self.mdb = None
         self.prompt = su.InteractivePrompt(self)
 
     def query(self):
         """Handles parsing a query and printing UID's.
 
         Calls for the prompt to print the response for a query and returns the user's input.
-        The user's input is sent through esearch, which returns a handle. That handle is parsed,
-        the UID's and articles attached to them are added to the database, and the list of UID's
-        are printed.
+        The user's input is sent through the download, parse and store pipeline. Each batch of
+        articles is added to the database and its UID's are printed.
         """
         query = self.prompt.input('QUERY')
-        uid = self.scrape.esearch(query)
-        results = self.scrape.efetch(uid)
-        ids = self.mdb.add_many(results)
-        for i in ids:
-            print(f'{i}')
+        self.scrape.refresh_catalog()
+        if SCRAPE.summary_mode():
+            pipeline = PIPE.IngestPipeline(
+                download=self.scrape.fetch_summary_pages(query),
+                parse=SCRAPE.parse_summary,
+                store=functools.partial(self.store_batch, summary=True),
+            )
+        else:
+            pipeline = PIPE.IngestPipeline(
+                download=self.scrape.fetch_pages(query),
+                parse=SCRAPE.parse_page,
+                store=self.store_batch,
+            )
+        self.run_pipeline(pipeline)
+
+    def fetch_ids(self):
+        """Fetches the articles whose UID's are listed in a file and adds them to the database."""
+        path = self.prompt.input('ID_FILE')
+        try:
+            ids = SCRAPE.read_ids(path)
+        except OSError as exc:
+            print(f'Could not read {path}: {exc}')
+            return
+        pipeline = PIPE.IngestPipeline(
+            download=self.scrape.fetch_id_pages(ids),
+            parse=SCRAPE.parse_page,
+            store=self.store_batch,
+        )
+        self.run_pipeline(pipeline)
+
+    def run_pipeline(self, pipeline):
+        """Runs an ingest pipeline and prints its stats, or why it stopped."""
+        try:
+            print(pipeline.run())
+        except exceptions.ExecutionError as exc:
+            logger.error(f'Fetch stopped: {exc}')
+            print(f'Fetch stopped: {exc}')
+
+    def store_batch(self, batch, summary=False):
+        """Store stage of the query pipeline, adds a batch to the database and prints its UID's.
+
+        Summaries are printed with their titles, since that is all the user asked for.
+
+        Raises:
+            ExecutionError: If the database rejects the batch, which stops the pipeline.
+        """
+        if self.mdb is not None:
+            if summary:
+                report = self.mdb.add_summaries(batch)
+            else:
+                report = self.mdb.add_many(batch)
+            if report.error:
+                raise exceptions.ExecutionError(report.error)
+        for article in batch:
+            if summary:
+                print(f'{article.get("PMID"):>10}  {article.get("TI")}')
+            else:
+                print(f'{article.get("PMID")}')
+
+    def search(self):
+        """Runs a ranked full-text search over the stored articles and prints the hits."""
+        query = self.prompt.input('LOCAL_QUERY')
+        if self.mdb is None:
+            print(su.jdata['NO_DB'][0])
+            return
+        for pmid, title, score in self.mdb.search(query):
+            print(f'{pmid:>10}  {score:8.2f}  {title}')
+
+    def save_query(self):
+        """Saves a query under a name so it can be synced later."""
+        name = self.prompt.input('SAVE_NAME')
+        term = self.prompt.input('QUERY')
+        SAVED.QueryStore().add(name, term)
+        print(f'Saved {name}: {term}')
+
+    def sync(self, names=None):
+        """Fetches only the new articles of saved queries, all of them if names is None."""
+        if self.mdb is None:
+            print(su.jdata['NO_DB'][0])
+            return
+        store = SAVED.QueryStore()
+        for name in names or store.names():
+            print(SAVED.sync(self.scrape, self.mdb, store, name))
+
+    def reindex(self):
+        """Rebuilds the local search index from the articles in the database."""
+        if self.mdb is None:
+            print(su.jdata['NO_DB'][0])
+            return
+        print(f'Indexed {self.mdb.reindex()} articles.')
+
+    def bulk_import(self, directory):
+        """Imports a local mirror of PubMed baseline/update files into the database."""
+        if self.mdb is None:
+            print(su.jdata['NO_DB'][0])
+            return
+        print(BULK.import_files(directory, self.mdb))
 
     def start(self):
         """Initializes a prompt and waits for user input.
@@ -58,3 +157,11 @@ class CommandEntrez(object):
         if task.isdigit():
             if int(task) == 1:
                 self.query()
+            elif int(task) == 4:
+                self.search()
+            elif int(task) == 5:
+                self.save_query()
+            elif int(task) == 6:
+                self.sync()
+            elif int(task) == 7:
+                self.fetch_ids()
@@ -200,6 +200,10 @@ class CLI(object):
 
         If INIT is true it takes the user through creation by calling UserCred's first_run.
 
+        If sync is true it fetches new articles for every saved query and returns. If reindex is
+        true it rebuilds the local search index and returns. If import is set it imports the
+        PubMed baseline/update files in that directory and returns.
+
         Otherwise it calls envars to add all args to envars and then determines whether to start
         pyentrez in TUI-mode or interactive cmd prompt.
         """
@@ -213,7 +217,16 @@ class CLI(object):
         else:
             pyentrez.configure_logger(self.args['verbose'], self.args['output'])
             ev.setenv(self.args)
-            if self.args['TUI'] == 'on':
+            if self.args.get('sync'):
+                logger.info('Syncing saved queries')
+                cmd_entrez.CommandEntrez().sync()
+            elif self.args.get('reindex'):
+                logger.info('Rebuilding the search index')
+                cmd_entrez.CommandEntrez().reindex()
+            elif self.args.get('importdir'):
+                logger.info(f'Importing {self.args["importdir"]}')
+                cmd_entrez.CommandEntrez().bulk_import(self.args['importdir'])
+            elif self.args['TUI'] == 'on':
                 logger.info('Starting in TUI mode')
                 self.starttui()
             else:
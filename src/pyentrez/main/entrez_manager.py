@@ -21,7 +21,7 @@ import asyncio
 # This is where we will import all sub-component modules
 import pyentrez
 from pyentrez import entrez_scraper as SCRAPE
-from pyentrez.db import mongo_entrez as MDB
+from pyentrez.db import backends
 from pyentrez.main import fetch_screen as FETCH
 from pyentrez.main import review_screen as REVIEW
 from pyentrez.main import settings_screen as SETTINGS
@@ -69,23 +69,7 @@ class EntrezManager(object):
 
     @mdb.default
     def _mdb_initialization(self):
-        db = None
-        if (os.environ.get('PYENT_MONGO')) == 'True':
-            if os.environ.get('PYENT_CLOUD') == 'True':
-                logger.info(f'Cloud-based Mongo client. URI: {os.environ.get("PYENT_URI")}')
-                db = MDB.DBLoader(manager=self,
-                                  cloud=True,
-                                  uri=os.environ.get('PYENT_URI'),
-                )
-            else:
-                logger.info(f'Local Mongo client. Host: {os.environ.get("PYENT_HOST")}'
-                             f'  PORT: {os.environ.get("PYENT_PORT")}')
-                db = MDB.DBLoader(manager=self,
-                                  cloud=False,
-                                  host=os.environ.get('PYENT_HOST'),
-                                  port=int(os.environ.get('PYENT_PORT')),
-                )
-        return db
+        return backends.from_settings(self)
 
     def _manager_initialization(self):
         return {
@@ -131,27 +115,40 @@ class EntrezManager(object):
         logger.debug("Loading database.")
         out = None
         err = 0
-        if self.mdb.initialize() == 1:
-            out = 'Mongo Client failed to connect.'
+        if self.mdb is None:
+            out = 'No database configured, turn on mongo or sqlite in my_settings.'
+            err = 1
+            logger.debug("No database configured")
+        elif self.mdb.initialize() == 1:
+            out = f'{self.mdb.label} failed to connect.'
             err = 1
             logger.debug("Database failed to load")
         else:
-            out = "Mongo Client connected!"
+            out = f'{self.mdb.label} connected!'
             self.db_set = True
             logger.debug("Database loaded")
         return out, err
 
-    def fetch_query(self, results):
-        """Load the database."""
+    def fetch_query(self, results, summary=False):
+        """Store a batch of fetched articles in the database.
+
+        Args:
+            results (List[Dict]): One batch of articles yielded by Scraper.fetch_batches.
+            summary (bool): results are eSummary listings, stored without replacing articles.
+        """
         logger.debug("Fetching query.")
         out = None
         err = 0
-        if self.mdb.add_many(results) == 1:
-            out = 'Mongo Client failed to connect.'
+        if summary:
+            report = self.mdb.add_summaries(results)
+        else:
+            report = self.mdb.add_many(results)
+        if report.error:
+            out = f'Database write failed: {report.error}'
             err = 1
             logger.debug("Database failed to load")
         else:
-            out = "Query Fetched!"
+            out = f'Query Fetched! {report}'
             logger.debug("Database loaded")
         return out, err
 
@@ -181,4 +178,3 @@ class EntrezManager(object):
         self.root.set_title(f'pyEntrez v{pyentrez.__version__} {manager}')
         self.current_state = manager
 
-
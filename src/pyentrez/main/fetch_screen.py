@@ -5,6 +5,7 @@ Author: William Slattery
 Created: 11/24/2020
 """
 
+import functools
 import os
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -15,6 +16,8 @@ from loguru import logger
 # pyEntrez
 import pyentrez
 from pyentrez import entrez_scraper as SCRAPE
+from pyentrez import exceptions
+from pyentrez import pipeline as PIPE
 from pyentrez.main import screen_manager as sm
 from pyentrez.utils import envars as ev
 from pyentrez.utils import logic
@@ -67,6 +70,7 @@ class FetchScreen(sm.MasterScreen):
         menu: List[str] = self.setting_message.split(' ')
         for setting in ev.settings:
             if setting[0] == menu[0]:
+                msg = logic.complete_setting(setting[0], msg)
                 error, err = logic.fetch_check(setting[0], msg)
                 if not error:
                     os.environ.pop(setting[1])
@@ -85,15 +89,48 @@ class FetchScreen(sm.MasterScreen):
             self.execute_long_operation('Fetching Query.', self.fetch_query)
 
     def fetch_query(self):
+        """Runs the query in the query box through the download, parse and store pipeline.
+
+        In summary fetchmode the pipeline downloads and stores eSummary listings instead of
+        full records.
+        """
         logger.debug("Loading new DB.")
         query_message = self.call_cmd('query_box', 'get')
         self.clear('query_box')
-        uid = self.scraper.esearch(query_message)
-        results = self.scraper.efetch(uid)
-        self.message, self.status = self.manager.fetch_query(results)
+        self.scraper.refresh_catalog()
+        if SCRAPE.summary_mode():
+            pipeline = PIPE.IngestPipeline(
+                download=self.scraper.fetch_summary_pages(query_message),
+                parse=SCRAPE.parse_summary,
+                store=functools.partial(self.store_batch, summary=True),
+            )
+        else:
+            pipeline = PIPE.IngestPipeline(
+                download=self.scraper.fetch_pages(query_message),
+                parse=SCRAPE.parse_page,
+                store=self.store_batch,
+            )
+        try:
+            logger.info(f'Fetched query: {pipeline.run()}')
+        except exceptions.ExecutionError as exc:
+            logger.error(f'Fetch stopped: {exc}')
         self.refresh_settings()
         self.manager.root.stop_loading_popup()
 
+    def store_batch(self, batch, summary=False) -> None:
+        """Store stage of the fetch pipeline, passes one batch of articles to the database.
+
+        Args:
+            batch (List[Dict]): Articles, or eSummary listings if summary is True.
+            summary (bool): Store the batch as summaries.
+
+        Raises:
+            ExecutionError: If the database rejects the batch, which stops the pipeline.
+        """
+        self.message, self.status = self.manager.fetch_query(batch, summary=summary)
+        if self.status:
+            raise exceptions.ExecutionError(self.message)
+
     def update_info(self, tag='fetch_panel', msg='') -> None:
         """Wipes and replaces text on the main info block.
 
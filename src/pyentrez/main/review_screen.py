@@ -5,6 +5,8 @@ Author: William Slattery
 Created: 11/24/2020
 """
 
+import functools
+import threading
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import attr
@@ -15,7 +17,10 @@ from loguru import logger
 import pyentrez
 from pyentrez import entrez_scraper as SCRAPE
 from pyentrez.db import mongo_entrez as MDB
+from pyentrez.main import abstract_cache as AC
+from pyentrez.main import article_list as AL
 from pyentrez.main import screen_manager as sm
+from pyentrez.main import title_filter as TF
 from pyentrez.utils import string_utils as su
 
 # Logger
@@ -23,6 +28,24 @@ from pyentrez.utils import string_utils as su
 
 string_comm = Tuple[Union[str, int], Any]
 dict_comm = Dict[Any, List[string_comm]]
+# py_cui 0.1.2 defines KEY_BACKSPACE as one key code, later releases as a list of them.
+BACKSPACE_KEYS = list(py_cui.keys.KEY_BACKSPACE) if isinstance(
+    py_cui.keys.KEY_BACKSPACE, (list, tuple)) else [py_cui.keys.KEY_BACKSPACE]
+
+
+def typed_text(text: str, cursor: int, key: int) -> str:
+    """Text of a text box once key is handled with the cursor at position cursor.
+
+    Key commands of a py_cui text box run before the box handles the key, so the filter works
+    out the text the key is about to produce.
+    """
+    if key in BACKSPACE_KEYS:
+        return text[:cursor - 1] + text[cursor:] if cursor > 0 else text
+    if key == py_cui.keys.KEY_DELETE:
+        return text[:cursor] + text[cursor + 1:]
+    if 31 < key < 127:
+        return text[:cursor] + chr(key) + text[cursor:]
+    return text
 
 
 @attr.s(slots=True)
@@ -34,8 +57,13 @@ class ReviewScreen(sm.MasterScreen):
     Attributes:
         setting_message (str): This string holds whatever value is highlighted when a Py_CUI
             popup is called. Popups only pass newly entered data, but this value is often needed.
-        articles (set): This is a two-item set containing PMID and the article Titles.
+        articles (list): (PMID, Title) tuples of the last local search.
         paper (set): This is a three-item set containing PMID, Title, and Abstract.
+        article_rows (ArticleList): Rows of the article list with the PMID of each row.
+        selected (str): PMID of the article the load popup was opened for.
+        abstracts (AbstractCache): Recently opened and prefetched articles with their abstracts
+            wrapped for the read_panel.
+        title_filter (TitleFilter): Word prefix index of the stored titles behind the filter box.
 
     Slots:
         manager (any): Instance of the top-level EntrezManager.
@@ -48,7 +76,11 @@ class ReviewScreen(sm.MasterScreen):
     widget_set = attr.ib(init=False)
     setting_message: Optional[str] = attr.ib(init=False)
     paper: Optional[set] = attr.ib(init=False)
-    articles: Optional[set] = attr.ib(init=False)
+    articles: Optional[list] = attr.ib(init=False)
+    article_rows: Optional[AL.ArticleList] = attr.ib(init=False, default=None)
+    selected: Optional[str] = attr.ib(init=False, default=None)
+    abstracts: Optional[AC.AbstractCache] = attr.ib(init=False, default=None)
+    title_filter: Optional[TF.TitleFilter] = attr.ib(init=False, default=None)
 
     def fetch_setting_select(self) -> None:
         """Gets a highlighted string from the menu and toggles.
@@ -56,33 +88,71 @@ class ReviewScreen(sm.MasterScreen):
         The selected string will call a popup box from root_pyCUI.
         Whatever is entered into the prompt box will be sent to the command.
 
+        The article is identified by the row under the cursor, any row of a wrapped title
+        selects the same PMID.
+        While the popup is open, the selected article and its neighbours are read into the
+        abstract cache in the background.
+
         Attributes:
-            self.menu_message (str): We save the string that called. the popup.
+            self.selected (str): PMID of the highlighted article.
             self.toggle_setting (func): popup box will trigger this func.
         """
-        self.setting_message = self.call_cmd('article_list', 'get')
+        row = self.call_cmd('article_list', 'get_selected_item_index')
+        self.selected = self.article_rows.pmid_at(row) if self.article_rows else None
+        if self.selected is None:
+            return
+        self.prefetch(row)
+        self.setting_message = self.article_rows.titles[self.selected]
         self.manager.root.show_yes_no_popup(
             f'Load article titled: {self.setting_message}',
             self.toggle_setting,
         )
 
     def toggle_setting(self, msg) -> None:
-        """Identify the PMID for selected article Title and requests it from database.
+        """Requests the selected article from the database and shows its abstract.
 
-        Compare title substring stored in self.setting_message to all the full title strings
-        stored in our self.articles set. On match, pass the PMID to database handler, which will
-        return a Set containing the abstract. Send the abstract off to get text_wrapped and then
-        set it to the read_panel.
+        The PMID picked in fetch_setting_select is looked up in the abstract cache, which holds
+        the article with its abstract already wrapped, or reads it from the database if it was
+        not prefetched. The abstract is set to the read_panel. Articles stored as eSummary
+        listings get their full record fetched first.
 
         Args:
-            msg (str): String passed
+            msg (bool): True if the user confirmed the popup.
+        """
+        if not msg or self.selected is None:
+            return
+        abstract = self.abstract_cache().get(self.selected)
+        if abstract is not None and abstract.summary:
+            self.load_full_record(self.selected)
+            abstract = self.abstract_cache().get(self.selected)
+        if abstract is None:
+            return
+        self.paper = abstract.paper
+        self.call_cmd('read_panel', 'set_text', abstract.text)
+
+    def load_full_record(self, pmid) -> None:
+        """Fetches the full record of an article stored as a summary and replaces the summary."""
+        logger.debug(f'Fetching full record of {pmid}.')
+        articles = SCRAPE.parse_page(self.scraper.efetch_ids_raw([pmid]))
+        report = self.manager.mdb.add_many(articles)
+        self.abstract_cache().discard([pmid])
+        if report.error:
+            logger.error(f'Could not store the full record of {pmid}: {report.error}')
+
+    def search_articles(self) -> None:
+        """Narrows the article list to local full-text matches for the search box query.
+
+        The query is run against the storage backend's search index, hits are listed best match
+        first. An empty query restores the full article list.
         """
-        for article in self.articles:
-            if self.setting_message in article[1]:
-                self.paper = self.manager.mdb.get_article(article[0])
-                text = self.widgets['read_panel']['su'].format_text(self.paper[1])
-                self.call_cmd('read_panel', 'set_text', text)
-        self.refresh_settings()
+        query = self.call_cmd('search_box', 'get').strip()
+        if not query:
+            self.refresh_settings()
+            return
+        hits = self.manager.mdb.search(query)
+        logger.debug(f'Local search for {query!r} returned {len(hits)} hits.')
+        self.articles = [(pmid, title) for pmid, title, _ in hits]
+        self.show_articles(self.articles)
 
     def update_info(self, tag='read_panel', msg='') -> None:
         """Wipes and replaces text on the main info block.
@@ -101,47 +171,144 @@ class ReviewScreen(sm.MasterScreen):
         self.manager.root.set_status_bar_text('Settings - Backspace | Quit - q')
         if not self.manager.db_set:
             self.execute_long_operation('Loading Database', self.load_db)
-        else:
+        elif self.article_rows is None:
             self.refresh_settings()
 
     def refresh_settings(self) -> None:
-        """Clears and fetches titles of articles held in Database.
+        """Clears and lists the titles of articles held in Database.
 
         Run a check if application was started with Database functionality, if not it sets
         the string to a standar message informing the user to change their settings.
 
-        If application was started with Database functionality it calls the collect_articles
-        function to retrieve the article title set and load it into the instance variable.
+        If application was started with Database functionality the list is filled with the
+        first page of titles in PMID order. Further pages are read by more_articles as the user
+        scrolls, so opening the list costs the same whatever the size of the database.
 
-        Articles get sent off to be text_wrapped, and then passed to root as a list of strings
-        split on newlines.
+        Once listed, the screen subscribes to the database's writes and merges fetched articles
+        with articles_written, so the list is only read again when the user asks for it. The
+        titles of the filter box are indexed in the background at the same time.
 
         Note:
-            StringUtils format_article_list accepts the Set of articles, iterates through,
-            and concatenates all the titles into a string that gets returned. This instance's
-            self.articles Set contains the PMID necessary for requesting abstracts from database.
+            self.article_rows wraps every title and records the PMID of each row of the list,
+            which is used to request abstracts from database.
         """
         if self.manager.db_set:
             logger.debug("Refreshing article list.")
-            wid = self.widgets['article_list']
+            self.article_rows = AL.ArticleList(self.widgets['article_list']['su'].wrapp.fill)
             if self.collect_articles():
-                formatted_articles = wid['su'].format_article_list(self.articles)
+                lines = self.article_rows.paginate(self.manager.mdb.get_title_page)
+                if self.articles_written not in (self.manager.mdb.listeners or []):
+                    self.manager.mdb.subscribe(self.articles_written)
+                    self.index_titles()
+                elif self.title_filter is not None:
+                    self.title_filter.narrow('')
             else:
-                formatted_articles = su.no_db()
+                lines = su.no_db().splitlines()
             self.clear('article_list')
-            self.call_cmd('article_list', 'add_item_list', formatted_articles.splitlines())
+            self.call_cmd('article_list', 'add_item_list', lines)
+
+    def show_articles(self, articles) -> None:
+        """Lists (PMID, Title) articles, keeping the PMID of every row in self.article_rows."""
+        self.article_rows = AL.ArticleList(self.widgets['article_list']['su'].wrapp.fill)
+        lines = self.article_rows.build(articles)
+        self.clear('article_list')
+        self.call_cmd('article_list', 'add_item_list', lines)
+
+    def more_articles(self) -> None:
+        """Appends the next page of titles once the cursor nears the end of the list."""
+        row = self.call_cmd('article_list', 'get_selected_item_index')
+        if self.article_rows is not None and self.article_rows.near_end(row):
+            lines = self.article_rows.more()
+            if lines:
+                self.widgets['article_list']['widget'].add_item_list(lines)
+
+    def articles_written(self, new, changed) -> None:
+        """Merges (PMID, Title) tuples of articles written to the database into the list.
+
+        Called by the database on the writing thread after every stored chunk. Rows appended to
+        the end are added to the menu, otherwise the menu is filled again from the merged rows
+        with the cursor kept on the same article.
+        """
+        if self.abstracts is not None:
+            self.abstracts.discard(pmid for pmid, _ in changed)
+        if self.title_filter is not None:
+            self.title_filter.add(new + changed)
+            if self.title_filter.matches is not None:
+                new = [(pmid, title) for pmid, title in new if self.title_filter.accepts(title)]
+        if self.article_rows is None:
+            return
+        row = self.call_cmd('article_list', 'get_selected_item_index')
+        pmid = self.article_rows.pmid_at(row)
+        lines = self.article_rows.merge(new, changed)
+        if lines is None:
+            self.clear('article_list')
+            self.call_cmd('article_list', 'add_item_list', self.article_rows.lines)
+            row = self.article_rows.row_of(pmid)
+            if row is not None:
+                self.call_cmd('article_list', 'set_selected_item_index', row)
+        elif lines:
+            self.widgets['article_list']['widget'].add_item_list(lines)
+
+    def abstract_cache(self) -> AC.AbstractCache:
+        """Abstract cache of the current database, created on first use."""
+        if self.abstracts is None or self.abstracts.fetch_many != self.manager.mdb.get_articles:
+            if self.abstracts is not None:
+                self.abstracts.close()
+            self.abstracts = AC.AbstractCache(self.manager.mdb.get_articles,
+                                              self.widgets['read_panel']['su'])
+        return self.abstracts
+
+    def prefetch(self, row) -> None:
+        """Reads the articles around row into the abstract cache on a background thread."""
+        if self.article_rows is not None:
+            self.abstract_cache().prefetch(self.article_rows.around(row, AC.NEIGHBOURS))
+
+    def index_titles(self) -> None:
+        """Indexes the stored titles for the filter box on a background thread."""
+        self.title_filter = TF.TitleFilter()
+        threading.Thread(target=self.title_filter.load,
+                         args=(self.manager.mdb.get_titles, self.manager.mdb.count),
+                         daemon=True).start()
+
+    def filter_articles(self, key) -> None:
+        """Narrows the article list to the titles matching the filter box as the user types.
+
+        Each word typed matches titles with a word starting with it. Once the stored titles are
+        indexed, matches come from the in-memory TitleFilter and are listed a page at a time in
+        PMID order; until then, or if the database is too large to index, the first matches are
+        read from the search index. Emptying the box restores the full article list.
+
+        Args:
+            key (int): Key pressed in the filter box, not yet added to its text.
+        """
+        if not self.collect_articles():
+            return
+        query = typed_text(self.call_cmd('filter_box', 'get'),
+                           self.call_cmd('filter_box', 'get_cursor_text_pos'), key)
+        indexed = self.title_filter is not None and self.title_filter.ready
+        if indexed:
+            self.title_filter.narrow(query)
+        if not query.strip():
+            self.refresh_settings()
+            return
+        self.article_rows = AL.ArticleList(self.widgets['article_list']['su'].wrapp.fill,
+                                           page_size=TF.PAGE_SIZE)
+        if indexed:
+            lines = self.article_rows.paginate(self.title_filter.get_title_page)
+        else:
+            lines = self.article_rows.build(
+                self.manager.mdb.filter_titles(query, limit=TF.PAGE_SIZE),
+            )
+        self.clear('article_list')
+        self.call_cmd('article_list', 'add_item_list', lines)
 
     def collect_articles(self) -> bool:
-        """If DB is set up pulls a set of article titles.
+        """Checks whether a database is set up to list articles from.
 
         Returns:
             is_db_set (bool): True if the top-level database is set, otherwise False.
         """
-        is_db_set = False
-        if self.manager.mdb is not None:
-            self.articles = self.manager.mdb.get_titles()
-            is_db_set = True
-        return is_db_set
+        return self.manager.mdb is not None
 
     def initialize_screen_elements(self) -> Any:
         """Function that initializes the widgets for fetch control screen.
@@ -167,6 +334,32 @@ class ReviewScreen(sm.MasterScreen):
         self.update_SU('read_panel')
         self.call_cmd('read_panel', 'set_selectable', True)
 
+        # Local full-text search over stored titles and abstracts
+        self.add_widget('search_box', 'add_text_box', False, '', None,
+                        title='Search Articles',
+                        row=0,
+                        column=2,
+                        column_span=2,
+                        )
+        self.call_cmd('search_box', 'set_focus_text', 'Search - Enter | Return - Esc')
+        self.call_cmd('search_box', 'set_selectable', True)
+        self.addkey('search_box',
+                    py_cui.keys.KEY_ENTER,
+                    self.search_articles,
+                    )
+
+        # Filter over stored titles, narrowed on every key
+        self.add_widget('filter_box', 'add_text_box', False, '', None,
+                        title='Filter Titles',
+                        row=1,
+                        column=2,
+                        column_span=2,
+                        )
+        self.call_cmd('filter_box', 'set_focus_text', 'Type to filter | Return - Esc')
+        self.call_cmd('filter_box', 'set_selectable', True)
+        for key in [*range(32, 127), *BACKSPACE_KEYS, py_cui.keys.KEY_DELETE]:
+            self.addkey('filter_box', key, functools.partial(self.filter_articles, key))
+
         # Scrolling block for menu items
         self.add_widget('article_list', 'add_scroll_menu', True, '',
                         su.StringUtils(x_dim=0, y_dim=0),
@@ -183,4 +376,7 @@ class ReviewScreen(sm.MasterScreen):
                     py_cui.keys.KEY_ENTER,
                     self.fetch_setting_select,
                     )
+        # Key commands run before the menu scrolls, so the next page is read ahead of the cursor.
+        for key in (py_cui.keys.KEY_DOWN_ARROW, py_cui.keys.KEY_PAGE_DOWN):
+            self.addkey('article_list', key, self.more_articles)
         return self.widget_set
@@ -221,7 +221,7 @@ class WidgetRing(object):
             self.widgets[tag]['text'] = ''.join(args)
         elif cmd == 'add_item_list':
             self.widgets[tag]['text'] = args[0]
-        elif cmd == 'get':
+        elif cmd.startswith('get'):
             return getattr(self.widgets[tag]['widget'], cmd)(*args, **kwargs)
         getattr(self.widgets[tag]['widget'], cmd)(*args, **kwargs)
 
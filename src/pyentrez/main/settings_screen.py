@@ -53,6 +53,11 @@ class SettingsScreen(sm.MasterScreen):
             msg (str): String passed
         """
         menu: List[str] = self.setting_message.split(' ')
+        msg = logic.complete_setting(menu[0], msg)
+        error, err = logic.fetch_check(menu[0], msg)
+        if error:
+            self.manager.root.show_warning_popup('Invalid Setting', err)
+            return
         if msg.isdigit():
             msg = int(msg)
         su.StringUtils.update_settings(menu[0], msg)
@@ -0,0 +1,227 @@
+"""Filter-as-you-type over the titles of the review list.
+
+TitleFilter indexes every stored title by its words once, from get_titles, and is kept up to
+date with the (PMID, Title) tuples the storage backend announces after each write. A filter
+matches the titles that have a word starting with each word of the query, so 'fev cli' matches
+'Online fever clinics'. The words of the index are kept sorted, so the words starting with a
+prefix are found with a binary search, and the PMIDs of one or two letter prefixes, which match
+a large share of the titles, are kept once computed. Typing another letter only narrows the
+previous matches.
+
+Matches are listed in PMID order with get_title_page, the same keyset pages as
+Storage.get_title_page, so the review screen wraps only the titles the user scrolls to whatever
+the number of matches, a short page at a time so a key only wraps about a screenful of titles.
+Databases with more than limit articles are not read or indexed in memory; their titles are
+filtered by the storage backend's search index instead.
+"""
+import bisect
+import re
+import threading
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import attr
+from loguru import logger
+
+WORD = re.compile(r'\w+')
+# Prefixes of up to this many letters match so many words that their PMIDs are kept.
+SHORT_PREFIX = 2
+# Largest number of titles indexed in memory.
+INDEX_LIMIT = 250000
+# Matches up to this many are sorted outright, more are picked out of the PMID order.
+SORT_LIMIT = 2000
+# Matches listed per page, about a screenful, so a key wraps few titles.
+PAGE_SIZE = 50
+
+
+def words(text: Optional[str]) -> Set[str]:
+    """Lower case words of text."""
+    return set(WORD.findall((text or '').lower()))
+
+
+def prefixes(title_words: Iterable[str]) -> Set[str]:
+    """Short prefixes of title_words whose PMIDs are kept."""
+    return {word[:size] for word in title_words for size in range(1, SHORT_PREFIX + 1)}
+
+
+def insert_sorted(items: List[str], new: List[str]) -> List[str]:
+    """Insert new into the sorted list items, sorting once when many are inserted."""
+    if len(new) > SORT_LIMIT:
+        return sorted(items + new)
+    for item in new:
+        bisect.insort(items, item)
+    return items
+
+
+@attr.s
+class TitleFilter(object):
+    """Word prefix index of the stored titles and the matches of the current filter.
+
+    Attributes:
+        limit (int): Largest number of titles indexed, more are left to the search index.
+        titles (Dict[str, str]): Indexed titles keyed on PMID.
+        order (List[str]): Indexed PMIDs in PMID order.
+        postings (Dict[str, Set[str]]): PMIDs of the titles containing each word.
+        vocabulary (List[str]): Words of the index, sorted.
+        short (Dict[str, Set[str]]): PMIDs matching each short prefix computed so far.
+        query (str): Current filter.
+        matches (Set[str]): PMIDs matching query, None if there is no filter.
+        ready (bool): True once the stored titles are indexed.
+        pushdown (bool): True if there are too many titles to index in memory.
+    """
+
+    limit: int = attr.ib(default=INDEX_LIMIT)
+    titles: Dict[str, str] = attr.ib(init=False, factory=dict)
+    order: List[str] = attr.ib(init=False, factory=list)
+    postings: Dict[str, Set[str]] = attr.ib(init=False, factory=dict)
+    vocabulary: List[str] = attr.ib(init=False, factory=list)
+    short: Dict[str, Set[str]] = attr.ib(init=False, factory=dict)
+    query: str = attr.ib(init=False, default='')
+    matches: Optional[Set[str]] = attr.ib(init=False, default=None)
+    ready: bool = attr.ib(init=False, default=False)
+    pushdown: bool = attr.ib(init=False, default=False)
+    lock: Any = attr.ib(init=False, factory=threading.RLock)
+
+    def load(self, get_titles: Callable[[], Iterable[Tuple[str, str]]],
+             count: Callable[[], int]) -> None:
+        """Index the titles returned by get_titles, such as Storage.get_titles.
+
+        count, such as Storage.count, is checked first, so the titles of a database larger than
+        limit are never read.
+        """
+        stored = count()
+        if stored > self.limit:
+            logger.info(f'{stored} articles are filtered with the search index.')
+            self.pushdown = True
+            return
+        self.add(get_titles())
+        # One letter prefixes are the slowest to compute and the first ones typed.
+        for letter in {word[0] for word in self.vocabulary}:
+            self.prefix(letter)
+        self.ready = True
+        logger.debug(f'Indexed {len(self.titles)} titles for filtering.')
+
+    def add(self, articles: Iterable[Tuple[str, str]]) -> None:
+        """Index new (PMID, Title) tuples and re-index changed titles."""
+        if self.pushdown:
+            return
+        with self.lock:
+            added: List[str] = []
+            added_words: List[str] = []
+            for pmid, title in articles:
+                title = title or ''
+                old = self.titles.get(pmid)
+                if old == title:
+                    continue
+                new_words = words(title)
+                if old is None:
+                    added.append(pmid)
+                    old_words: Set[str] = set()
+                else:
+                    old_words = words(old)
+                    self._unindex(pmid, old_words - new_words, prefixes(new_words))
+                self.titles[pmid] = title
+                for word in new_words - old_words:
+                    if word not in self.postings:
+                        self.postings[word] = set()
+                        added_words.append(word)
+                    self.postings[word].add(pmid)
+                for prefix in prefixes(new_words) & self.short.keys():
+                    self.short[prefix].add(pmid)
+                if self.matches is not None:
+                    if self.accepts(title):
+                        self.matches.add(pmid)
+                    else:
+                        self.matches.discard(pmid)
+            self.order = insert_sorted(self.order, added)
+            self.vocabulary = insert_sorted(self.vocabulary, added_words)
+
+    def remove(self, pmids: Iterable[str]) -> None:
+        """Drop deleted articles from the index."""
+        with self.lock:
+            for pmid in pmids:
+                title = self.titles.pop(pmid, None)
+                if title is None:
+                    continue
+                del self.order[bisect.bisect_left(self.order, pmid)]
+                self._unindex(pmid, words(title), set())
+                if self.matches is not None:
+                    self.matches.discard(pmid)
+
+    def narrow(self, query: str) -> Optional[Set[str]]:
+        """Make query the current filter, returning the PMIDs it matches.
+
+        A query that extends the previous one, as when another letter is typed, only narrows
+        the previous matches with the words that changed.
+
+        Returns:
+            PMIDs of the matching titles, None if the query has no words.
+        """
+        with self.lock:
+            tokens = words(query)
+            if self.matches is not None and query.startswith(self.query):
+                matches: Optional[Set[str]] = self.matches
+                tokens -= words(self.query)
+            else:
+                matches = None
+            # Longer words are more selective, so the sets intersected stay small.
+            for token in sorted(tokens, key=len, reverse=True):
+                if matches is not None and not matches:
+                    break
+                found = self.prefix(token)
+                matches = set(found) if matches is None else matches & found
+            self.query = query
+            self.matches = matches if words(query) else None
+            return self.matches
+
+    def prefix(self, token: str) -> Set[str]:
+        """PMIDs of the titles with a word starting with token."""
+        with self.lock:
+            if token in self.short:
+                return self.short[token]
+            index = bisect.bisect_left(self.vocabulary, token)
+            found: Set[str] = set()
+            while index < len(self.vocabulary) and self.vocabulary[index].startswith(token):
+                found |= self.postings[self.vocabulary[index]]
+                index += 1
+            if len(token) <= SHORT_PREFIX:
+                self.short[token] = found
+            return found
+
+    def accepts(self, title: Optional[str]) -> bool:
+        """True if title matches the current filter."""
+        title_words = words(title)
+        return all(any(word.startswith(token) for word in title_words)
+                   for token in words(self.query))
+
+    def get_title_page(self, after: Optional[str], limit: int) -> List[Tuple[str, str]]:
+        """Keyset page of the (PMID, Title) tuples matching the filter, in PMID order."""
+        with self.lock:
+            if self.matches is None:
+                start = bisect.bisect_right(self.order, after) if after else 0
+                page = self.order[start:start + limit]
+            elif len(self.matches) <= SORT_LIMIT:
+                ordered = sorted(self.matches)
+                start = bisect.bisect_right(ordered, after) if after else 0
+                page = ordered[start:start + limit]
+            else:
+                start = bisect.bisect_right(self.order, after) if after else 0
+                page = list(islice(
+                    (self.order[index] for index in range(start, len(self.order))
+                     if self.order[index] in self.matches),
+                    limit,
+                ))
+            return [(pmid, self.titles[pmid]) for pmid in page]
+
+    def _unindex(self, pmid: str, dropped: Set[str], kept_prefixes: Set[str]) -> None:
+        for word in dropped:
+            posting = self.postings[word]
+            posting.discard(pmid)
+            if not posting:
+                del self.postings[word]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, word)]
+        for prefix in (prefixes(dropped) - kept_prefixes) & self.short.keys():
+            self.short[prefix].discard(pmid)
+
+    def __len__(self):
+        return len(self.titles)
@@ -0,0 +1 @@
+"""Parsers for Entrez efetch responses."""
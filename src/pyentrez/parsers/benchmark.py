@@ -0,0 +1,109 @@
+"""Benchmark of the MEDLINE parsers.
+
+Compares pyentrez.parsers.medline with Bio.Medline on two synthetic corpora: one the size of
+db/db_files/test_data.json and one of 100,000 records. Records are built from the articles in
+test_data.json, wrapped the way NCBI wraps MEDLINE text, with repeated AU/FAU/MH/AD tags and
+wrapped MH and AD values.
+
+Run with:
+    python -m pyentrez.parsers.benchmark [records ...]
+"""
+import io
+import json
+import sys
+import textwrap
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from Bio import Medline as ml
+
+from pyentrez.parsers import medline
+
+TEST_DATA = Path(__file__).parent.parent / 'db' / 'db_files' / 'test_data.json'
+LARGE_CORPUS = 100000
+WIDTH = 88
+
+
+def medline_lines(tag: str, value: str) -> List[str]:
+    """Formats one tag the way NCBI wraps MEDLINE text."""
+    wrapped = textwrap.wrap(value, WIDTH - 6) or ['']
+    return [f'{tag:<4}- {wrapped[0]}'] + [f'      {line}' for line in wrapped[1:]]
+
+
+def synthetic_record(pmid: int, article: Dict[str, Any]) -> str:
+    """MEDLINE text of a record built from one test_data.json article."""
+    lines = medline_lines('PMID', str(pmid))
+    lines += medline_lines('OWN', 'NLM')
+    lines += medline_lines('DP', '2020 Jun')
+    lines += medline_lines('TI', article['Title'])
+    lines += medline_lines('AB', article['Abstract'])
+    for author in article['Authors']:
+        lines += medline_lines('FAU', author)
+        last, _, fore = author.partition(', ')
+        lines += medline_lines('AU', f'{last} {fore[:1]}')
+        lines += medline_lines('AD', f'Department of Medicine, {last} Hospital, Wuhan University, '
+                                     'Wuhan, Hubei Province, China.')
+    for heading in ('Betacoronavirus', 'Coronavirus Infections/*diagnosis/epidemiology/therapy',
+                    'Fever/*diagnosis', 'Humans', 'Pneumonia, Viral/*diagnosis/epidemiology'):
+        lines += medline_lines('MH', heading)
+    lines += medline_lines('JT', 'Journal of the American Medical Informatics Association')
+    return '\n'.join(lines) + '\n'
+
+
+def make_corpus(records: int) -> bytes:
+    """A MEDLINE response of the given number of records."""
+    with TEST_DATA.open() as data_in:
+        articles = json.load(data_in)
+    return '\n'.join(
+        synthetic_record(30000000 + number, articles[number % len(articles)])
+        for number in range(records)
+    ).encode('utf-8')
+
+
+def bio_parse(data: bytes) -> List[Any]:
+    """Parses a buffer the way pyentrez did before it had its own parser."""
+    return list(ml.parse(io.StringIO(data.decode('utf-8'))))
+
+
+def measure(parser: Callable[[bytes], List[Any]], data: bytes) -> Dict[str, float]:
+    """Records/sec over enough parses of data to run for 0.2s, and peak memory of one parse."""
+    records = len(parser(data))
+    number, total = timeit.Timer(lambda: parser(data)).autorange()
+    seconds = total / number
+    tracemalloc.start()
+    parser(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'records': records,
+        'seconds': seconds,
+        'records_per_sec': records / seconds if seconds else 0.0,
+        'peak_mb': peak / 1024 / 1024,
+    }
+
+
+def run(sizes: List[int]) -> List[Dict[str, Any]]:
+    """Benchmarks both parsers on a corpus of each size, checking they agree."""
+    results = []
+    for size in sizes:
+        data = make_corpus(size)
+        if medline.parse(data) != [dict(record) for record in bio_parse(data)]:
+            raise AssertionError('pyentrez and Bio.Medline disagree')
+        for name, parser in (('Bio.Medline', bio_parse), ('pyentrez', medline.parse)):
+            results.append(dict(measure(parser, data), parser=name, size=size))
+    return results
+
+
+def main(argv: List[str]) -> None:
+    with TEST_DATA.open() as data_in:
+        sizes = [int(arg) for arg in argv] or [len(json.load(data_in)), LARGE_CORPUS]
+    print(f'{"parser":<12} {"records":>8} {"seconds":>8} {"records/s":>10} {"peak MB":>8}')
+    for result in run(sizes):
+        print(f'{result["parser"]:<12} {result["records"]:>8} {result["seconds"]:>8.3f} '
+              f'{result["records_per_sec"]:>10.0f} {result["peak_mb"]:>8.1f}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
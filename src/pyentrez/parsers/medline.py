@@ -0,0 +1,98 @@
+"""MEDLINE text parser that works on whole response buffers.
+
+Produces the same records as Bio.Medline.parse:
+    - every tag maps to a list of its values, in the order they appear
+    - continuation lines of MH and AD extend the last value, continuation lines of other tags
+      are added as values of their own
+    - the values of single-text tags such as TI and AB are joined into one string
+
+Bio.Medline reads a handle line by line. Here a response is decoded once, continuation lines
+are folded into the line they continue with one str.replace, and records are split into fields
+with str.split, so the Python-level loop runs once per field rather than once per line.
+"""
+from typing import Any, Dict, Iterator, List
+
+# Tags whose values Bio.Medline joins into a single string.
+TEXT_KEYS = frozenset((
+    'ID', 'PMID', 'SO', 'RF', 'NI', 'JC', 'TA', 'IS', 'CY', 'TT', 'CA', 'IP', 'VI', 'DP', 'YR',
+    'PG', 'LID', 'DA', 'LR', 'OWN', 'STAT', 'DCOM', 'PUBM', 'DEP', 'PL', 'JID', 'SB', 'PMC',
+    'EDAT', 'MHDA', 'PST', 'AB', 'EA', 'TI', 'JT',
+))
+# Tags whose continuation lines extend the previous value instead of starting a new one.
+APPEND_KEYS = frozenset(('MH', 'AD'))
+JOINED_KEYS = TEXT_KEYS | APPEND_KEYS
+
+CONTINUATION = '\n      '
+# Stands in for a folded continuation line until the tag of the field is known.
+_MARK = '\x00'
+
+
+def iter_records(data) -> Iterator[Dict[str, Any]]:
+    """Yields the records of a MEDLINE response one at a time.
+
+    Args:
+        data: Raw response as bytes, bytearray, memoryview or str.
+
+    Yields:
+        Record dicts keyed on MEDLINE tags.
+    """
+    if not isinstance(data, str):
+        data = bytes(data).decode('utf-8')
+    if '\r' in data:
+        data = data.replace('\r\n', '\n')
+    for block in data.split('\n\n'):
+        block = block.strip('\n')
+        if block:
+            yield parse_record(block)
+
+
+def parse(data) -> List[Dict[str, Any]]:
+    """Parses a whole response into a list of records, see iter_records."""
+    return list(iter_records(data))
+
+
+def parse_record(block: str) -> Dict[str, Any]:
+    """Parses the text of one record, without blank lines, into a record dict.
+
+    Bio.Medline strips trailing whitespace from every line. Records with trailing spaces or
+    tabs, which include records with whitespace-only lines, are rare and are parsed line by line
+    with parse_lines instead.
+    """
+    if ' \n' in block or '\t\n' in block or _MARK in block or block[-1].isspace():
+        return parse_lines(block)
+    record: Dict[str, Any] = {}
+    for field in block.replace(CONTINUATION, _MARK).split('\n'):
+        key = field[:4].rstrip()
+        if key in record:
+            record[key].append(field[6:])
+        else:
+            record[key] = [field[6:]]
+    for key in TEXT_KEYS.intersection(record):
+        record[key] = ' '.join(record[key]).replace(_MARK, ' ')
+    for key in APPEND_KEYS.intersection(record):
+        record[key] = [value.replace(_MARK, ' ') for value in record[key]]
+    for key in record.keys() - JOINED_KEYS:
+        if _MARK in '\n'.join(record[key]):
+            record[key] = [line for value in record[key] for line in value.split(_MARK)]
+    return record
+
+
+def parse_lines(block: str) -> Dict[str, Any]:
+    """Parses one record line by line, following Bio.Medline.parse exactly."""
+    record: Dict[str, Any] = {}
+    key = ''
+    for line in block.split('\n'):
+        if line[:6] == '      ':
+            # Bio.Medline keeps whitespace-only continuation lines as a newline.
+            line = line.rstrip()[6:] or '\n'
+            if key in APPEND_KEYS:
+                record[key][-1] += ' ' + line
+            else:
+                record[key].append(line)
+        else:
+            line = line.rstrip()
+            key = line[:4].rstrip()
+            record.setdefault(key, []).append(line[6:])
+    for key in TEXT_KEYS.intersection(record):
+        record[key] = ' '.join(record[key])
+    return record
@@ -0,0 +1,175 @@
+"""Streaming parser for PubmedArticleSet XML.
+
+This module:
+    - parses efetch responses fetched with retmode=xml one PubmedArticle at a time
+    - clears every article from the tree once it has been converted, so memory stays
+      proportional to a single article however large the response is
+    - normalizes articles into the MEDLINE keys used across pyentrez (PMID, TI, AB, AU, ...)
+    - adds structured fields the MEDLINE text format flattens: authors with their affiliations,
+      MeSH headings with qualifiers and major topic flags, and history dates
+    - collects the PMIDs of DeleteCitation entries found in PubMed update files
+"""
+import io
+from typing import Any, Dict, Iterator, List, Optional
+from xml.etree import ElementTree as ET
+
+ARTICLE_TAGS = frozenset(('PubmedArticle', 'PubmedBookArticle'))
+
+
+def iter_articles(source, deleted: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Yields one normalized article dict for each PubmedArticle in source.
+
+    Args:
+        source: Raw XML as bytes or str, or a binary file object such as an efetch handle.
+        deleted (List[str]): If given, the PMIDs listed in DeleteCitation are appended to it.
+
+    Yields:
+        Article dicts keyed like Bio.Medline records, plus authors, mesh and dates.
+    """
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    root = None
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if root is None:
+            root = elem
+        if event != 'end':
+            continue
+        if elem.tag == 'DeleteCitation':
+            if deleted is not None:
+                deleted.extend(texts(elem.iterfind('PMID')))
+            root.clear()
+            continue
+        if elem.tag not in ARTICLE_TAGS:
+            continue
+        if elem.tag == 'PubmedArticle':
+            yield article_dict(elem)
+        elem.clear()
+        root.clear()
+
+
+def parse(source) -> List[Dict[str, Any]]:
+    """Parses a whole response into a list of article dicts, see iter_articles."""
+    return list(iter_articles(source))
+
+
+def article_dict(article: ET.Element) -> Dict[str, Any]:
+    """Converts one PubmedArticle element into an article dict."""
+    citation = article.find('MedlineCitation')
+    journal = citation.find('Article/Journal')
+    paper: Dict[str, Any] = {
+        'PMID': text(citation.find('PMID')),
+        'TI': text(citation.find('Article/ArticleTitle')),
+        'AB': abstract(citation.find('Article/Abstract')),
+        'JT': text(journal.find('Title')) if journal is not None else None,
+        'TA': text(citation.find('MedlineJournalInfo/MedlineTA')),
+        'IS': text(journal.find('ISSN')) if journal is not None else None,
+        'VI': text(citation.find('Article/Journal/JournalIssue/Volume')),
+        'IP': text(citation.find('Article/Journal/JournalIssue/Issue')),
+        'PG': text(citation.find('Article/Pagination/MedlinePgn')),
+        'DP': pub_date(citation.find('Article/Journal/JournalIssue/PubDate')),
+        'LA': texts(citation.iterfind('Article/Language')),
+        'PT': texts(citation.iterfind('Article/PublicationTypeList/PublicationType')),
+        'OT': texts(citation.iterfind('KeywordList/Keyword')),
+        'AID': [f'{text(aid)} [{aid.get("IdType")}]'
+                for aid in article.iterfind('PubmedData/ArticleIdList/ArticleId')],
+    }
+    authors = [author_dict(author)
+               for author in citation.iterfind('Article/AuthorList/Author')]
+    paper['AU'] = [author['name'] for author in authors if author['name']]
+    paper['FAU'] = [author['full_name'] for author in authors if author['full_name']]
+    paper['AD'] = list(dict.fromkeys(
+        affiliation for author in authors for affiliation in author['affiliations']
+    ))
+    mesh = [mesh_dict(heading)
+            for heading in citation.iterfind('MeshHeadingList/MeshHeading')]
+    paper['MH'] = [heading['term'] for heading in mesh]
+    paper['authors'] = authors
+    paper['mesh'] = mesh
+    paper['dates'] = {
+        date.get('PubStatus'): history_date(date)
+        for date in article.iterfind('PubmedData/History/PubMedPubDate')
+    }
+    status = article.find('PubmedData/PublicationStatus')
+    if status is not None:
+        paper['PST'] = text(status)
+    return {key: value for key, value in paper.items() if value not in (None, [], {})}
+
+
+def author_dict(author: ET.Element) -> Dict[str, Any]:
+    """Name, MEDLINE-style AU/FAU names and affiliations of one Author element."""
+    last = text(author.find('LastName'))
+    fore = text(author.find('ForeName'))
+    initials = text(author.find('Initials'))
+    collective = text(author.find('CollectiveName'))
+    name = ' '.join(part for part in (last, initials) if part) or collective
+    full_name = ', '.join(part for part in (last, fore) if part) or collective
+    return {
+        'last_name': last,
+        'fore_name': fore,
+        'initials': initials,
+        'name': name,
+        'full_name': full_name,
+        'affiliations': texts(author.iterfind('AffiliationInfo/Affiliation')),
+    }
+
+
+def mesh_dict(heading: ET.Element) -> Dict[str, Any]:
+    """One MeshHeading with its qualifiers, and its MEDLINE MH term such as 'Fever/*diagnosis'."""
+    descriptor = heading.find('DescriptorName')
+    qualifiers = [
+        {'name': text(qualifier), 'major': qualifier.get('MajorTopicYN') == 'Y'}
+        for qualifier in heading.iterfind('QualifierName')
+    ]
+    major = descriptor.get('MajorTopicYN') == 'Y'
+    term = ('*' if major else '') + text(descriptor)
+    for qualifier in qualifiers:
+        term += '/' + ('*' if qualifier['major'] else '') + qualifier['name']
+    return {
+        'descriptor': text(descriptor),
+        'ui': descriptor.get('UI'),
+        'major': major,
+        'qualifiers': qualifiers,
+        'term': term,
+    }
+
+
+def abstract(element: Optional[ET.Element]) -> Optional[str]:
+    """Joins the sections of a structured abstract, prefixing each with its label."""
+    if element is None:
+        return None
+    sections = []
+    for section in element.iterfind('AbstractText'):
+        label = section.get('Label')
+        body = text(section)
+        sections.append(f'{label}: {body}' if label else body)
+    return ' '.join(sections) or None
+
+
+def pub_date(element: Optional[ET.Element]) -> Optional[str]:
+    """MEDLINE DP string of a PubDate, such as '2020 Sep 29'."""
+    if element is None:
+        return None
+    medline_date = element.find('MedlineDate')
+    if medline_date is not None:
+        return text(medline_date)
+    parts = [text(element.find(tag)) for tag in ('Year', 'Month', 'Day')]
+    return ' '.join(part for part in parts if part) or None
+
+
+def history_date(element: ET.Element) -> str:
+    """YYYY/MM/DD date of a PubMedPubDate element."""
+    parts = [text(element.find(tag)) for tag in ('Year', 'Month', 'Day')]
+    return '/'.join(part.zfill(2) for part in parts if part)
+
+
+def text(element: Optional[ET.Element]) -> Optional[str]:
+    """Full text of an element including inline markup such as <i>, or None if it is missing."""
+    if element is None:
+        return None
+    return ' '.join(''.join(element.itertext()).split())
+
+
+def texts(elements) -> List[str]:
+    return [text(element) for element in elements]
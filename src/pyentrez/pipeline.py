@@ -0,0 +1,193 @@
+"""Staged ingestion pipeline: download, parse and store run concurrently.
+
+This module:
+    - runs each stage of an ingest on its own thread
+    - connects the stages with bounded queues, so a slow stage applies backpressure upstream
+    - propagates the first error from any stage and stops the others
+    - reports the busy time of each stage, so the bottleneck of an ingest is visible
+
+While page N is being parsed, page N+1 is downloading and page N-1 is being written, so the wall
+time of a large query approaches that of its slowest stage.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import attr
+from loguru import logger
+
+_DONE = object()
+
+
+@attr.s
+class StageReport(object):
+    """Work done by one stage of the pipeline.
+
+    Attributes:
+        name (str): Name of the stage.
+        items (int): Number of items the stage has processed.
+        busy (float): Seconds the stage spent working, excluding time blocked on its queues.
+    """
+
+    name: str = attr.ib()
+    items: int = attr.ib(default=0)
+    busy: float = attr.ib(default=0.0)
+
+
+@attr.s
+class PipelineReport(object):
+    """Summary of a pipeline run.
+
+    Attributes:
+        stages (Dict[str, StageReport]): Report for each stage, keyed by name.
+        records (int): Number of records parsed.
+        wall (float): Seconds from start to finish of the run.
+    """
+
+    stages: Dict[str, StageReport] = attr.ib(factory=dict)
+    records: int = attr.ib(default=0)
+    wall: float = attr.ib(default=0.0)
+
+    @property
+    def bottleneck(self) -> Optional[str]:
+        """Name of the stage that was busy the longest."""
+        if not self.stages:
+            return None
+        return max(self.stages.values(), key=lambda stage: stage.busy).name
+
+    def __str__(self):
+        stages = ', '.join(
+            f'{stage.name} {stage.busy:.2f}s/{stage.items}' for stage in self.stages.values()
+        )
+        return f'{self.records} records in {self.wall:.2f}s ({stages})'
+
+
+@attr.s
+class IngestPipeline(object):
+    """Runs download, parse and store stages concurrently with bounded queues between them.
+
+    Attributes:
+        download (Iterable[Any]): Raw pages, usually Scraper.fetch_pages(term).
+        parse (Callable): Turns one raw page into a list of article dicts.
+        store (Callable): Writes one list of article dicts, raising stops the pipeline.
+        maxsize (int): Capacity of each queue between stages.
+    """
+
+    download: Iterable[Any] = attr.ib()
+    parse: Callable[[Any], List[Any]] = attr.ib()
+    store: Callable[[List[Any]], Any] = attr.ib()
+    maxsize: int = attr.ib(default=2)
+    report: PipelineReport = attr.ib(init=False, factory=PipelineReport)
+    error: Optional[BaseException] = attr.ib(init=False, default=None)
+    stop: Any = attr.ib(init=False, factory=threading.Event)
+
+    def run(self) -> PipelineReport:
+        """Run every stage to completion.
+
+        Download and parse run on worker threads, store runs on the calling thread.
+
+        Returns:
+            PipelineReport of the run.
+
+        Raises:
+            BaseException: The first error raised by any stage.
+        """
+        start = time.perf_counter()
+        for name in ('download', 'parse', 'store'):
+            self._stage(name)
+        raw: queue.Queue = queue.Queue(maxsize=self.maxsize)
+        parsed: queue.Queue = queue.Queue(maxsize=self.maxsize)
+        workers = [
+            threading.Thread(target=self._download, args=(raw,), daemon=True),
+            threading.Thread(target=self._parse, args=(raw, parsed), daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+        self._store(parsed)
+        for worker in workers:
+            worker.join()
+        self.report.wall = time.perf_counter() - start
+        logger.debug(f'Ingest pipeline finished: {self.report}')
+        if self.error is not None:
+            raise self.error
+        return self.report
+
+    def _stage(self, name: str) -> StageReport:
+        return self.report.stages.setdefault(name, StageReport(name))
+
+    def _put(self, out: queue.Queue, item: Any) -> bool:
+        """Put item on out, giving up if another stage has failed."""
+        while not self.stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _get(self, inp: queue.Queue) -> Any:
+        """Get the next item from inp, or _DONE once another stage has failed."""
+        while not self.stop.is_set():
+            try:
+                return inp.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, exc: BaseException) -> None:
+        if self.error is None:
+            self.error = exc
+        self.stop.set()
+
+    def _download(self, out: queue.Queue) -> None:
+        stage = self._stage('download')
+        pages = iter(self.download)
+        try:
+            while True:
+                tic = time.perf_counter()
+                page = next(pages, _DONE)
+                stage.busy += time.perf_counter() - tic
+                if page is _DONE or not self._put(out, page):
+                    break
+                stage.items += 1
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            close = getattr(pages, 'close', None)
+            if close is not None:
+                close()
+            self._put(out, _DONE)
+
+    def _parse(self, inp: queue.Queue, out: queue.Queue) -> None:
+        stage = self._stage('parse')
+        try:
+            while True:
+                page = self._get(inp)
+                if page is _DONE:
+                    break
+                tic = time.perf_counter()
+                records = self.parse(page)
+                stage.busy += time.perf_counter() - tic
+                stage.items += 1
+                if not self._put(out, records):
+                    break
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            self._put(out, _DONE)
+
+    def _store(self, inp: queue.Queue) -> None:
+        stage = self._stage('store')
+        try:
+            while True:
+                records = self._get(inp)
+                if records is _DONE:
+                    break
+                tic = time.perf_counter()
+                self.store(records)
+                stage.busy += time.perf_counter() - tic
+                stage.items += 1
+                self.report.records += len(records)
+        except BaseException as exc:
+            self._fail(exc)
@@ -0,0 +1,174 @@
+"""Persistent on-disk cache of Entrez responses.
+
+This module:
+    - stores raw esearch responses and MEDLINE records fetched by UID list in an SQLite file
+      in the user's workspace
+    - expires entries older than a configurable TTL
+    - caps the cache size, evicting the least recently used entries first, with a running total
+      of the cached bytes so a write does not sum the whole table
+    - counts hits and misses
+
+esearch responses are keyed on the normalized (db, term, params) of the search; history
+searches (usehistory) are not cached. Only efetches of a UID list in MEDLINE format are cached,
+per article, keyed on (db, PMID, rettype, retmode), so overlapping queries share entries. Pages
+fetched through WebEnv and query_key, by fetch_history_pages and fetch_adaptive_pages, always go
+to NCBI. A cache hit never reaches NCBI and does not count against the request budget.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import attr
+from loguru import logger
+
+from pyentrez.utils import pathloc as pl
+
+DEFAULT_TTL = 86400
+DEFAULT_SIZE_MB = 256
+
+SCHEMA = '''CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+)'''
+
+# Params that identify the caller rather than the query are left out of cache keys.
+_IGNORED_PARAMS = frozenset(('email', 'api_key', 'tool', 'usehistory', 'webenv', 'query_key'))
+
+
+def search_key(db: str, term: str, params: Dict[str, Any]) -> str:
+    """Cache key of an esearch, insensitive to case and spacing of the term and param order."""
+    kept = {
+        name: str(value) for name, value in params.items()
+        if name not in _IGNORED_PARAMS and value not in (None, 'None')
+    }
+    return json.dumps(['esearch', db, ' '.join(term.lower().split()), kept], sort_keys=True)
+
+
+def fetch_key(db: str, pmid: str, rettype: Optional[str], retmode: Optional[str]) -> str:
+    """Cache key of one article returned by efetch."""
+    return json.dumps(['efetch', db, str(pmid), rettype, retmode])
+
+
+@attr.s
+class ResponseCache(object):
+    """SQLite-backed response cache with TTL expiry and LRU eviction.
+
+    Attributes:
+        path (Path): Location of the cache file.
+        ttl (float): Seconds an entry stays valid.
+        max_bytes (int): Largest total size of cached values before eviction.
+        total (int): Size of the cached values, read once when the cache is opened.
+    """
+
+    path: Path = attr.ib()
+    ttl: float = attr.ib(default=DEFAULT_TTL)
+    max_bytes: int = attr.ib(default=DEFAULT_SIZE_MB * 1024 * 1024)
+    hits: int = attr.ib(init=False, default=0)
+    misses: int = attr.ib(init=False, default=0)
+    total: int = attr.ib(init=False, default=0)
+    conn: Any = attr.ib(init=False, default=None)
+    lock: Any = attr.ib(init=False, factory=threading.RLock)
+
+    def open(self):
+        """Open the cache file, creating it on first use."""
+        if self.conn is None:
+            self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            with self.conn:
+                self.conn.execute(SCHEMA)
+                self.conn.execute(
+                    'CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)',
+                )
+            self.total = self.conn.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM responses',
+            ).fetchone()[0]
+        return self.conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached value for key, or None if it is missing or older than ttl."""
+        now = time.time()
+        with self.lock, self.open():
+            row = self.conn.execute(
+                'SELECT value, created, size FROM responses WHERE key = ?', (key,),
+            ).fetchone()
+            if row is not None and now - row[1] <= self.ttl:
+                self.conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                self.hits += 1
+                return bytes(row[0])
+            if row is not None:
+                self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.total -= row[2]
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store value under key, then evict least recently used entries beyond max_bytes."""
+        self.put_many({key: value})
+
+    def put_many(self, values: Mapping[str, bytes]) -> None:
+        """Store several values in one transaction, then evict beyond max_bytes once."""
+        now = time.time()
+        with self.lock, self.open():
+            for key, value in values.items():
+                row = self.conn.execute(
+                    'SELECT size FROM responses WHERE key = ?', (key,),
+                ).fetchone()
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                    (key, value, len(value), now, now),
+                )
+                self.total += len(value) - (row[0] if row else 0)
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters with the number and total size of entries."""
+        with self.lock:
+            entries, size = self.open().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses',
+            ).fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+    def _evict(self) -> None:
+        if self.total <= self.max_bytes:
+            return
+        # Walk the accessed index only as far as the entries that have to go.
+        count = freed = 0
+        for size, in self.conn.execute('SELECT size FROM responses ORDER BY accessed'):
+            if self.total - freed <= self.max_bytes:
+                break
+            count += 1
+            freed += size
+        self.conn.execute(
+            'DELETE FROM responses WHERE key IN '
+            '(SELECT key FROM responses ORDER BY accessed LIMIT ?)',
+            (count,),
+        )
+        self.total -= freed
+        logger.debug(f'Response cache evicted {count} entries.')
+
+
+def from_settings() -> Optional[ResponseCache]:
+    """Build the cache from the cachettl and cachesize settings.
+
+    Returns:
+        ResponseCache in the user's workspace, or None if cachettl is 0 or there is no workspace.
+    """
+    if os.environ.get('PYENT_HOME') is None:
+        return None
+    ttl = os.environ.get('PYENT_CACHETTL', 'None')
+    size = os.environ.get('PYENT_CACHESIZE', 'None')
+    ttl_seconds = int(ttl) if ttl.isdigit() else DEFAULT_TTL
+    if ttl_seconds == 0:
+        return None
+    return ResponseCache(
+        path=pl.get_user_workspace() / 'response_cache.sqlite',
+        ttl=ttl_seconds,
+        max_bytes=(int(size) if size.isdigit() else DEFAULT_SIZE_MB) * 1024 * 1024,
+    )
@@ -0,0 +1,143 @@
+"""Saved queries and incremental sync.
+
+This module:
+    - keeps named queries in saved_queries.yaml in the user's workspace
+    - remembers when each query was last synced
+    - syncs a query by searching only the dates since its last run, diffing the UIDs against
+      the PMIDs already stored and fetching only the missing articles, uploading long lists of
+      missing PMIDs with ePost
+
+The first sync of a query uses the user's mindate/maxdate/reldate settings as they are. Later
+syncs replace them with a window from the last run to today on the datetype setting. Sync
+searches always go to NCBI, never to the response cache.
+"""
+import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import attr
+from loguru import logger
+from yaml import dump as dmp
+from yaml import safe_load as sl
+
+from pyentrez import entrez_scraper as SCRAPE
+from pyentrez.utils import pathloc as pl
+
+DATE_FORMAT = '%Y/%m/%d'
+
+
+@attr.s(auto_attribs=True)
+class SavedQuery:
+    """A named Entrez query and the date it was last synced."""
+    name: str
+    term: str
+    last_run: Optional[str] = None
+
+
+@attr.s(auto_attribs=True)
+class SyncReport:
+    """Outcome of syncing one saved query.
+
+    Attributes:
+        name: name of the saved query.
+        found: UIDs returned by the search window.
+        new: UIDs that were not stored yet and were fetched.
+        stored: articles written to the database.
+    """
+    name: str
+    found: int = 0
+    new: int = 0
+    stored: int = 0
+
+    def __str__(self):
+        return (f'{self.name}: {self.found} found, {self.new} new, '
+                f'{self.stored} stored')
+
+
+@attr.s
+class QueryStore(object):
+    """Saved queries backed by a YAML file.
+
+    Attributes:
+        path (Path): Location of the YAML file.
+    """
+
+    path: Path = attr.ib(factory=lambda: pl.get_user_workspace() / 'saved_queries.yaml')
+    queries: Dict[str, SavedQuery] = attr.ib(init=False, factory=dict)
+
+    def __attrs_post_init__(self):
+        if self.path.exists():
+            with open(self.path) as file_in:
+                data = sl(file_in) or {}
+            for name, query in data.items():
+                self.queries[name] = SavedQuery(name=name, **query)
+
+    def save(self) -> None:
+        data = {
+            name: {'term': query.term, 'last_run': query.last_run}
+            for name, query in self.queries.items()
+        }
+        with open(self.path, 'w') as file_out:
+            dmp(data, file_out)
+
+    def add(self, name: str, term: str) -> SavedQuery:
+        """Save term under name, replacing any query with that name."""
+        self.queries[name] = SavedQuery(name=name, term=term)
+        self.save()
+        return self.queries[name]
+
+    def remove(self, name: str) -> None:
+        self.queries.pop(name, None)
+        self.save()
+
+    def get(self, name: str) -> Optional[SavedQuery]:
+        return self.queries.get(name)
+
+    def names(self) -> List[str]:
+        return sorted(self.queries)
+
+
+def search_window(query: SavedQuery, today: datetime.date) -> Dict[str, Any]:
+    """esearch overrides limiting a sync to the days since the query last ran."""
+    if query.last_run is None:
+        return {}
+    return {
+        'mindate': query.last_run,
+        'maxdate': today.strftime(DATE_FORMAT),
+        'reldate': None,
+    }
+
+
+def sync(scraper: Any, db: Any, store: QueryStore, name: str,
+         today: Optional[datetime.date] = None) -> SyncReport:
+    """Fetch the articles of a saved query that are not stored yet.
+
+    Args:
+        scraper (Scraper): Scraper used for esearch and efetch.
+        db (Storage): Database the articles are diffed against and written to.
+        store (QueryStore): Saved queries, updated with the new last run date.
+        name (str): Name of the saved query.
+        today (date): Date of this run, defaults to today.
+
+    Returns:
+        SyncReport of the run.
+    """
+    query = store.queries[name]
+    today = today or datetime.date.today()
+    report = SyncReport(name=name)
+    # A cached UID list of the same window would hide articles published since it was cached.
+    ids = scraper.esearch_ids(query.term, cache=False, **search_window(query, today))
+    report.found = len(ids)
+    known = db.known_pmids(ids)
+    missing = [pmid for pmid in ids if pmid not in known]
+    report.new = len(missing)
+    for page in scraper.fetch_id_pages(missing):
+        write = db.add_many(SCRAPE.parse_page(page))
+        if write.error:
+            logger.error(f'Sync of {name} stopped: {write.error}')
+            return report
+        report.stored += write.docs
+    query.last_run = today.strftime(DATE_FORMAT)
+    store.save()
+    logger.info(f'Synced {report}')
+    return report
@@ -24,6 +24,7 @@ for overall in menu.values():
 
 settings_eSearch: List[Tuple[str, str]] = [
     ('email', 'PYENT_EMAIL'),
+    ('api_key', 'PYENT_APIKEY'),
     ('usehistory', 'PYENT_USEHISTORY'),
     ('WebEnv', 'PYENT_WEBENV'),
     ('query_key', 'PYENT_QUERYKEY'),
@@ -38,20 +39,26 @@ settings_eSearch: List[Tuple[str, str]] = [
     ('maxdate', 'PYENT_MAXDATE'),
 ]
 
-settings_ePost: List[Tuple[str, str]] = [('email', 'PYENT_EMAIL'), ('WebEnv', 'PYENT_WEBENV')]
+settings_ePost: List[Tuple[str, str]] = [
+    ('email', 'PYENT_EMAIL'),
+    ('api_key', 'PYENT_APIKEY'),
+    ('WebEnv', 'PYENT_WEBENV'),
+]
 
 settings_eSummary: List[Tuple[str, str]] = [
     ('email', 'PYENT_EMAIL'),
+    ('api_key', 'PYENT_APIKEY'),
     ('WebEnv', 'PYENT_WEBENV'),
     ('query_key', 'PYENT_QUERYKEY'),
     ('retmax', 'PYENT_RETMAX'),
     ('retmode', 'PYENT_RETMODE'),
     ('rettype', 'PYENT_RETTYPE'),
-    ('version,', 'PYENT_EZVERSION'),
+    ('version', 'PYENT_EZVERSION'),
 ]
 
 settings_eFetch: List[Tuple[str, str]] = [
     ('email', 'PYENT_EMAIL'),
+    ('api_key', 'PYENT_APIKEY'),
     ('WebEnv', 'PYENT_WEBENV'),
     ('query_key', 'PYENT_QUERYKEY'),
     ('retmax', 'PYENT_RETMAX'),
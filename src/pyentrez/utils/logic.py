@@ -4,26 +4,53 @@ from typing import Tuple
 
 from loguru import logger
 
+from pyentrez import einfo_catalog as ec
 from pyentrez import exceptions
 from pyentrez.utils import string_utils as su
 
+# Settings whose values are checked against the einfo catalog.
+CATALOG_SETTINGS = ('db', 'field', 'datetype')
+
 
 def fetch_check(setting: str, change: str) -> Tuple[bool, str]:
-    """Verifies queries sent to eFetch."""
+    """Verifies queries sent to eFetch.
+
+    db, field and datetype are checked against the cached einfo catalog without any network
+    request. Fields and date types are only checked once the catalog holds the db setting.
+    """
     error: bool = False
     err: str = ''
-    if setting == 'Retmax':
+    setting = setting.lower()
+    if setting == 'retmax':
         if not change.isdigit():
             error = True
             err = 'Retmax must be a integer.'
-    elif setting == 'DB':
-        dbsettings = 'Placeholder'
-        if not any((dbsetting == change) for dbsetting in dbsettings):
+    elif setting in CATALOG_SETTINGS and change not in ('', 'None'):
+        choices = ec.from_settings().choices(setting)
+        if choices and change.lower() not in {choice.lower() for choice in choices}:
             error = True
-            err = f'{change} is not a valid database.'
+            err = f'{change} is not a valid {setting}.'
+            close = ec.from_settings().complete(setting, change[:2])
+            if close:
+                err = f'{err} Did you mean: {", ".join(close[:5])}?'
     return error, err
 
 
+def complete_setting(setting: str, change: str) -> str:
+    """Expands change to the only catalog value of setting it is a prefix of.
+
+    Returns:
+        The completed value, or change itself if it matches none or several values.
+    """
+    if setting.lower() not in CATALOG_SETTINGS or not change:
+        return change
+    matches = ec.from_settings().complete(setting, change)
+    exact = [match for match in matches if match.lower() == change.lower()]
+    if exact:
+        return exact[0]
+    return matches[0] if len(matches) == 1 else change
+
+
 def three_arg_sel(arg1: str, arg2: str, test: str) -> str:
     """Pass in two args and a test, if arg1 != test return arg2.
 
@@ -37,6 +37,37 @@ APPSETTING = [
         },
         # 'setting': {'envar': <envar>, 'text': <text>}
     },
+    {
+        'args': ['--sync'],
+        'kwargs': {
+            'action': 'store_true',
+            'default': False,
+            'help': '''Fetch new articles for every saved query and exit.''',
+        },
+        # 'setting': {'envar': <envar>, 'text': <text>}
+    },
+    {
+        'args': ['--reindex'],
+        'kwargs': {
+            'action': 'store_true',
+            'default': False,
+            'help': '''Rebuild the local search index from the articles in the database and
+        exit.''',
+        },
+        # 'setting': {'envar': <envar>, 'text': <text>}
+    },
+    {
+        'args': ['--import'],
+        'kwargs': {
+            'type': str,
+            'default': None,
+            'dest': 'importdir',
+            'metavar': 'DIR',
+            'help': '''Import a directory of PubMed baseline/update .xml.gz files into the
+        database and exit. Interrupted imports resume where they stopped.''',
+        },
+        # 'setting': {'envar': <envar>, 'text': <text>}
+    },
     {
         'args': ['--mongo'],
         'kwargs': {
@@ -57,6 +88,16 @@ APPSETTING = [
         },
         'setting': {'envar': 'PYENT_CLOUD', 'text': 'cloud'},
     },
+    {
+        'args': ['--sqlite'],
+        'kwargs': {
+            'action': 'store_true',
+            'default': False,
+            'help': '''Store articles in a SQLite database in the user
+        workspace instead of MongoDB. Default = False.''',
+        },
+        'setting': {'envar': 'PYENT_SQLITE', 'text': 'sqlite'},
+    },
     {
         'args': ['--uri'],
         'kwargs': {
@@ -82,6 +123,16 @@ APPSETTING = [
         },
         'setting': {'envar': 'PYENT_PORT', 'text': 'port'},
     },
+    {
+        'args': ['--batchsize'],
+        'kwargs': {
+            'type': int,
+            'default': 1000,
+            'help': '''Number of articles sent to the database in each
+        bulk write. Default = 1000''',
+        },
+        'setting': {'envar': 'PYENT_BATCHSIZE', 'text': 'batchsize'},
+    },
     {
         'args': ['--verbose', '-v'],
         'kwargs': {
@@ -107,6 +158,26 @@ ENTREZSETTINGS = [
         'kwargs': {'type': str, 'help': 'E-mail is required.'},
         'setting': {'envar': 'PYENT_EMAIL', 'text': 'email'},
     },
+    {
+        'args': ['--apikey'],
+        'kwargs': {
+            'type': str,
+            'default': None,
+            'help': '''NCBI API key. With a key pyEntrez may send 10 requests
+        per second instead of 3. Default = None''',
+        },
+        'setting': {'envar': 'PYENT_APIKEY', 'text': 'apikey'},
+    },
+    {
+        'args': ['--workers'],
+        'kwargs': {
+            'type': int,
+            'default': 3,
+            'help': '''Number of concurrent workers used to download pages of
+        a large result set. Requests stay within the NCBI rate limit. Default = 3''',
+        },
+        'setting': {'envar': 'PYENT_WORKERS', 'text': 'workers'},
+    },
     {
         'args': ['--db'],
         'kwargs': {'type': str, 'default': 'pubmed', 'help': 'NCBI database, default = pubmed'},
@@ -165,6 +236,36 @@ ENTREZSETTINGS = [
         },
         'setting': {'envar': 'PYENT_USEHISTORY', 'text': 'usehistory'},
     },
+    {
+        'args': ['--adaptive'],
+        'kwargs': {
+            'type': str,
+            'default': None,
+            'help': '''set to "y" to let history downloads grow the page size from
+        retmax up to maxretmax, and the pages in flight up to workers, while NCBI answers quickly,
+        and back off on throttling, errors or slow responses. Default = "n"''',
+        },
+        'setting': {'envar': 'PYENT_ADAPTIVE', 'text': 'adaptive'},
+    },
+    {
+        'args': ['--maxretmax'],
+        'kwargs': {
+            'type': int,
+            'default': 10000,
+            'help': 'Largest page size adaptive downloads grow to. Default = 10000',
+        },
+        'setting': {'envar': 'PYENT_MAXRETMAX', 'text': 'maxretmax'},
+    },
+    {
+        'args': ['--fetchmode'],
+        'kwargs': {
+            'type': str,
+            'default': 'full',
+            'help': '''Set to "summary" to list titles, journals and dates from
+        eSummary and fetch full records only when an article is opened. Default = full''',
+        },
+        'setting': {'envar': 'PYENT_FETCHMODE', 'text': 'fetchmode'},
+    },
     {
         'args': ['--field'],
         'kwargs': {
@@ -228,6 +329,66 @@ ENTREZSETTINGS = [
         },
         'setting': {'envar': 'PYENT_WEBENV',  'text': 'webenv'},
     },
+    {
+        'args': ['--cachettl'],
+        'kwargs': {
+            'type': int,
+            'default': 86400,
+            'help': '''Seconds a cached esearch or efetch response is reused
+        before asking NCBI again. Set to 0 to turn the cache off. Default = 86400''',
+        },
+        'setting': {'envar': 'PYENT_CACHETTL', 'text': 'cachettl'},
+    },
+    {
+        'args': ['--cachesize'],
+        'kwargs': {
+            'type': int,
+            'default': 256,
+            'help': '''Largest size of the response cache in MB, least recently
+        used responses are evicted first. Default = 256''',
+        },
+        'setting': {'envar': 'PYENT_CACHESIZE', 'text': 'cachesize'},
+    },
+    {
+        'args': ['--einfottl'],
+        'kwargs': {
+            'type': int,
+            'default': 604800,
+            'help': '''Seconds the cached einfo database and field lists are used
+        before they are refreshed from NCBI. Default = 604800 (one week)''',
+        },
+        'setting': {'envar': 'PYENT_EINFOTTL', 'text': 'einfottl'},
+    },
+    {
+        'args': ['--eutils'],
+        'kwargs': {
+            'type': str,
+            'default': None,
+            'help': '''Base URL of the E-utilities, to send requests to a local
+        stand-in such as python -m pyentrez.eutils_server instead of NCBI. Default = None''',
+        },
+        'setting': {'envar': 'PYENT_EUTILS', 'text': 'eutils'},
+    },
+    {
+        'args': ['--cassette'],
+        'kwargs': {
+            'type': str,
+            'default': None,
+            'help': '''Gzip cassette file Entrez responses are recorded to or
+        replayed from, see cassettemode. Default = None''',
+        },
+        'setting': {'envar': 'PYENT_CASSETTE', 'text': 'cassette'},
+    },
+    {
+        'args': ['--cassettemode'],
+        'kwargs': {
+            'type': str,
+            'default': 'replay',
+            'help': '''"record" saves every Entrez response to the cassette,
+        "replay" answers requests from the cassette without contacting NCBI. Default = replay''',
+        },
+        'setting': {'envar': 'PYENT_CASSETTEMODE', 'text': 'cassettemode'},
+    },
     {'setting': {'envar': 'PYENT_QUERYKEY', 'text': 'query_key'}},
     {'setting': {'envar': 'PYENT_RETSTART', 'text': 'retstart'}},
     {'setting': {'envar': 'PYENT_USER', 'text': 'user'}},
@@ -3,6 +3,8 @@ from pathlib import Path
 
 import pytest
 
+from pyentrez.db import sqlite_entrez
+
 root = Path(__file__).parent.parent.parent
 root /= 'tests/fixtures'
 
@@ -28,3 +30,9 @@ def temp_confdir(tmpdir):
     if test_dir.is_dir():
         tmpdir = shutil.copytree(test_dir, tmpdir, dirs_exist_ok=True)
     return tmpdir
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    db = sqlite_entrez.SQLiteLoader(path=tmp_path / 'pyentrez.sqlite', batch_size=2)
+    assert db.initialize() == 0
+    return db
@@ -0,0 +1,61 @@
+from pyentrez.main import abstract_cache
+from pyentrez.utils import string_utils
+
+
+def stored(pmids):
+    return [(pmid, f'Abstract of {pmid}', f'Title {pmid}', pmid == '9') for pmid in pmids]
+
+
+def cache(mocker, size=3):
+    fetch_many = mocker.Mock(side_effect=stored)
+    return abstract_cache.AbstractCache(fetch_many, string_utils.StringUtils(x_dim=12, y_dim=5),
+                                        size=size)
+
+
+class TestAbstractCache:
+    def test_misses_read_and_wrap(self, mocker):
+        abstracts = cache(mocker)
+        entry = abstracts.get('1')
+        assert entry.paper == ('1', 'Abstract of 1', 'Title 1')
+        assert entry.text == 'Abstract of\n1'
+        assert not entry.summary
+        assert abstracts.get('1') is entry
+        assert (abstracts.hits, abstracts.misses) == (1, 1)
+        abstracts.fetch_many.assert_called_once_with(['1'])
+
+    def test_least_recently_used_are_evicted(self, mocker):
+        abstracts = cache(mocker)
+        abstracts.load(['1', '2', '3'])
+        abstracts.get('1')
+        abstracts.load(['4'])
+        assert list(abstracts.entries) == ['3', '1', '4']
+        abstracts.discard(['3', '8'])
+        assert len(abstracts) == 2
+
+    def test_rewrapped_after_resize(self, mocker):
+        abstracts = cache(mocker)
+        abstracts.get('1')
+        abstracts.formatter.update_dim(40, 5)
+        assert abstracts.get('1').text == 'Abstract of 1'
+        assert abstracts.fetch_many.call_count == 1
+
+    def test_prefetch_reads_missing_in_one_query(self, mocker):
+        abstracts = cache(mocker, size=10)
+        abstracts.get('2')
+        abstracts.prefetch(['1', '2', '3', '9', '1']).result()
+        abstracts.fetch_many.assert_called_with(['1', '3', '9'])
+        assert abstracts.get('9').summary
+        assert abstracts.prefetch(['1', '3']) is None
+        abstracts.close()
+
+    def test_superseded_prefetch_is_dropped(self, mocker):
+        abstracts = cache(mocker)
+        abstracts.generation = 2
+        abstracts._prefetch(1, ['1'])
+        abstracts.fetch_many.assert_not_called()
+
+    def test_failed_prefetch_is_logged(self, mocker):
+        abstracts = cache(mocker)
+        abstracts.fetch_many.side_effect = OSError('timed out')
+        abstracts._prefetch(0, ['1'])
+        assert len(abstracts) == 0
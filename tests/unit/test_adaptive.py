@@ -0,0 +1,88 @@
+import pytest
+
+from pyentrez import adaptive, einfo_catalog, entrez_scraper, eutils_server, fetch_scheduler
+from pyentrez import http_session, load_test
+
+
+def controller(**kwargs):
+    scheduler = fetch_scheduler.FetchScheduler(rate=10, workers=4)
+    return adaptive.AdaptiveController(scheduler, min_page=20, max_page=500, max_workers=4,
+                                       max_rate=10, **kwargs)
+
+
+def healthy(control, responses):
+    for _ in range(responses):
+        control.observe('efetch', 200, 0.1)
+
+
+class TestAdaptiveController:
+    def test_grows_within_bounds(self):
+        control = controller()
+        healthy(control, 3)
+        assert (control.page_size, control.concurrency) == (40, 2)
+        healthy(control, 30)
+        assert (control.page_size, control.concurrency, control.rate) == (500, 4, 10)
+
+    def test_backs_off_once_per_burst(self, mocker):
+        clock = mocker.patch('pyentrez.adaptive.time.monotonic', return_value=100.0)
+        control = controller()
+        healthy(control, 9)
+        assert (control.page_size, control.concurrency) == (160, 4)
+        control.observe('efetch', 429, 0.1)
+        control.observe('efetch', 503, 0.1)
+        assert (control.page_size, control.concurrency, control.rate) == (80, 2, 5)
+        assert control.scheduler.bucket.rate == 5
+        clock.return_value = 102.0
+        control.observe('efetch', 200, adaptive.SLOW_SECONDS + 1)
+        assert control.page_size == 40
+        healthy(control, 3)
+        # After a back-off the page size grows by a quarter instead of doubling.
+        assert control.page_size == 50
+        assert control.stats()['back_offs'] == 2
+
+    def test_errors_do_not_grow(self):
+        control = controller()
+        for _ in range(6):
+            control.observe('efetch', 400, 0.1)
+        assert control.page_size == 20
+
+    def test_from_settings(self, monkeypatch):
+        scheduler = fetch_scheduler.FetchScheduler(rate=3, workers=5)
+        monkeypatch.setenv('PYENT_ADAPTIVE', 'None')
+        assert adaptive.from_settings(scheduler) is None
+        monkeypatch.setenv('PYENT_ADAPTIVE', 'y')
+        monkeypatch.setenv('PYENT_RETMAX', '100')
+        monkeypatch.setenv('PYENT_MAXRETMAX', '50000')
+        control = adaptive.from_settings(scheduler)
+        assert (control.min_page, control.max_page, control.max_workers) == (100, 10000, 5)
+
+
+@pytest.fixture
+def server():
+    server = eutils_server.EutilsServer(eutils_server.Corpus(eutils_server.synthetic_corpus(600)))
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_adaptive_history_paging(server, monkeypatch, tmp_path):
+    for _, envar in entrez_scraper.ev.settings_eSearch + entrez_scraper.ev.settings_eFetch:
+        monkeypatch.setenv(envar, 'None')
+    for envar, value in load_test.SETTINGS.items():
+        monkeypatch.setenv(envar, value)
+    monkeypatch.setenv('PYENT_RETMAX', '20')
+    result = load_test.run(server.base_url, 4, '', tmp_path, adaptive=True)
+    assert result['records'] == 600
+    assert result['page_size'] > 20
+    # Fixed pages of 20 would take 30 efetch requests.
+    assert result['requests'] < 20
+
+
+def test_scraper_wires_session_observer(monkeypatch):
+    monkeypatch.setenv('PYENT_ADAPTIVE', 'y')
+    session = http_session.EntrezSession()
+    scraper = entrez_scraper.Scraper(
+        None, fetch_scheduler.FetchScheduler(), None, session, einfo_catalog.EinfoCatalog(None),
+    )
+    assert session.observer == scraper.controller.observe
+    assert session.throttle == scraper.scheduler.bucket.acquire
@@ -0,0 +1,116 @@
+import textwrap
+
+from pyentrez.main import article_list
+from pyentrez.utils import string_utils
+
+
+def wrapper(width=20):
+    return textwrap.TextWrapper(width=width, break_long_words=False).fill
+
+
+class TestArticleList:
+    def test_rows_map_to_pmids(self):
+        rows = article_list.ArticleList(wrapper())
+        lines = rows.build([('1', 'A short title'), ('2', 'A much longer title that wraps')])
+        assert lines == ['A short title', '', '', 'A much longer title', 'that wraps']
+        assert [rows.pmid_at(row) for row in range(len(lines))] == ['1', None, None, '2', '2']
+        assert rows.pmid_at(None) is None
+        assert rows.pmid_at(5) is None
+
+    def test_matches_format_article_list(self):
+        articles = [('1', 'Fever in a clinic'), ('2', 'Fever'), ('3', 'Clinical fever')]
+        utils = string_utils.StringUtils(x_dim=10, y_dim=5)
+        rows = article_list.ArticleList(utils.wrapp.fill)
+        assert rows.build(articles) == utils.format_article_list(articles).splitlines()
+        # A substring of one title matching several articles no longer selects all of them.
+        assert {rows.pmid_at(row) for row, line in enumerate(rows.lines) if 'Fever' in line} == {
+            '1', '2',
+        }
+
+    def test_around(self):
+        rows = article_list.ArticleList(wrapper())
+        rows.build([(str(pmid), f'Title {pmid}') for pmid in range(6)])
+        assert rows.around(6, 1) == ['2', '1', '3']
+        assert rows.around(0, 2) == ['0', '1', '2']
+        assert rows.around(4, 1) == ['1', '2']
+        assert rows.around(None, 1) == []
+
+    def test_extend_skips_listed_articles(self):
+        rows = article_list.ArticleList(wrapper())
+        rows.build([('1', 'First')])
+        assert rows.extend([('1', 'First'), ('2', 'Second')]) == ['', '', 'Second']
+        assert rows.rows == ['1', None, None, '2']
+        assert len(rows) == 2
+
+
+class TestPagination:
+    def test_pages_are_read_as_needed(self, mocker):
+        titles = [(str(pmid), f'Title {pmid}') for pmid in range(10, 25)]
+
+        def page(after, limit):
+            return [title for title in titles if after is None or title[0] > after][:limit]
+
+        fetch_page = mocker.Mock(side_effect=page)
+        rows = article_list.ArticleList(wrapper(), page_size=6)
+        lines = rows.paginate(fetch_page)
+        assert len(rows) == 6
+        assert len(lines) == 16
+        assert not rows.near_end(0)
+        assert rows.near_end(10)
+        rows.more()
+        rows.more()
+        assert list(rows.titles) == [pmid for pmid, _ in titles]
+        assert [call.args for call in fetch_page.call_args_list] == [
+            (None, 6), ('15', 6), ('21', 6),
+        ]
+        assert rows.more() == []
+        assert not rows.near_end(len(rows.lines) - 1)
+
+
+class TestMerge:
+    def paged(self, mocker, titles, page_size=2):
+        def page(after, limit):
+            return [title for title in titles if after is None or title[0] > after][:limit]
+
+        rows = article_list.ArticleList(wrapper(), page_size=page_size)
+        rows.paginate(mocker.Mock(side_effect=page))
+        return rows
+
+    def test_new_articles_past_the_last_page_wait_for_more(self, mocker):
+        rows = self.paged(mocker, [('1', 'One'), ('3', 'Three'), ('5', 'Five')])
+        assert rows.merge([('4', 'Four'), ('9', 'Nine')], []) == []
+        assert list(rows.titles) == ['1', '3']
+        assert rows.lines == ['One', '', '', 'Three']
+        assert rows.rows == ['1', None, None, '3']
+
+    def test_inserted_in_pmid_order(self, mocker):
+        rows = self.paged(mocker, [('1', 'One'), ('3', 'Three')], page_size=5)
+        assert rows.merge([('2', 'Two')], []) is None
+        assert rows.lines == ['One', '', '', 'Two', '', '', 'Three']
+        assert rows.row_of('3') == 6
+
+    def test_appended_once_every_page_is_read(self, mocker):
+        fetch_page = mocker.Mock(return_value=[('1', 'One')])
+        rows = article_list.ArticleList(wrapper(), page_size=5)
+        rows.paginate(fetch_page)
+        lines = rows.lines
+        assert rows.merge([('7', 'Seven'), ('5', 'Five'), ('1', 'One')], []) == [
+            '', '', 'Five', '', '', 'Seven',
+        ]
+        assert rows.lines is lines
+        assert rows.rows == ['1', None, None, '5', None, None, '7']
+        assert rows.last == '7'
+        fetch_page.assert_called_once()
+
+    def test_changed_titles_are_rewrapped(self, mocker):
+        rows = self.paged(mocker, [('1', 'One'), ('2', 'Two')], page_size=5)
+        assert rows.merge([], [('2', 'Two'), ('8', 'Unlisted')]) == []
+        assert rows.merge([], [('1', 'A revised title that wraps')]) is None
+        assert rows.lines == ['A revised title that', 'wraps', '', '', 'Two']
+        assert rows.pmid_at(1) == '1'
+
+    def test_search_lists_ignore_new_articles(self):
+        rows = article_list.ArticleList(wrapper())
+        rows.build([('5', 'Five')])
+        assert rows.merge([('9', 'Nine')], []) == []
+        assert list(rows.titles) == ['5']
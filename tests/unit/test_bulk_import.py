@@ -0,0 +1,49 @@
+import gzip
+
+import pytest
+
+from pyentrez import bulk_import
+
+
+def article(pmid):
+    return (f'<PubmedArticle><MedlineCitation><PMID Version="1">{pmid}</PMID><Article>'
+            f'<ArticleTitle>Title {pmid}</ArticleTitle></Article></MedlineCitation>'
+            '</PubmedArticle>')
+
+
+def write_file(path, pmids, deleted=()):
+    deletes = ''.join(f'<PMID Version="1">{pmid}</PMID>' for pmid in deleted)
+    body = ''.join(article(pmid) for pmid in pmids)
+    if deletes:
+        body += f'<DeleteCitation>{deletes}</DeleteCitation>'
+    with gzip.open(path, 'wt') as file_out:
+        file_out.write(f'<?xml version="1.0" ?><PubmedArticleSet>{body}</PubmedArticleSet>')
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    directory = tmp_path / 'baseline'
+    directory.mkdir()
+    write_file(directory / 'pubmed20n0001.xml.gz', ['1', '2', '3'])
+    write_file(directory / 'pubmed20n0002.xml.gz', ['4'], deleted=['2'])
+    return directory
+
+
+class TestBulkImport:
+    def test_import_applies_deletes(self, tmp_path, mirror, sqlite_db):
+        manifest = bulk_import.Manifest(path=tmp_path / 'manifest.json')
+        report = bulk_import.import_files(mirror, sqlite_db, workers=2, manifest=manifest)
+        assert (report.files, report.records, report.deleted) == (2, 4, 1)
+        assert report.records_per_sec > 0
+        assert {pmid for pmid, _ in sqlite_db.get_titles()} == {'1', '3', '4'}
+
+    def test_import_resumes(self, tmp_path, mirror, sqlite_db):
+        manifest = bulk_import.Manifest(path=tmp_path / 'manifest.json')
+        manifest.record(mirror / 'pubmed20n0001.xml.gz', 3, 0)
+        report = bulk_import.import_files(mirror, sqlite_db, workers=1,
+                                          manifest=bulk_import.Manifest(path=manifest.path))
+        assert (report.files, report.skipped, report.records) == (1, 1, 1)
+        write_file(mirror / 'pubmed20n0001.xml.gz', ['1', '5'])
+        report = bulk_import.import_files(mirror, sqlite_db, workers=1,
+                                          manifest=bulk_import.Manifest(path=manifest.path))
+        assert (report.files, report.skipped) == (1, 1)
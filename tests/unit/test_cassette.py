@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from pyentrez import cassette, exceptions, http_session
+
+MEDLINE = b'PMID- 1\nTI  - Caf\xc3\xa9 title\n'
+
+
+def fake_send(method, path, body):
+    headers = cassette.message('text/plain; charset=UTF-8')
+    if 'term=bad' in path:
+        return 400, 'Bad Request', headers, b'Invalid term'
+    return 200, 'OK', headers, MEDLINE
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    path = tmp_path / 'entrez.jsonl.gz'
+    session = http_session.EntrezSession(
+        base_url='http://127.0.0.1:9/entrez/eutils/',
+        cassette=cassette.Cassette(path=path, mode=cassette.RECORD),
+    )
+    session._send = fake_send
+    session.request('efetch', db='pubmed', id=['1'], rettype='medline', email='a@b.c')
+    with pytest.raises(OSError):
+        session.request('esearch', db='pubmed', term='bad')
+    assert session.cassette.stats()['recorded'] == 1
+    return path
+
+
+def replay_session(path, **kwargs):
+    return http_session.EntrezSession(
+        base_url='http://127.0.0.1:9/entrez/eutils/', backoff=0.001,
+        cassette=cassette.Cassette(path=path, **kwargs),
+    )
+
+
+class TestCassette:
+    def test_replay_without_network(self, recorded):
+        session = replay_session(recorded, latency=0)
+        handle = session.request('efetch', db='pubmed', id=['1'], rettype='medline',
+                                 email='other@b.c')
+        assert handle.read() == MEDLINE.decode('utf-8')
+        assert session.cassette.stats() == {
+            'recorded': 0, 'replayed': 1, 'throttled': 0, 'entries': 1,
+        }
+        assert session.stats()['opened'] == 0
+
+    def test_miss_raises(self, recorded):
+        session = replay_session(recorded, latency=0)
+        with pytest.raises(exceptions.CassetteMiss):
+            session.request('efetch', db='pubmed', id=['2'], rettype='medline')
+
+    def test_simulated_latency(self, recorded):
+        session = replay_session(recorded, latency=0.05)
+        start = time.monotonic()
+        session.request('efetch', db='pubmed', id=['1'], rettype='medline')
+        assert time.monotonic() - start >= 0.05
+
+    def test_simulated_throttling_is_retried(self, recorded):
+        session = replay_session(recorded, latency=0, throttle=0.5, seed=3)
+        for _ in range(4):
+            session.request('efetch', db='pubmed', id=['1'], rettype='medline')
+        stats = session.cassette.stats()
+        assert stats['replayed'] == 4
+        assert stats['throttled'] == session.stats()['retries'] > 0
+
+    def test_missing_cassette(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            cassette.Cassette(path=tmp_path / 'missing.jsonl.gz')
+
+    def test_from_settings(self, monkeypatch, recorded):
+        monkeypatch.setenv('PYENT_CASSETTE', 'None')
+        assert cassette.from_settings() is None
+        monkeypatch.setenv('PYENT_CASSETTE', str(recorded))
+        monkeypatch.setenv('PYENT_CASSETTEMODE', 'replay')
+        assert cassette.from_settings().stats()['entries'] == 1
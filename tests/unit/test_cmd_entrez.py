@@ -0,0 +1,34 @@
+import pytest
+
+from pyentrez import exceptions
+from pyentrez.db import storage
+from pyentrez.main import cmd_entrez
+
+
+@pytest.fixture
+def command(mocker):
+    mocker.patch('pyentrez.main.cmd_entrez.SCRAPE.Scraper')
+    mocker.patch('pyentrez.main.cmd_entrez.su.InteractivePrompt')
+    mocker.patch('pyentrez.main.cmd_entrez.backends.from_settings', return_value=None)
+    command = cmd_entrez.CommandEntrez()
+    command.mdb = mocker.Mock()
+    return command
+
+
+class TestCommandEntrez:
+    def test_store_batch_prints_stored_pmids(self, command, capsys):
+        command.mdb.add_many.return_value = storage.WriteReport()
+        command.store_batch([{'PMID': '1'}])
+        assert capsys.readouterr().out == '1\n'
+
+    def test_failed_write_stops_the_pipeline(self, command, capsys):
+        command.mdb.add_many.return_value = storage.WriteReport(error='disk full')
+        with pytest.raises(exceptions.ExecutionError):
+            command.store_batch([{'PMID': '1'}])
+        assert capsys.readouterr().out == ''
+
+    def test_run_pipeline_reports_the_failure(self, command, mocker, capsys):
+        pipeline = mocker.Mock()
+        pipeline.run.side_effect = exceptions.ExecutionError('disk full')
+        command.run_pipeline(pipeline)
+        assert capsys.readouterr().out == 'Fetch stopped: disk full\n'
@@ -0,0 +1,101 @@
+import io
+
+import pytest
+
+from pyentrez import einfo_catalog
+from pyentrez.utils import logic
+
+DB_LIST = b'''<?xml version="1.0" encoding="UTF-8" ?>
+<!DOCTYPE eInfoResult PUBLIC "-//NLM//DTD einfo 20190110//EN"
+ "https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20190110/einfo.dtd">
+<eInfoResult><DbList><DbName>pubmed</DbName><DbName>protein</DbName></DbList></eInfoResult>'''
+
+PUBMED = b'''<?xml version="1.0" encoding="UTF-8" ?>
+<!DOCTYPE eInfoResult PUBLIC "-//NLM//DTD einfo 20190110//EN"
+ "https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20190110/einfo.dtd">
+<eInfoResult><DbInfo><DbName>pubmed</DbName><MenuName>PubMed</MenuName>
+<Description>PubMed bibliographic record</Description><DbBuild>Build-1</DbBuild>
+<Count>10</Count><LastUpdate>2026/01/01 00:00</LastUpdate>
+<FieldList>
+<Field><Name>TITL</Name><FullName>Title</FullName><Description>Words in title</Description>
+<TermCount>1</TermCount><IsDate>N</IsDate><IsNumerical>N</IsNumerical><SingleToken>N</SingleToken>
+<Hierarchy>N</Hierarchy><IsHidden>N</IsHidden></Field>
+<Field><Name>EDAT</Name><FullName>Entry Date</FullName><Description>Entry date</Description>
+<TermCount>1</TermCount><IsDate>Y</IsDate><IsNumerical>N</IsNumerical><SingleToken>Y</SingleToken>
+<Hierarchy>N</Hierarchy><IsHidden>N</IsHidden></Field>
+</FieldList>
+<LinkList><Link><Name>pubmed_protein</Name><Menu>Protein Links</Menu>
+<Description>Protein</Description><DbTo>protein</DbTo></Link></LinkList>
+</DbInfo></eInfoResult>'''
+
+
+def fake_einfo(**params):
+    return io.BytesIO(PUBMED if params.get('db') else DB_LIST)
+
+
+@pytest.fixture
+def workspace(monkeypatch, tmp_path):
+    monkeypatch.setenv('PYENT_HOME', str(tmp_path))
+    monkeypatch.setenv('PYENT_DB', 'pubmed')
+    monkeypatch.delenv('PYENT_EINFOTTL', raising=False)
+    return tmp_path
+
+
+class TestEinfoCatalog:
+    def test_offline_uses_bundled_list(self, workspace):
+        catalog = einfo_catalog.from_settings()
+        assert 'pubmed' in catalog.databases()
+        assert catalog.fields('pubmed') == {}
+        assert not (workspace / 'einfo_catalog.json').exists()
+
+    def test_refresh_is_cached_on_disk(self, workspace, mocker):
+        einfo = mocker.Mock(side_effect=fake_einfo)
+        catalog = einfo_catalog.from_settings(einfo=einfo)
+        catalog.refresh('pubmed')
+        catalog.refresh('pubmed')
+        assert einfo.call_count == 2
+        offline = einfo_catalog.from_settings()
+        assert offline.databases() == ['pubmed', 'protein']
+        assert offline.fields('pubmed')['EDAT'] == {'name': 'Entry Date', 'date': True}
+        assert offline.links('pubmed') == ['pubmed_protein']
+        assert offline.choices('datetype') == ['edat']
+        assert offline.complete('field', 'ti') == ['TITL', 'Title']
+
+    def test_stale_entries_are_refreshed(self, workspace, mocker):
+        clock = mocker.patch('pyentrez.einfo_catalog.time.time', return_value=1000.0)
+        einfo = mocker.Mock(side_effect=fake_einfo)
+        catalog = einfo_catalog.EinfoCatalog(path=workspace / 'c.json', ttl=10, einfo=einfo)
+        catalog.databases()
+        clock.return_value = 1005.0
+        catalog.databases()
+        assert einfo.call_count == 1
+        clock.return_value = 1020.0
+        catalog.databases()
+        assert einfo.call_count == 2
+
+    def test_failed_refresh_keeps_stale_entry(self, workspace, mocker):
+        catalog = einfo_catalog.EinfoCatalog(path=workspace / 'c.json', ttl=0, einfo=fake_einfo)
+        catalog.databases()
+        catalog.einfo = mocker.Mock(side_effect=OSError('offline'))
+        assert catalog.databases() == ['pubmed', 'protein']
+
+
+class TestSettingChecks:
+    def test_db_is_checked_offline(self, workspace):
+        assert logic.fetch_check('db', 'pubmed') == (False, '')
+        error, err = logic.fetch_check('db', 'pubmde')
+        assert error
+        assert 'pubmed' in err
+
+    def test_fields_are_checked_once_cached(self, workspace):
+        assert logic.fetch_check('field', 'anything') == (False, '')
+        einfo_catalog.from_settings(einfo=fake_einfo).refresh('pubmed')
+        assert logic.fetch_check('field', 'title') == (False, '')
+        assert logic.fetch_check('datetype', 'pdat')[0]
+
+    def test_complete_setting(self, workspace):
+        einfo_catalog.from_settings(einfo=fake_einfo).refresh('pubmed')
+        assert logic.complete_setting('db', 'prot') == 'protein'
+        assert logic.complete_setting('db', 'p') == 'p'
+        assert logic.complete_setting('datetype', 'ED') == 'edat'
+        assert logic.complete_setting('retmax', '20') == '20'
@@ -0,0 +1,218 @@
+import datetime
+import io
+
+import pytest
+
+from pyentrez import entrez_scraper
+from pyentrez import fetch_scheduler
+from pyentrez import response_cache
+
+
+def medline_page(*pmids):
+    records = [f'PMID- {pmid}\nTI  - Title {pmid}\n' for pmid in pmids]
+    return io.StringIO('\n'.join(records))
+
+
+def summary_page(*docs):
+    docsums = ''.join(
+        f'<DocSum><Id>{pmid}</Id><Item Name="PubDate" Type="Date">2020 Sep</Item>'
+        f'<Item Name="Source" Type="String">J</Item><Item Name="AuthorList" Type="List">'
+        f'<Item Name="Author" Type="String">Doe J</Item></Item>'
+        f'<Item Name="Title" Type="String">{title}</Item>'
+        f'<Item Name="FullJournalName" Type="String">Journal</Item></DocSum>'
+        for pmid, title in docs
+    )
+    return (b'<?xml version="1.0" ?><!DOCTYPE eSummaryResult PUBLIC "-//NLM//DTD esummary v1 '
+            b'20041029//EN" "https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20041029/esummary-v1.dtd">'
+            b'<eSummaryResult>' + docsums.encode('utf-8') + b'</eSummaryResult>')
+
+
+@pytest.fixture
+def entrez_env(monkeypatch):
+    monkeypatch.setenv('PYENT_DB', 'pubmed')
+    monkeypatch.setenv('PYENT_EMAIL', 'notarealemail@fake.edu')
+    monkeypatch.setenv('PYENT_RETMAX', '2')
+    monkeypatch.setenv('PYENT_RETMODE', 'txt')
+    monkeypatch.setenv('PYENT_RETTYPE', 'medline')
+    monkeypatch.setenv('PYENT_WEBENV', 'None')
+    monkeypatch.setenv('PYENT_QUERYKEY', 'None')
+
+
+def fast_scraper(cache=None):
+    return entrez_scraper.Scraper(None, fetch_scheduler.FetchScheduler(rate=1000), cache,
+                                  session=None)
+
+
+def page_by_retstart(**kwargs):
+    first = kwargs['retstart'] + 1
+    last = min(first + kwargs['retmax'], 6)
+    return medline_page(*[str(pmid) for pmid in range(first, last)])
+
+
+class TestScraper:
+    def test_efetch_history_pages(self, mocker, entrez_env):
+        m1 = mocker.patch('pyentrez.entrez_scraper.ez.efetch', side_effect=page_by_retstart)
+        scraper = fast_scraper()
+        search = {'Count': '5', 'WebEnv': 'MCID_1', 'QueryKey': '1'}
+        batches = list(scraper.efetch_history(search))
+        assert [[rec['PMID'] for rec in batch] for batch in batches] == [
+            ['1', '2'], ['3', '4'], ['5'],
+        ]
+        assert sorted(call.kwargs['retstart'] for call in m1.call_args_list) == [0, 2, 4]
+        assert all(call.kwargs['webenv'] == 'MCID_1' for call in m1.call_args_list)
+
+    def test_efetch_history_is_bounded(self, mocker, entrez_env):
+        m1 = mocker.patch('pyentrez.entrez_scraper.ez.efetch',
+                          side_effect=lambda **kwargs: medline_page(str(kwargs['retstart'])))
+        scraper = entrez_scraper.Scraper(
+            None, fetch_scheduler.FetchScheduler(rate=1000, workers=1), None, None,
+        )
+        batches = scraper.efetch_history({'Count': '40', 'WebEnv': 'MCID_1', 'QueryKey': '1'})
+        next(batches)
+        assert m1.call_count <= 3
+        batches.close()
+
+    def test_fetch_batches_without_history(self, mocker, entrez_env, monkeypatch):
+        monkeypatch.setenv('PYENT_USEHISTORY', 'None')
+        m1 = mocker.patch('pyentrez.entrez_scraper.Scraper.esearch',
+                          return_value={'IdList': ['1', '2']})
+        mocker.patch('pyentrez.entrez_scraper.ez.efetch', return_value=medline_page('1', '2'))
+        batches = list(fast_scraper().fetch_batches('term'))
+        assert len(batches) == 1
+        assert m1.call_args.args == ('term',)
+
+    @pytest.mark.parametrize(('retmax', 'expected'), [('50', 50), ('None', 20), ('0', 20)])
+    def test_page_size(self, retmax, expected):
+        assert entrez_scraper.page_size({'retmax': retmax}) == expected
+
+    def test_efetch_serves_cached_articles(self, mocker, entrez_env, tmp_path):
+        cache = response_cache.ResponseCache(path=tmp_path / 'cache.sqlite')
+        scraper = fast_scraper(cache)
+        m1 = mocker.patch('pyentrez.entrez_scraper.ez.efetch',
+                          side_effect=lambda **kwargs: medline_page(*kwargs['id'].split(',')))
+        first = scraper.efetch({'IdList': ['1', '2']})
+        second = scraper.efetch({'IdList': ['2', '3', '1']})
+        assert [rec['PMID'] for rec in second] == ['2', '3', '1']
+        assert second[0] == first[1]
+        assert [call.kwargs['id'] for call in m1.call_args_list] == ['1,2', '3']
+        assert cache.stats()['hits'] == 2
+
+    def test_esearch_cached(self, mocker, entrez_env, tmp_path):
+        xml = (b'<?xml version="1.0" ?><!DOCTYPE eSearchResult PUBLIC "-//NLM//DTD esearch '
+               b'20060628//EN" "https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20060628/esearch.dtd">'
+               b'<eSearchResult><Count>1</Count><RetMax>1</RetMax><RetStart>0</RetStart>'
+               b'<IdList><Id>7</Id></IdList><TranslationSet/><QueryTranslation>fever'
+               b'</QueryTranslation></eSearchResult>')
+        m1 = mocker.patch('pyentrez.entrez_scraper.ez.esearch',
+                          side_effect=lambda **kwargs: io.BytesIO(xml))
+        scraper = fast_scraper(response_cache.ResponseCache(path=tmp_path / 'cache.sqlite'))
+        assert scraper.esearch('Fever')['IdList'] == ['7']
+        assert scraper.esearch('  fever ')['IdList'] == ['7']
+        assert m1.call_count == 1
+        assert scraper.esearch('fever', cache=False)['IdList'] == ['7']
+        assert m1.call_count == 2
+
+    def test_split_medline(self):
+        records = entrez_scraper.split_medline(medline_page('1', '2').getvalue())
+        assert list(records) == ['1', '2']
+        assert records['2'].startswith('PMID- 2')
+
+    def test_esearch_ids_splits_large_queries(self, mocker, entrez_env, monkeypatch):
+        monkeypatch.setattr(entrez_scraper, 'ESEARCH_CEILING', 5)
+        days = {datetime.date(2020, 1, day): [f'{day}a', f'{day}b'] for day in range(1, 11)}
+
+        def esearch(term, **kwargs):
+            start = entrez_scraper.parse_date(kwargs.get('mindate')) or datetime.date(2020, 1, 1)
+            end = entrez_scraper.parse_date(kwargs.get('maxdate'), end=True)
+            end = end or datetime.date(2020, 1, 10)
+            ids = [pmid for day, pmids in days.items() if start <= day <= end for pmid in pmids]
+            return {'Count': str(len(ids)), 'IdList': ids[:kwargs['retmax']]}
+
+        monkeypatch.setenv('PYENT_MINDATE', '2020/01/01')
+        monkeypatch.setenv('PYENT_MAXDATE', '2020/01/10')
+        mocker.patch('pyentrez.entrez_scraper.Scraper.esearch', side_effect=esearch)
+        ids = fast_scraper().esearch_ids('term')
+        assert sorted(ids) == sorted(pmid for pmids in days.values() for pmid in pmids)
+        assert len(ids) == len(set(ids))
+
+    def test_esearch_split_keeps_reldate(self, mocker, entrez_env, monkeypatch):
+        monkeypatch.setenv('PYENT_RELDATE', '30')
+        monkeypatch.setenv('PYENT_MINDATE', 'None')
+        monkeypatch.setenv('PYENT_MAXDATE', 'None')
+        esearch = mocker.patch('pyentrez.entrez_scraper.Scraper.esearch',
+                               return_value={'Count': '1', 'IdList': ['1']})
+        assert fast_scraper().esearch_split('term') == ['1']
+        today = datetime.date.today()
+        params = esearch.call_args.kwargs
+        assert params['mindate'] == (today - datetime.timedelta(days=30)).strftime('%Y/%m/%d')
+        assert params['maxdate'] == today.strftime('%Y/%m/%d')
+        assert params['reldate'] is None
+        assert params['cache'] is True
+        fast_scraper().esearch_ids('term', cache=False)
+        assert esearch.call_args.kwargs['cache'] is False
+
+    @pytest.mark.parametrize(('date', 'end', 'expected'), [
+        ('2020', False, datetime.date(2020, 1, 1)),
+        ('2020', True, datetime.date(2020, 12, 31)),
+        ('2020/02', True, datetime.date(2020, 2, 29)),
+        ('2020/03/04', True, datetime.date(2020, 3, 4)),
+        ('None', False, None),
+    ])
+    def test_parse_date(self, date, end, expected):
+        assert entrez_scraper.parse_date(date, end) == expected
+
+    def test_bisect_window(self):
+        window = (datetime.date(2020, 1, 1), datetime.date(2020, 1, 4))
+        assert entrez_scraper.bisect_window(window) == [
+            (datetime.date(2020, 1, 1), datetime.date(2020, 1, 2)),
+            (datetime.date(2020, 1, 3), datetime.date(2020, 1, 4)),
+        ]
+        assert entrez_scraper.bisect_window((window[0], window[0])) is None
+
+    def test_fetch_id_pages_posts_long_lists(self, mocker, entrez_env, monkeypatch):
+        monkeypatch.setattr(entrez_scraper, 'POST_THRESHOLD', 2)
+        monkeypatch.setattr(entrez_scraper, 'POST_CHUNK', 3)
+        posted = iter([{'WebEnv': 'MCID_1', 'QueryKey': key} for key in ('1', '2')])
+        m1 = mocker.patch('pyentrez.entrez_scraper.ez.epost', return_value=io.BytesIO())
+        mocker.patch('pyentrez.entrez_scraper.ez.read', side_effect=lambda handle: next(posted))
+        m2 = mocker.patch('pyentrez.entrez_scraper.ez.efetch', side_effect=page_by_retstart)
+        pages = list(fast_scraper().fetch_id_pages(['1', '2', '3', '4', '5']))
+        assert len(pages) == 3
+        assert [call.kwargs['id'] for call in m1.call_args_list] == ['1,2,3', '4,5']
+        assert 'webenv' not in m1.call_args_list[0].kwargs
+        assert m1.call_args_list[1].kwargs['webenv'] == 'MCID_1'
+        assert sorted(call.kwargs['query_key'] for call in m2.call_args_list) == ['1', '1', '2']
+        assert all('id' not in call.kwargs for call in m2.call_args_list)
+
+    def test_read_ids(self, tmp_path):
+        path = tmp_path / 'ids.txt'
+        path.write_text('1, 2\n3\n\n2 PMID\n')
+        assert entrez_scraper.read_ids(path) == ['1', '2', '3']
+
+    def test_parse_summary(self):
+        summaries = entrez_scraper.parse_summary(summary_page(('7', 'Fever')))
+        assert summaries == [{
+            'PMID': '7', 'TI': 'Fever', 'JT': 'Journal', 'TA': 'J', 'DP': '2020 Sep',
+            'AU': ['Doe J'], 'summary': True,
+        }]
+
+    def test_fetch_summary_pages_from_history(self, mocker, entrez_env, monkeypatch):
+        monkeypatch.setenv('PYENT_USEHISTORY', 'y')
+        monkeypatch.setattr(entrez_scraper, 'SUMMARY_PAGE', 2)
+        mocker.patch('pyentrez.entrez_scraper.Scraper.esearch',
+                     return_value={'Count': '3', 'WebEnv': 'MCID_1', 'QueryKey': '1'})
+        m1 = mocker.patch('pyentrez.entrez_scraper.ez.esummary',
+                          side_effect=lambda **kwargs: io.BytesIO(summary_page(
+                              *[(str(kwargs['retstart'] + 1), 'Title')])))
+        pages = list(fast_scraper().fetch_summary_pages('term'))
+        assert len(pages) == 2
+        assert sorted(call.kwargs['retstart'] for call in m1.call_args_list) == [0, 2]
+        assert all(call.kwargs['retmode'] == 'xml' and 'rettype' not in call.kwargs
+                   for call in m1.call_args_list)
+
+    def test_parse_page_dispatches_xml(self):
+        xml = (b'<?xml version="1.0" ?><PubmedArticleSet><PubmedArticle><MedlineCitation>'
+               b'<PMID>7</PMID><Article><ArticleTitle>Fever</ArticleTitle></Article>'
+               b'</MedlineCitation></PubmedArticle></PubmedArticleSet>')
+        assert entrez_scraper.parse_page(xml) == [{'PMID': '7', 'TI': 'Fever'}]
+        assert entrez_scraper.parse_page(medline_page('1').getvalue())[0]['PMID'] == '1'
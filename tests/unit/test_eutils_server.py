@@ -0,0 +1,86 @@
+import urllib.error
+
+import pytest
+
+from pyentrez import einfo_catalog, entrez_scraper, eutils_server, fetch_scheduler
+from pyentrez import http_session, load_test
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return eutils_server.Corpus(eutils_server.synthetic_corpus(250))
+
+
+@pytest.fixture
+def server(corpus):
+    server = eutils_server.EutilsServer(corpus)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def scraper(server, monkeypatch):
+    for _, envar in entrez_scraper.ev.settings_eSearch + entrez_scraper.ev.settings_eFetch:
+        monkeypatch.setenv(envar, 'None')
+    for envar, value in load_test.SETTINGS.items():
+        monkeypatch.setenv(envar, value)
+    monkeypatch.setenv('PYENT_RETMAX', '40')
+    session = http_session.EntrezSession(base_url=server.base_url)
+    yield entrez_scraper.Scraper(
+        None, fetch_scheduler.FetchScheduler(rate=1000, workers=4), None, session,
+        einfo_catalog.EinfoCatalog(path=None, einfo=lambda **params: None),
+    )
+    session.close()
+
+
+class TestCorpus:
+    def test_search_words_and_dates(self, corpus):
+        everything = corpus.search('')
+        assert len(everything) == 250
+        assert corpus.dates[everything[0]] >= corpus.dates[everything[-1]]
+        window = corpus.search('all[sb]', '2000/01/01', '2000/03/31')
+        assert 0 < len(window) < 250
+        assert corpus.search('nosuchword[tiab]') == []
+
+
+class TestEutilsServer:
+    def test_history_fetch(self, scraper, server):
+        pages = list(scraper.fetch_pages(''))
+        records = [record for page in pages for record in entrez_scraper.parse_page(page)]
+        assert len(pages) == 7
+        assert len({record['PMID'] for record in records}) == 250
+        assert server.stats() == {'esearch': 1, 'efetch': 7}
+
+    def test_posted_ids_and_summaries(self, scraper, corpus):
+        ids = corpus.search('')[:220]
+        pages = list(scraper.fetch_id_pages(ids))
+        assert sum(len(entrez_scraper.parse_page(page)) for page in pages) == 220
+        summaries = entrez_scraper.parse_summary(
+            scraper.esummary_raw(id=','.join(ids[:3])),
+        )
+        assert [summary['PMID'] for summary in summaries] == ids[:3]
+        assert summaries[0]['TI'] == corpus.by_pmid[ids[0]]['TI']
+
+    def test_einfo(self, scraper):
+        scraper.catalog.einfo = scraper.einfo
+        scraper.refresh_catalog()
+        assert scraper.catalog.databases() == ['pubmed']
+        assert scraper.catalog.choices('datetype') == ['edat', 'mdat', 'pdat']
+
+    def test_throttling(self, corpus):
+        server = eutils_server.EutilsServer(corpus, rate=1)
+        session = http_session.EntrezSession(base_url=server.start(), retries=1)
+        session.request('einfo')
+        with pytest.raises(urllib.error.HTTPError) as error:
+            session.request('einfo')
+        session.close()
+        server.stop()
+        assert error.value.code == 429
+        assert server.stats()['throttled'] == 1
+
+
+def test_load_run(scraper, server, tmp_path):
+    result = load_test.run(server.base_url, 2, '', tmp_path)
+    assert result['records'] == 250
+    assert result['requests'] == 8
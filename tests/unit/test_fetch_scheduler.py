@@ -0,0 +1,82 @@
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pyentrez import fetch_scheduler
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(0.1)
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(self.path.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def get(url):
+    with urllib.request.urlopen(url) as response:
+        return response.read().decode()
+
+
+class TestTokenBucket:
+    def test_rate_is_enforced(self):
+        bucket = fetch_scheduler.TokenBucket(rate=20)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        assert time.monotonic() - start >= 0.2
+
+
+class TestFetchScheduler:
+    def test_map_is_ordered_and_concurrent(self, stand_in_server):
+        scheduler = fetch_scheduler.FetchScheduler(rate=50, workers=4)
+
+        def fetch(page):
+            return scheduler.call(get, f'{stand_in_server}/page/{page}', label='efetch')
+
+        start = time.monotonic()
+        pages = list(scheduler.map(fetch, range(8)))
+        elapsed = time.monotonic() - start
+        scheduler.shutdown()
+        assert pages == [f'/page/{page}' for page in range(8)]
+        # Sequential round trips would take 0.8s, the budget alone would take 0.14s.
+        assert 0.14 <= elapsed < 0.7
+        stats = scheduler.stats()
+        assert stats['requests'] == 8
+        assert stats['queue_depth'] == 0
+        assert stats['mean_latency'] >= 0.1
+
+    def test_rate_holds_under_concurrency(self, stand_in_server):
+        scheduler = fetch_scheduler.FetchScheduler(rate=10, workers=8)
+
+        def fetch(page):
+            return scheduler.call(get, f'{stand_in_server}/{page}')
+
+        start = time.monotonic()
+        list(scheduler.map(fetch, range(6)))
+        scheduler.shutdown()
+        assert time.monotonic() - start >= 0.5
+
+    @pytest.mark.parametrize(('apikey', 'rate'), [('None', 3.0), ('abc123', 10.0)])
+    def test_rate_from_settings(self, monkeypatch, apikey, rate):
+        monkeypatch.setenv('PYENT_APIKEY', apikey)
+        monkeypatch.setenv('PYENT_WORKERS', '5')
+        scheduler = fetch_scheduler.from_settings()
+        assert scheduler.rate == rate
+        assert scheduler.workers == 5
@@ -0,0 +1,112 @@
+import gzip
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from pyentrez import http_session
+
+
+class EutilsHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    seen = []
+    busy = []
+
+    def do_GET(self):
+        self.answer(urlsplit(self.path).query)
+
+    def do_POST(self):
+        self.answer(self.rfile.read(int(self.headers['Content-Length'])).decode())
+
+    def answer(self, query):
+        params = parse_qs(query)
+        self.seen.append((self.command, urlsplit(self.path).path, params))
+        if params.get('term') == ['bad']:
+            return self.reply(400, b'Invalid term', 'text/plain')
+        if params.get('term') == ['busy'] and not self.busy:
+            self.busy.append(1)
+            return self.reply(429, b'Too many requests', 'text/plain')
+        if params.get('rettype') == ['medline']:
+            return self.reply(200, b'PMID- 1\nTI  - Title\n', 'text/plain')
+        return self.reply(200, b'<eSearchResult><Count>1</Count></eSearchResult>', 'text/xml')
+
+    def reply(self, status, body, content_type):
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=UTF-8')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def eutils_server():
+    EutilsHandler.seen = []
+    EutilsHandler.busy = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), EutilsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/entrez/eutils/'
+    server.shutdown()
+    server.server_close()
+
+
+class TestEntrezSession:
+    def test_connection_is_reused(self, eutils_server):
+        session = http_session.EntrezSession(base_url=eutils_server)
+        for _ in range(3):
+            handle = session.request('esearch', db='pubmed', term='cancer', retmax=None)
+            assert b'<Count>1</Count>' in handle.read()
+        stats = session.stats()
+        session.close()
+        assert (stats['requests'], stats['opened'], stats['reused']) == (3, 1, 2)
+        assert stats['body_bytes'] == 3 * len(b'<eSearchResult><Count>1</Count></eSearchResult>')
+        method, path, params = EutilsHandler.seen[0]
+        assert (method, path) == ('GET', '/entrez/eutils/esearch.fcgi')
+        assert params == {'db': ['pubmed'], 'term': ['cancer'], 'tool': ['pyentrez']}
+
+    def test_medline_is_text(self, eutils_server):
+        session = http_session.EntrezSession(base_url=eutils_server)
+        handle = session.request('efetch', db='pubmed', id=['1'], rettype='medline')
+        assert handle.read() == 'PMID- 1\nTI  - Title\n'
+        session.close()
+
+    def test_long_requests_are_posted(self, eutils_server):
+        session = http_session.EntrezSession(base_url=eutils_server)
+        session.request('epost', db='pubmed', id=['1', '2'])
+        session.request('efetch', db='pubmed', id=[str(pmid) for pmid in range(300)])
+        session.close()
+        assert [method for method, _, _ in EutilsHandler.seen] == ['POST', 'POST']
+        assert EutilsHandler.seen[1][2]['id'] == [','.join(map(str, range(300)))]
+
+    def test_throttled_request_is_retried(self, eutils_server):
+        session = http_session.EntrezSession(base_url=eutils_server, backoff=0.01)
+        handle = session.request('esearch', db='pubmed', term='busy')
+        assert b'<Count>1</Count>' in handle.read()
+        assert session.stats()['retries'] == 1
+        session.close()
+
+    def test_retries_draw_a_token(self, eutils_server, mocker):
+        throttle = mocker.Mock()
+        session = http_session.EntrezSession(base_url=eutils_server, backoff=0.01,
+                                             throttle=throttle)
+        session.request('esearch', db='pubmed', term='cancer')
+        assert throttle.call_count == 0
+        session.request('esearch', db='pubmed', term='busy')
+        session.close()
+        assert throttle.call_count == 1
+
+    def test_error_status_raises(self, eutils_server):
+        session = http_session.EntrezSession(base_url=eutils_server, backoff=0.01)
+        with pytest.raises(urllib.error.HTTPError) as error:
+            session.request('esearch', db='pubmed', term='bad')
+        session.close()
+        assert error.value.code == 400
+        assert len(EutilsHandler.seen) == 1
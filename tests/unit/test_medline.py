@@ -0,0 +1,37 @@
+import io
+
+import pytest
+from Bio import Medline as ml
+
+from pyentrez.parsers import benchmark, medline
+
+RECORDS = [
+    'PMID- 1\nTI  - A long\n      title\nAU  - Doe J\nAU  - Roe K\nMH  - Fever/\n      diagnosis\n'
+    'AD  - Fake University,\n      Fake City.\nCIN - Nature. 2020\n      PMID: 2\n',
+    'PMID- 2\nAB  - Trailing  \n      \n      blank line\nMH  - Fever\n      \n      diagnosis\n',
+    '\n\nPMID- 3\r\nTI  - Windows\r\n\r\n\r\nPMID- 4\nTI  - Two records   \n',
+    'PMID- 5\n   \nTI  - Short whitespace line\n',
+    'PMID- 6\nAB  -\nAB  - Repeated\n      text tag\nAD  - Indented\n       continuation\n',
+]
+
+
+def bio_records(text):
+    return [dict(record) for record in ml.parse(io.StringIO(text))]
+
+
+class TestMedline:
+    @pytest.mark.parametrize('text', RECORDS)
+    def test_matches_bio_medline(self, text):
+        assert medline.parse(text.encode('utf-8')) == bio_records(text)
+
+    def test_matches_bio_medline_on_corpus(self):
+        data = benchmark.make_corpus(50)
+        records = medline.parse(memoryview(data))
+        assert len(records) == 50
+        assert records == bio_records(data.decode('utf-8'))
+
+    def test_benchmark(self):
+        results = benchmark.run([2])
+        assert [result['parser'] for result in results] == ['Bio.Medline', 'pyentrez']
+        assert all(result['records'] == 2 and result['records_per_sec'] > 0
+                   for result in results)
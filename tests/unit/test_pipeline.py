@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from pyentrez import pipeline
+
+
+def slow(seconds, fn=lambda item: item):
+    def stage(item):
+        time.sleep(seconds)
+        return fn(item)
+    return stage
+
+
+class TestIngestPipeline:
+    def test_stages_overlap(self):
+        stored = []
+
+        def download():
+            for page in range(5):
+                time.sleep(0.05)
+                yield page
+
+        pipe = pipeline.IngestPipeline(
+            download=download(),
+            parse=slow(0.05, lambda page: [page]),
+            store=slow(0.05, stored.extend),
+        )
+        report = pipe.run()
+        assert stored == [0, 1, 2, 3, 4]
+        assert report.records == 5
+        # Run back to back the three stages would take 0.75s.
+        assert report.wall < 0.6
+        assert [stage.items for stage in report.stages.values()] == [5, 5, 5]
+
+    def test_backpressure(self):
+        pulled = []
+
+        def download():
+            for page in range(50):
+                pulled.append(page)
+                yield page
+
+        stored = []
+
+        def store(records):
+            stored.extend(records)
+            assert len(pulled) - len(stored) <= 8
+
+        pipeline.IngestPipeline(download(), lambda page: [page], store, maxsize=2).run()
+        assert len(stored) == 50
+
+    def test_store_error_stops_pipeline(self):
+        pulled = []
+
+        def download():
+            for page in range(1000):
+                pulled.append(page)
+                yield page
+
+        def store(records):
+            raise ValueError('database unavailable')
+
+        pipe = pipeline.IngestPipeline(download(), lambda page: [page], store)
+        with pytest.raises(ValueError, match='database unavailable'):
+            pipe.run()
+        assert len(pulled) < 1000
+
+    def test_parse_error_propagates(self):
+        def parse(page):
+            raise KeyError(page)
+
+        pipe = pipeline.IngestPipeline(iter(range(3)), parse, lambda records: None)
+        with pytest.raises(KeyError):
+            pipe.run()
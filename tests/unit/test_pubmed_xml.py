@@ -0,0 +1,91 @@
+import io
+
+from pyentrez.parsers import pubmed_xml
+
+ARTICLE = '''<PubmedArticle>
+  <MedlineCitation Status="MEDLINE" Owner="NLM">
+    <PMID Version="1">{pmid}</PMID>
+    <Article PubModel="Print">
+      <Journal>
+        <ISSN IssnType="Electronic">1476-4687</ISSN>
+        <JournalIssue CitedMedium="Internet">
+          <Volume>586</Volume>
+          <Issue>7831</Issue>
+          <PubDate><Year>2020</Year><Month>Sep</Month><Day>29</Day></PubDate>
+        </JournalIssue>
+        <Title>Nature</Title>
+      </Journal>
+      <ArticleTitle>Fever in <i>mice</i>.</ArticleTitle>
+      <Pagination><MedlinePgn>1-10</MedlinePgn></Pagination>
+      <Abstract>
+        <AbstractText Label="BACKGROUND">Mice get fevers.</AbstractText>
+        <AbstractText Label="RESULTS">They do.</AbstractText>
+      </Abstract>
+      <AuthorList CompleteYN="Y">
+        <Author ValidYN="Y">
+          <LastName>Doe</LastName><ForeName>Jane</ForeName><Initials>J</Initials>
+          <AffiliationInfo><Affiliation>Fake University.</Affiliation></AffiliationInfo>
+        </Author>
+        <Author ValidYN="Y"><CollectiveName>Fever Group</CollectiveName></Author>
+      </AuthorList>
+      <Language>eng</Language>
+      <PublicationTypeList>
+        <PublicationType UI="D016428">Journal Article</PublicationType>
+      </PublicationTypeList>
+    </Article>
+    <MedlineJournalInfo><MedlineTA>Nature</MedlineTA></MedlineJournalInfo>
+    <MeshHeadingList>
+      <MeshHeading>
+        <DescriptorName UI="D005334" MajorTopicYN="N">Fever</DescriptorName>
+        <QualifierName UI="Q000175" MajorTopicYN="Y">diagnosis</QualifierName>
+      </MeshHeading>
+      <MeshHeading><DescriptorName UI="D051379" MajorTopicYN="Y">Mice</DescriptorName></MeshHeading>
+    </MeshHeadingList>
+  </MedlineCitation>
+  <PubmedData>
+    <History>
+      <PubMedPubDate PubStatus="entrez">
+        <Year>2020</Year><Month>9</Month><Day>30</Day>
+      </PubMedPubDate>
+    </History>
+    <PublicationStatus>ppublish</PublicationStatus>
+    <ArticleIdList><ArticleId IdType="doi">10.1/fake</ArticleId></ArticleIdList>
+  </PubmedData>
+</PubmedArticle>'''
+
+
+def article_set(*pmids):
+    articles = ''.join(ARTICLE.format(pmid=pmid) for pmid in pmids)
+    return ('<?xml version="1.0" ?>\n<!DOCTYPE PubmedArticleSet PUBLIC "-//NLM//DTD PubMedArticle, '
+            '1st January 2019//EN" "https://dtd.nlm.nih.gov/ncbi/pubmed/out/pubmed_190101.dtd">\n'
+            f'<PubmedArticleSet>{articles}</PubmedArticleSet>').encode('utf-8')
+
+
+class TestPubmedXML:
+    def test_medline_fields(self):
+        paper = pubmed_xml.parse(article_set('7'))[0]
+        assert paper['PMID'] == '7'
+        assert paper['TI'] == 'Fever in mice.'
+        assert paper['AB'] == 'BACKGROUND: Mice get fevers. RESULTS: They do.'
+        assert paper['DP'] == '2020 Sep 29'
+        assert (paper['JT'], paper['TA'], paper['VI'], paper['IP']) == ('Nature', 'Nature',
+                                                                         '586', '7831')
+        assert paper['AU'] == ['Doe J', 'Fever Group']
+        assert paper['FAU'] == ['Doe, Jane', 'Fever Group']
+        assert paper['AD'] == ['Fake University.']
+        assert paper['MH'] == ['Fever/*diagnosis', '*Mice']
+        assert paper['AID'] == ['10.1/fake [doi]']
+
+    def test_structured_fields(self):
+        paper = pubmed_xml.parse(article_set('7'))[0]
+        assert paper['authors'][0]['affiliations'] == ['Fake University.']
+        assert paper['mesh'][0]['qualifiers'] == [{'name': 'diagnosis', 'major': True}]
+        assert paper['mesh'][1]['major'] is True
+        assert paper['dates'] == {'entrez': '2020/09/30'}
+
+    def test_streams_from_file(self):
+        source = io.BytesIO(article_set(*range(1, 2001)))
+        articles = pubmed_xml.iter_articles(source)
+        assert next(articles)['PMID'] == '1'
+        assert source.tell() < len(source.getvalue())
+        assert sum(1 for _ in articles) == 1999
@@ -0,0 +1,60 @@
+from pyentrez import response_cache
+
+
+class TestResponseCache:
+    def test_hit_and_miss(self, tmp_path):
+        cache = response_cache.ResponseCache(path=tmp_path / 'cache.sqlite')
+        assert cache.get('a') is None
+        cache.put('a', b'value')
+        assert cache.get('a') == b'value'
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1, 'bytes': 5}
+
+    def test_ttl_expiry(self, tmp_path, mocker):
+        cache = response_cache.ResponseCache(path=tmp_path / 'cache.sqlite', ttl=10)
+        clock = mocker.patch('pyentrez.response_cache.time.time', return_value=1000.0)
+        cache.put('a', b'value')
+        clock.return_value = 1011.0
+        assert cache.get('a') is None
+        assert cache.stats()['entries'] == 0
+
+    def test_lru_eviction(self, tmp_path, mocker):
+        cache = response_cache.ResponseCache(path=tmp_path / 'cache.sqlite', max_bytes=10)
+        clock = mocker.patch('pyentrez.response_cache.time.time', return_value=1.0)
+        cache.put('a', b'1234')
+        clock.return_value = 2.0
+        cache.put('b', b'1234')
+        clock.return_value = 3.0
+        cache.get('a')
+        clock.return_value = 4.0
+        cache.put('c', b'1234')
+        assert cache.get('b') is None
+        assert cache.get('a') == b'1234'
+        assert cache.get('c') == b'1234'
+
+    def test_running_total(self, tmp_path, mocker):
+        cache = response_cache.ResponseCache(path=tmp_path / 'cache.sqlite', max_bytes=12)
+        clock = mocker.patch('pyentrez.response_cache.time.time', return_value=1.0)
+        cache.put_many({'a': b'1234', 'b': b'1234'})
+        clock.return_value = 2.0
+        cache.put('a', b'12')
+        assert cache.total == 6
+        clock.return_value = 3.0
+        cache.put_many({'c': b'1234', 'd': b'1234'})
+        assert cache.total == cache.stats()['bytes'] == 10
+        assert cache.get('b') is None
+        reopened = response_cache.ResponseCache(path=tmp_path / 'cache.sqlite')
+        reopened.open()
+        assert reopened.total == 10
+
+    def test_search_key_normalized(self):
+        key1 = response_cache.search_key('pubmed', 'Fever  Clinic', {'retmax': 20, 'sort': 'x'})
+        key2 = response_cache.search_key('pubmed', 'fever clinic',
+                                         {'sort': 'x', 'retmax': '20', 'email': 'a@b.c'})
+        assert key1 == key2
+
+    def test_disabled_by_settings(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('PYENT_HOME', str(tmp_path))
+        monkeypatch.setenv('PYENT_CACHETTL', '0')
+        assert response_cache.from_settings() is None
+        monkeypatch.setenv('PYENT_CACHETTL', '60')
+        assert response_cache.from_settings().ttl == 60
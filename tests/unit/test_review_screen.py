@@ -0,0 +1,12 @@
+import py_cui
+
+from pyentrez.main import review_screen
+
+
+class TestTypedText:
+    def test_keys_edit_at_the_cursor(self):
+        assert review_screen.typed_text('fevr', 3, ord('e')) == 'fever'
+        assert review_screen.typed_text('fever', 5, review_screen.BACKSPACE_KEYS[0]) == 'feve'
+        assert review_screen.typed_text('fever', 0, review_screen.BACKSPACE_KEYS[-1]) == 'fever'
+        assert review_screen.typed_text('fever', 0, py_cui.keys.KEY_DELETE) == 'ever'
+        assert review_screen.typed_text('fever', 5, py_cui.keys.KEY_ENTER) == 'fever'
@@ -0,0 +1,62 @@
+import datetime
+
+import pytest
+
+from pyentrez import saved_queries
+
+
+class FakeScraper:
+    def __init__(self, ids):
+        self.ids = ids
+        self.searches = []
+        self.cached = []
+        self.fetched = []
+
+    def esearch_ids(self, term, cache=True, **overrides):
+        self.searches.append(overrides)
+        self.cached.append(cache)
+        return self.ids
+
+    def fetch_id_pages(self, ids):
+        self.fetched.extend(ids)
+        yield '\n'.join(f'PMID- {pmid}\nTI  - Title {pmid}\n' for pmid in ids)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return saved_queries.QueryStore(path=tmp_path / 'saved_queries.yaml')
+
+
+class TestQueryStore:
+    def test_round_trip(self, store):
+        store.add('fever', 'fever clinic')
+        reloaded = saved_queries.QueryStore(path=store.path)
+        assert reloaded.get('fever') == saved_queries.SavedQuery('fever', 'fever clinic')
+        reloaded.remove('fever')
+        assert saved_queries.QueryStore(path=store.path).names() == []
+
+
+class TestSync:
+    def test_fetches_only_new_pmids(self, store, sqlite_db):
+        store.add('fever', 'fever clinic')
+        sqlite_db.add_many([{'PMID': '1', 'TI': 'Stored'}])
+        scraper = FakeScraper(['1', '2', '3'])
+        report = saved_queries.sync(scraper, sqlite_db, store, 'fever',
+                                    today=datetime.date(2020, 12, 1))
+        assert (report.found, report.new, report.stored) == (3, 2, 2)
+        assert scraper.fetched == ['2', '3']
+        assert scraper.searches == [{}]
+        assert scraper.cached == [False]
+        assert saved_queries.QueryStore(path=store.path).get('fever').last_run == '2020/12/01'
+
+    def test_later_runs_search_since_last_run(self, store, sqlite_db):
+        store.add('fever', 'fever clinic')
+        store.get('fever').last_run = '2020/12/01'
+        scraper = FakeScraper(['1'])
+        saved_queries.sync(scraper, sqlite_db, store, 'fever', today=datetime.date(2020, 12, 5))
+        assert scraper.searches == [
+            {'mindate': '2020/12/01', 'maxdate': '2020/12/05', 'reldate': None},
+        ]
+        report = saved_queries.sync(scraper, sqlite_db, store, 'fever',
+                                    today=datetime.date(2020, 12, 6))
+        assert report.new == 0
@@ -0,0 +1,85 @@
+import pytest
+
+from pyentrez.db import search_index
+from pyentrez.db import sqlite_entrez
+
+
+@pytest.fixture
+def index(tmp_path):
+    return search_index.SearchIndex(path=tmp_path / 'search_index.sqlite')
+
+
+class TestSearchIndex:
+    def test_ranked_search(self, index):
+        index.add([
+            {'PMID': '1', 'TI': 'Fever clinics online', 'AB': 'Patients asked about fever.'},
+            {'PMID': '2', 'TI': 'Heart disease', 'AB': 'A fever was rare.'},
+            {'PMID': '3', 'TI': 'Kidney stones', 'AB': 'Nothing related.'},
+        ])
+        hits = index.search('fever')
+        assert [hit[0] for hit in hits] == ['1', '2']
+        assert hits[0][1] == 'Fever clinics online'
+
+    def test_reindex_replaces(self, index):
+        index.add([{'PMID': '1', 'TI': 'Old title', 'AB': ''}])
+        index.add([{'PMID': '1', 'TI': 'New title', 'AB': ''}])
+        assert index.search('old') == []
+        assert [hit[0] for hit in index.search('new title')] == ['1']
+
+    def test_query_syntax_is_escaped(self, index):
+        index.add([{'PMID': '1', 'TI': 'COVID-19 "outcomes"', 'AB': ''}])
+        assert [hit[0] for hit in index.search('covid-19 "outcomes')] == ['1']
+        assert index.search('   ') == []
+
+    def test_filter_titles(self, index):
+        index.add([{'PMID': '12', 'TI': 'Online fever clinics', 'AB': ''},
+                   {'PMID': '3', 'TI': 'Fever clinics', 'AB': ''},
+                   {'PMID': '4', 'TI': 'Clinical trials', 'AB': 'fever'}])
+        assert index.filter_titles('fev clin') == [('3', 'Fever clinics'),
+                                                   ('12', 'Online fever clinics')]
+        assert index.filter_titles('fev', limit=1) == [('3', 'Fever clinics')]
+        assert index.filter_titles('') == []
+
+    def test_remove(self, index):
+        index.add([{'PMID': '1', 'TI': 'Fever', 'AB': ''}])
+        index.remove(['1'])
+        assert index.search('fever') == []
+
+
+class TestStorageSearch:
+    def test_add_many_updates_index(self, tmp_path):
+        db = sqlite_entrez.SQLiteLoader(path=tmp_path / 'pyentrez.sqlite')
+        db.search_index = search_index.SearchIndex(path=tmp_path / 'search_index.sqlite')
+        db.initialize()
+        db.add_many([{'PMID': '7', 'TI': 'Online fever clinics', 'AB': 'Wuhan'}])
+        assert [hit[0] for hit in db.search('wuhan')] == ['7']
+
+    def test_backfill_on_initialize(self, tmp_path):
+        db = sqlite_entrez.SQLiteLoader(path=tmp_path / 'pyentrez.sqlite')
+        db.initialize()
+        db.add_many([{'PMID': str(pmid), 'TI': f'Fever {pmid}', 'AB': 'Wuhan'}
+                     for pmid in range(1, 6)])
+        db.conn.close()
+        db = sqlite_entrez.SQLiteLoader(path=tmp_path / 'pyentrez.sqlite')
+        db.search_index = search_index.SearchIndex(path=tmp_path / 'search_index.sqlite')
+        db.initialize()
+        assert db.search_index.count() == 5
+        assert db.filter_titles('fev') == [(str(pmid), f'Fever {pmid}') for pmid in range(1, 6)]
+
+    def test_reindex_pages(self, tmp_path):
+        db = sqlite_entrez.SQLiteLoader(path=tmp_path / 'pyentrez.sqlite')
+        db.search_index = search_index.SearchIndex(path=tmp_path / 'search_index.sqlite')
+        db.initialize()
+        db.add_many([{'PMID': str(pmid), 'TI': 'Fever', 'AB': ''} for pmid in range(1, 6)])
+        db.search_index.add([{'PMID': '99', 'TI': 'Not stored', 'AB': ''}])
+        assert db.reindex(batch_size=2) == 5
+        assert db.search('stored') == []
+        assert db.backfill_index() == 0
+
+    def test_one_index_per_store(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(search_index.pl, 'get_user_workspace', lambda: tmp_path)
+        first = sqlite_entrez.SQLiteLoader(path=tmp_path / 'first.sqlite')
+        second = sqlite_entrez.SQLiteLoader(path=tmp_path / 'second.sqlite')
+        paths = {search_index.default_path(db.index_key()) for db in (first, second, first)}
+        assert len(paths) == 2
+        assert all(path.parent == tmp_path for path in paths)
@@ -0,0 +1,96 @@
+import pytest
+
+from pyentrez.db import backends
+from pyentrez.db import sqlite_entrez
+from pyentrez.db import storage
+
+
+def paper(pmid, title='Title', abstract='Abstract'):
+    return {'PMID': pmid, 'TI': title, 'AB': abstract, 'AU': ['Doe, J']}
+
+
+class TestSQLiteLoader:
+    def test_wal_mode(self, sqlite_db):
+        assert sqlite_db.conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    def test_add_and_read(self, sqlite_db):
+        report = sqlite_db.add_many([paper('1', 'First'), paper('2', 'Second'), paper('3')])
+        assert report.batches == [(2, 0, 0), (1, 0, 0)]
+        assert sqlite_db.get_titles() == {('1', 'First'), ('2', 'Second'), ('3', 'Title')}
+        assert sqlite_db.get_article('2') == ('2', 'Abstract', 'Second')
+        assert sqlite_db.get_article('4') is None
+
+    def test_upsert_counts(self, sqlite_db):
+        sqlite_db.add_many([paper('1'), paper('2')])
+        report = sqlite_db.add_many([paper('1'), paper('2', abstract='Revised'), paper('3')])
+        assert (report.inserted, report.matched, report.modified) == (1, 2, 1)
+        assert (report.new_pmids, report.changed_pmids) == (['3'], ['2'])
+        assert sqlite_db.get_article('2')[1] == 'Revised'
+        assert len(sqlite_db.get_titles()) == 3
+
+    def test_summaries_do_not_replace_articles(self, sqlite_db):
+        sqlite_db.add_many([paper('1', 'Full')])
+        summaries = [{'PMID': pmid, 'TI': 'Summary', 'summary': True} for pmid in ('1', '2')]
+        report = sqlite_db.add_summaries(summaries)
+        assert (report.inserted, report.matched) == (1, 1)
+        assert sqlite_db.get_article('1') == ('1', 'Abstract', 'Full')
+        assert not sqlite_db.is_summary('1')
+        assert sqlite_db.is_summary('2')
+        sqlite_db.add_many([paper('2', 'Full')])
+        assert not sqlite_db.is_summary('2')
+
+    def test_listeners_get_written_titles(self, sqlite_db, mocker):
+        sqlite_db.add_many([paper('1', 'First')])
+        listener = mocker.Mock()
+        sqlite_db.subscribe(listener)
+        sqlite_db.add_many([paper('1', 'First'), paper('2', 'Second')])
+        sqlite_db.add_many([paper('1', 'Revised')])
+        sqlite_db.add_summaries([{'PMID': '2', 'TI': 'Summary'}, {'PMID': '3', 'TI': 'Third'}])
+        assert [call.args for call in listener.call_args_list] == [
+            ([('2', 'Second')], []),
+            ([], [('1', 'Revised')]),
+            ([('3', 'Third')], []),
+        ]
+        sqlite_db.unsubscribe(listener)
+        sqlite_db.add_many([paper('4')])
+        assert listener.call_count == 3
+
+    def test_initialize_failure(self, tmp_path):
+        db = sqlite_entrez.SQLiteLoader(path=tmp_path / 'missing' / 'pyentrez.sqlite')
+        assert db.initialize() == 1
+
+
+class TestBackends:
+    def test_incomplete_backend_fails_on_construction(self):
+        class Partial(storage.Storage):
+            def initialize(self):
+                return 0
+
+        with pytest.raises(TypeError):
+            Partial()
+
+    def test_sqlite_selected(self, monkeypatch):
+        monkeypatch.setenv('PYENT_MONGO', 'False')
+        monkeypatch.setenv('PYENT_SQLITE', 'True')
+        assert isinstance(backends.from_settings(), sqlite_entrez.SQLiteLoader)
+
+    def test_no_backend(self, monkeypatch):
+        monkeypatch.setenv('PYENT_MONGO', 'False')
+        monkeypatch.setenv('PYENT_SQLITE', 'False')
+        assert backends.from_settings() is None
+
+
+def test_title_pages(sqlite_db):
+    sqlite_db.add_many([paper(pmid, f'Title {pmid}') for pmid in ('3', '1', '2', '4')])
+    assert sqlite_db.count() == 4
+    assert sqlite_db.get_title_page(None, 3) == [('1', 'Title 1'), ('2', 'Title 2'),
+                                                 ('3', 'Title 3')]
+    assert sqlite_db.get_title_page('3', 3) == [('4', 'Title 4')]
+
+
+def test_get_articles(sqlite_db):
+    sqlite_db.add_many([paper('1', 'First'), paper('2', 'Second')])
+    sqlite_db.add_summaries([{'PMID': '3', 'TI': 'Third', 'summary': True}])
+    assert sorted(sqlite_db.get_articles(['3', '1', '7'])) == [
+        ('1', 'Abstract', 'First', False), ('3', None, 'Third', True),
+    ]
@@ -0,0 +1,72 @@
+from pyentrez.main import title_filter
+
+TITLES = [
+    ('1', 'Online fever clinics in Wuhan'),
+    ('2', 'Fever of unknown origin'),
+    ('3', 'Clinical outcomes of COVID-19'),
+    ('4', 'Feline coronavirus'),
+]
+
+
+def loaded(titles=TITLES, **kwargs):
+    titles_filter = title_filter.TitleFilter(**kwargs)
+    titles_filter.load(lambda: set(titles), lambda: len(titles))
+    return titles_filter
+
+
+class TestTitleFilter:
+    def test_word_prefixes_must_all_match(self):
+        titles = loaded()
+        assert titles.ready
+        assert titles.narrow('fe') == {'1', '2', '4'}
+        assert titles.narrow('fev cli') == {'1'}
+        assert titles.narrow('CLIN') == {'1', '3'}
+        assert titles.narrow('covid-19') == {'3'}
+        assert titles.narrow('  ') is None
+
+    def test_typing_narrows_previous_matches(self, mocker):
+        titles = loaded()
+        titles.narrow('fe')
+        prefix = mocker.spy(titles, 'prefix')
+        assert titles.narrow('fev') == {'1', '2'}
+        assert titles.narrow('fev u') == {'2'}
+        assert [call.args for call in prefix.call_args_list] == [('fev',), ('u',)]
+        assert titles.narrow('fe') == {'1', '2', '4'}
+
+    def test_pages_in_pmid_order(self, monkeypatch):
+        titles = loaded([(str(pmid), f'Title {pmid % 3}') for pmid in range(10, 30)])
+        titles.narrow('title')
+        assert [pmid for pmid, _ in titles.get_title_page(None, 3)] == ['10', '11', '12']
+        assert [pmid for pmid, _ in titles.get_title_page('28', 3)] == ['29']
+        monkeypatch.setattr(title_filter, 'SORT_LIMIT', 2)
+        titles.narrow('1')
+        assert titles.get_title_page('10', 2) == [('13', 'Title 1'), ('16', 'Title 1')]
+
+    def test_written_titles_are_indexed(self):
+        titles = loaded()
+        titles.narrow('fe')
+        titles.add([('5', 'Fetal growth'), ('2', 'Origin of unknown rashes'), ('6', 'Rashes')])
+        assert titles.matches == {'1', '4', '5'}
+        assert titles.narrow('orig') == {'2'}
+        assert titles.narrow('fev') == {'1'}
+        titles.remove(['1', '9'])
+        assert titles.narrow('f') == {'4', '5'}
+        assert titles.prefix('fever') == set()
+        assert 'fever' not in titles.vocabulary
+        assert titles.order == ['2', '3', '4', '5', '6']
+
+    def test_accepts(self):
+        titles = loaded()
+        titles.narrow('fev cl')
+        assert titles.accepts('Clinics for fever')
+        assert not titles.accepts('Fever')
+
+    def test_large_databases_push_down(self, mocker):
+        titles = title_filter.TitleFilter(limit=3)
+        get_titles = mocker.Mock(return_value=set(TITLES))
+        titles.load(get_titles, lambda: len(TITLES))
+        get_titles.assert_not_called()
+        assert titles.pushdown
+        assert not titles.ready
+        titles.add([('5', 'Fetal growth')])
+        assert len(titles) == 0